@@ -0,0 +1,2028 @@
+"""
+Persistence layer for Eventify.
+
+All events live in a single resident EventStore that is loaded once at startup.
+Handlers read and mutate the events held by the store and ask it to persist
+the result; nothing outside this module opens events.json directly.
+
+This module must not import discord so that it can be shared with offline tools.
+"""
+import asyncio
+import contextlib
+import functools
+import glob
+import gzip
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows: no advisory locking, change detection still works
+    fcntl = None
+
+from models import FILLALL_ALIASES, FILLALL_ROLE, SCHEMA_VERSION, Event, calculate_role_counts, make_role_ids
+
+logger = logging.getLogger('eventify.store')
+
+# Use absolute path from the script's location
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+EVENTS_JSON_FILE = os.path.join(SCRIPT_DIR, "events.json")
+EVENTS_SQLITE_FILE = os.path.join(SCRIPT_DIR, "events.db")
+EVENTS_SHARD_DIR = os.path.join(SCRIPT_DIR, "data", "events")
+EVENTS_JOURNAL_FILE = os.path.join(SCRIPT_DIR, "events.journal")
+JOURNAL_ARCHIVE_DIR = os.path.join(SCRIPT_DIR, "journal")
+EVENTS_ARCHIVE_DIR = os.path.join(SCRIPT_DIR, "archive")
+MESSAGE_LEDGER_FILE = os.path.join(SCRIPT_DIR, "message_ledger.json")
+BACKUP_DIR = os.path.join(SCRIPT_DIR, "backups")
+BACKUP_PATTERN = "events_backup_*.json"  # Full daily copies written by older versions
+BACKUP_SNAPSHOT_PATTERN = "snapshot_*.json"
+
+# Number of journal records after which the journal is folded into a new snapshot
+JOURNAL_COMPACT_THRESHOLD = 500
+# Number of folded journal segments kept as audit trail
+JOURNAL_SEGMENTS_TO_KEEP = 42
+# Number of backup snapshots (restore points) kept; unchanged runs add none
+BACKUP_SNAPSHOTS_TO_KEEP = 168
+# How often a mutation is re-run on fresh state after losing a compare-and-swap
+MUTATION_RETRIES = 5
+# Active events expire this long after their start
+EXPIRY_DELAY = timedelta(hours=1)
+
+
+class ConcurrentUpdateError(RuntimeError):
+    """A commit was based on an event version that is no longer the current one."""
+
+
+class JsonSerializer:
+    """Standard library json; compact separators unless pretty output is requested."""
+
+    name = "json"
+
+    def dumps(self, data, pretty=False):
+        if pretty:
+            return json.dumps(data, ensure_ascii=False, indent=4).encode('utf-8')
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, raw):
+        return json.loads(raw)
+
+
+class OrjsonSerializer:
+    """orjson (optional dependency), several times faster than json for the event files."""
+
+    name = "orjson"
+
+    def dumps(self, data, pretty=False):
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 if pretty else 0)
+        except TypeError:
+            # orjson rejects e.g. integers beyond 64 bit; the stdlib handles them
+            return JsonSerializer().dumps(data, pretty)
+
+    def loads(self, raw):
+        return orjson.loads(raw)
+
+
+_serializer = OrjsonSerializer() if orjson else JsonSerializer()
+# Indented output is meant for debugging only
+_pretty = False
+
+
+def configure_serializer(name="auto", pretty=False):
+    """
+    Selects the serializer for all files written by this module.
+
+    name is "auto" (orjson if installed, else json), "json" or "orjson".
+    pretty=True writes indented files for debugging.
+    """
+    global _serializer, _pretty
+    if name == "orjson" and orjson is None:
+        logger.warning("orjson is not installed, falling back to json")
+        name = "json"
+    if name not in ("auto", "json", "orjson"):
+        logger.warning(f"Unknown serializer '{name}', using auto")
+        name = "auto"
+    if name == "json" or (name == "auto" and orjson is None):
+        _serializer = JsonSerializer()
+    else:
+        _serializer = OrjsonSerializer()
+    _pretty = pretty
+    logger.info(f"Using {_serializer.name} serializer ({'indented' if pretty else 'compact'} files)")
+
+
+def dumps(data, pretty=None):
+    """Encodes data to UTF-8 JSON bytes with the configured serializer."""
+    return _serializer.dumps(data, _pretty if pretty is None else pretty)
+
+
+def loads(raw):
+    """
+    Decodes JSON written in any layout (indented or compact, with or without
+    UTF-8 BOM), so files from older versions load regardless of the current setting.
+    """
+    if isinstance(raw, bytes) and raw.startswith(b'\xef\xbb\xbf'):
+        raw = raw[3:]
+    return _serializer.loads(raw)
+
+
+def _fsync_directory(directory):
+    # Makes the rename itself durable; not supported on every platform
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def atomic_write_json(path, data, pretty=None):
+    """
+    Writes data as JSON to a temp file next to path, fsyncs it and renames it into place.
+
+    Readers see either the old or the new file, never a partially written one.
+    pretty=None uses the configured layout.
+    """
+    raw = dumps(data, pretty)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+class FileLock:
+    """
+    Advisory lock (fcntl.flock) on a sidecar file, e.g. events.json.lock.
+
+    The lock lives in its own file because atomic writes replace the data file
+    and with it any lock held on it. Scripts that edit the event files while
+    the bot is running take the same lock, e.g. with flock(1):
+    flock events.json.lock -c 'edit events.json'. The lock is not reentrant.
+    A shared (reading) hold never creates the lock file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    @contextlib.contextmanager
+    def hold(self, exclusive=True):
+        if fcntl is None or (not exclusive and not os.path.exists(self.path)):
+            yield
+            return
+        with open(self.path, 'a' if exclusive else 'r') as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def file_fingerprint(paths):
+    """Returns (inode, mtime, size) for every path, None for missing ones; used to detect external edits."""
+    fingerprint = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+        except OSError:
+            fingerprint.append(None)
+            continue
+        fingerprint.append((st.st_ino, st.st_mtime_ns, st.st_size))
+    return tuple(fingerprint)
+
+
+def read_events_file(path):
+    """Parses an events file and returns its event list; raises ValueError if it is not valid."""
+    with open(path, 'rb') as f:
+        data = loads(f.read())
+    if not isinstance(data, dict):
+        raise ValueError("Invalid events format")
+    if "events" not in data:
+        raise ValueError("Missing 'events' key")
+    return [e for e in data["events"] if isinstance(e, dict)]
+
+
+def find_latest_valid_backup(backup_dir=BACKUP_DIR):
+    """
+    Returns (path, events) of the newest backup that parses, or (None, None).
+
+    Snapshots of the BackupRepository are tried first, then full backup files of
+    older versions. Backups are tried newest first and the search stops at the
+    first valid one, so usually only a single snapshot is read.
+    """
+    repository = BackupRepository(backup_dir)
+    for path in reversed(repository.snapshots()):
+        try:
+            return path, repository.read_snapshot(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Skipping unusable backup snapshot {path}: {e}")
+
+    # Backup names contain the date (YYYYMMDD), so name order is age order
+    for path in sorted(glob.glob(os.path.join(backup_dir, BACKUP_PATTERN)), reverse=True):
+        try:
+            return path, read_events_file(path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping unusable backup {path}: {e}")
+    return None, None
+
+
+class BackupRepository:
+    """
+    Incremental, content-addressed backups of the event store.
+
+    Every event is stored once per distinct content under objects/<hash>.json.
+    A snapshot is a small manifest (snapshot_<UTC timestamp>.json) that maps each
+    event_id to the hash of its content at that time, so a backup only writes the
+    events that changed since the previous one and nothing at all if no event
+    changed. restore(at) returns the events as they were at any kept snapshot.
+    All methods block and are meant to run on the store's I/O thread.
+    """
+
+    def __init__(self, directory=BACKUP_DIR, keep=BACKUP_SNAPSHOTS_TO_KEEP):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, "objects")
+        self.keep = keep
+        # event_id -> (stored dict, hash); the store hands out the same dict object
+        # until an event changes, so unchanged events are not serialized again
+        self._hashes = {}
+        self._last_manifest = None
+
+    @staticmethod
+    def _encode(event):
+        # Canonical form, so equal content always gets the same hash
+        return json.dumps(event, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.json")
+
+    def _hash(self, event):
+        event_id = event.get("event_id")
+        cached = self._hashes.get(event_id)
+        if cached is not None and cached[0] is event:
+            return cached[1], None
+        raw = self._encode(event)
+        digest = hashlib.sha256(raw).hexdigest()
+        self._hashes[event_id] = (event, digest)
+        return digest, raw
+
+    def snapshots(self):
+        """Snapshot manifest paths, oldest first."""
+        return sorted(glob.glob(os.path.join(self.directory, BACKUP_SNAPSHOT_PATTERN)))
+
+    @staticmethod
+    def snapshot_time(path):
+        """UTC creation time encoded in a snapshot file name."""
+        stamp = os.path.basename(path)[len("snapshot_"):-len(".json")]
+        return datetime.strptime(stamp, "%Y%m%dT%H%M%S%fZ").replace(tzinfo=timezone.utc)
+
+    def _read_manifest(self, path):
+        with open(path, 'rb') as f:
+            return loads(f.read())["events"]
+
+    def create(self, events):
+        """
+        Records a snapshot of the given stored event dicts.
+
+        Returns the path of the new snapshot, or None if nothing changed since the last one.
+        """
+        os.makedirs(self.objects_dir, exist_ok=True)
+        manifest = {}
+        written = 0
+        for event in events:
+            digest, raw = self._hash(event)
+            manifest[event.get("event_id")] = digest
+            path = self._object_path(digest)
+            if raw is not None and not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                atomic_write_json(path, event, pretty=False)
+                written += 1
+
+        if self._last_manifest is None:
+            existing = self.snapshots()
+            if existing:
+                try:
+                    self._last_manifest = self._read_manifest(existing[-1])
+                except (OSError, ValueError, KeyError) as e:
+                    logger.warning(f"Could not read the latest backup snapshot {existing[-1]}: {e}")
+        if manifest == self._last_manifest:
+            logger.info("No event changed since the last backup snapshot - nothing written")
+            return None
+
+        now = datetime.now(timezone.utc)
+        path = os.path.join(self.directory, f"snapshot_{now.strftime('%Y%m%dT%H%M%S%fZ')}.json")
+        atomic_write_json(path, {"created": now.isoformat(), "events": manifest}, pretty=False)
+        self._last_manifest = manifest
+        logger.info(f"Backup snapshot {path}: {len(manifest)} events, {written} new objects")
+        self.prune()
+        return path
+
+    def read_snapshot(self, path):
+        """Returns the event dicts recorded in a snapshot; raises if an object is missing or unreadable."""
+        events = []
+        for event_id, digest in self._read_manifest(path).items():
+            with open(self._object_path(digest), 'rb') as f:
+                events.append(loads(f.read()))
+        return events
+
+    def restore(self, at=None):
+        """
+        Returns (snapshot path, events) of the newest snapshot taken at or before at.
+
+        at is a datetime or an ISO 8601 string (naive values are UTC); None means the
+        latest snapshot. Returns (None, None) if there is no such snapshot.
+        """
+        if isinstance(at, str):
+            at = datetime.fromisoformat(at)
+        if at is not None and at.tzinfo is None:
+            at = at.replace(tzinfo=timezone.utc)
+        for path in reversed(self.snapshots()):
+            if at is None or self.snapshot_time(path) <= at:
+                return path, self.read_snapshot(path)
+        return None, None
+
+    def prune(self):
+        """Drops the oldest snapshots beyond keep and the objects no kept snapshot refers to."""
+        snapshots = self.snapshots()
+        if len(snapshots) <= self.keep:
+            return
+        for path in snapshots[:-self.keep]:
+            os.remove(path)
+        referenced = set()
+        for path in snapshots[-self.keep:]:
+            try:
+                referenced.update(self._read_manifest(path).values())
+            except (OSError, ValueError, KeyError) as e:
+                # Without the full set of references no object can safely be deleted
+                logger.error(f"Skipping backup object cleanup, unreadable snapshot {path}: {e}")
+                return
+        removed = 0
+        for path in glob.glob(os.path.join(self.objects_dir, "*", "*.json")):
+            if os.path.basename(path)[:-len(".json")] not in referenced:
+                os.remove(path)
+                removed += 1
+        logger.info(f"Pruned {len(snapshots) - self.keep} backup snapshots and {removed} unreferenced objects")
+
+
+def _to_int(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
+def migrate_event(event):
+    """
+    Brings a stored event to SCHEMA_VERSION in place. Returns True if anything changed.
+
+    Schema 1:
+      - thread_id and message_id are ints (or None)
+      - roles are stripped strings, the catch-all role is named FILLALL_ROLE
+      - participants are keyed "<index>:<role>" and every entry is
+        [name, user_id (str), timestamp (float), comment (str, "" if none)]
+      - participants, status and participant_only_mode are always present
+    Schema 2:
+      - role_ids holds a stable ID per role (parallel to roles) and
+        participants are keyed by role ID instead of "<index>:<role>"
+    """
+    if event.get("schema_version") == SCHEMA_VERSION:
+        return False
+
+    for field in ("thread_id", "message_id"):
+        event[field] = _to_int(event.get(field))
+    event.setdefault("status", "active")
+    event.setdefault("participant_only_mode", False)
+
+    old_roles = event.get("roles") or []
+    roles = []
+    for role in old_roles:
+        role = str(role).strip()
+        if role.lower() in FILLALL_ALIASES:
+            role = FILLALL_ROLE
+        roles.append(role)
+
+    role_ids = event.get("role_ids")
+    has_role_ids = isinstance(role_ids, list) and len(role_ids) == len(roles)
+    if not has_role_ids:
+        role_ids = make_role_ids(len(roles))
+
+    participants = {}
+    for role_key, entries in (event.get("participants") or {}).items():
+        index, _, _ = role_key.partition(":")
+        # "<index>:<role>" keys move to the ID of the role at that position
+        if not has_role_ids and index.isdigit() and int(index) < len(roles):
+            role_key = role_ids[int(index)]
+        elif not has_role_ids:
+            logger.warning(f"Keeping unknown participant key {role_key!r} in event {event.get('event_id')}")
+        normalized = []
+        for entry in entries or []:
+            if len(entry) < 2:
+                logger.warning(f"Dropping invalid participant entry {entry!r} in event {event.get('event_id')}")
+                continue
+            name, user_id = entry[0], str(entry[1])
+            timestamp = float(entry[2]) if len(entry) > 2 and entry[2] is not None else 0.0
+            comment = entry[3] if len(entry) > 3 and entry[3] else ""
+            normalized.append([name, user_id, timestamp, comment])
+        participants.setdefault(role_key, []).extend(normalized)
+
+    event["roles"] = roles
+    event["role_ids"] = role_ids
+    event["participants"] = participants
+    event["filled_slots"], event["total_slots"] = calculate_role_counts(roles, participants, role_ids)
+    event["schema_version"] = SCHEMA_VERSION
+    return True
+
+
+def event_start(event):
+    """The event's start as an aware UTC datetime, or None if it has none."""
+    if not event.datetime_obj:
+        return None
+    event_dt = event.datetime_obj
+    if event_dt.tzinfo is None:
+        event_dt = event_dt.replace(tzinfo=timezone.utc)
+    return event_dt
+
+
+def expiry_deadline(event):
+    """UTC time at which the event expires (start + EXPIRY_DELAY), or None if it has no start."""
+    start = event_start(event)
+    return start + EXPIRY_DELAY if start else None
+
+
+def event_has_expired(event, now=None):
+    """True if the event started more than an hour ago (UTC). Never modifies the event."""
+    deadline = expiry_deadline(event)
+    if deadline is None:
+        return False
+    return (now or datetime.now(timezone.utc)) > deadline
+
+
+class JsonFileBackend:
+    """Stores all events in a single JSON file (the classic events.json)."""
+
+    name = "json"
+
+    def __init__(self, path=EVENTS_JSON_FILE, backup_dir=BACKUP_DIR):
+        self.path = path
+        self.backup_dir = backup_dir
+
+    def load(self):
+        if not os.path.exists(self.path):
+            logger.info(f"{self.path} not found - creating new file")
+            self._write({"events": []})
+            return []
+
+        try:
+            return read_events_file(self.path)
+        except ValueError as e:
+            # json.JSONDecodeError is a ValueError as well
+            logger.error(f"Error reading {self.path}: {e}")
+            return self._recover()
+
+    def watch_paths(self):
+        return [self.path]
+
+    def read(self):
+        """Reads the file as it is, without creating, recovering or copying anything; [] if it is missing."""
+        if not os.path.exists(self.path):
+            return []
+        return read_events_file(self.path)
+
+    def reload(self):
+        """
+        Re-reads the file after an external edit, without creating or recovering it.
+
+        An unreadable file is copied aside for inspection and ValueError is raised.
+        """
+        try:
+            return read_events_file(self.path)
+        except ValueError:
+            corrupt_path = f"{self.path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+            shutil.copy2(self.path, corrupt_path)
+            logger.error(f"Copied unreadable events file to {corrupt_path}")
+            raise
+
+    def _recover(self):
+        """Replaces an unreadable events file with the newest valid backup."""
+        # Keep the broken file for inspection instead of overwriting it
+        corrupt_path = f"{self.path}.corrupt-{datetime.now().strftime('%Y%m%d%H%M%S')}"
+        os.replace(self.path, corrupt_path)
+        logger.error(f"Moved unreadable events file to {corrupt_path}")
+
+        backup_path, events = find_latest_valid_backup(self.backup_dir)
+        if backup_path is None:
+            logger.error("No valid backup found - starting with an empty event list")
+            events = []
+        else:
+            logger.warning(f"Restored {len(events)} events from backup {backup_path}")
+        self._write({"events": events})
+        return events
+
+    def save(self, events, changed_ids, removed_ids):
+        # A single file can only be rewritten as a whole
+        self._write({"events": events})
+
+    def _write(self, data):
+        atomic_write_json(self.path, data)
+
+
+class ShardedJsonBackend:
+    """
+    Stores every event in its own file (data/events/<event_id>.json) plus a small manifest.
+
+    The manifest maps each event ID to its lookup fields and is the authority for the
+    status and the commit version, so an expiry only rewrites the manifest. Removed
+    events are moved into the "removed" subfolder instead of being deleted.
+    """
+
+    name = "sharded"
+
+    MANIFEST_FIELDS = ("status", "version", "thread_id", "message_id", "datetime_obj", "title")
+    # Kept in the manifest only; a change of these alone does not rewrite the event file
+    MANIFEST_ONLY_FIELDS = ("status", "version")
+
+    def __init__(self, directory=EVENTS_SHARD_DIR, import_from=EVENTS_JSON_FILE, read_only=False):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self.removed_dir = os.path.join(directory, "removed")
+        self.import_from = import_from
+        # Serialized event content (without MANIFEST_ONLY_FIELDS) as last written, per event ID
+        self._persisted = {}
+        self._manifest = {}
+        if not read_only:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def _event_path(self, event_id):
+        return os.path.join(self.directory, f"{event_id}.json")
+
+    def watch_paths(self):
+        # Event files are replaced atomically, which also touches the directory
+        return [self.manifest_path, self.directory]
+
+    def _event_files(self):
+        return [path for path in glob.glob(os.path.join(self.directory, "*.json")) if path != self.manifest_path]
+
+    def load(self):
+        """Reads all events; a new shard directory (no manifest, no event files) first imports events.json once."""
+        if (self.import_from and os.path.exists(self.import_from)
+                and not os.path.exists(self.manifest_path) and not self._event_files()):
+            logger.info(f"New sharded store - importing events from {self.import_from}")
+            imported = JsonFileBackend(self.import_from).load()
+            self.save(imported, {e.get("event_id") for e in imported}, set())
+            # Written even for an empty import, so the directory no longer counts as new
+            atomic_write_json(self.manifest_path, {"events": self._manifest}, pretty=False)
+            return imported
+        return self.reload()
+
+    def read(self):
+        """Reads the events as they are, without importing anything."""
+        return self.reload()
+
+    def reload(self):
+        """Reads the manifest and event files as they are, e.g. after an outside change; never imports."""
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'rb') as f:
+                self._manifest = loads(f.read()).get("events", {})
+        else:
+            # No manifest yet: rebuild it from the event files that exist
+            self._manifest = {}
+            for path in self._event_files():
+                event_id = os.path.splitext(os.path.basename(path))[0]
+                self._manifest[event_id] = {}
+
+        events = []
+        for event_id, entry in list(self._manifest.items()):
+            try:
+                with open(self._event_path(event_id), 'rb') as f:
+                    event = loads(f.read())
+            except (OSError, json.JSONDecodeError) as e:
+                logger.error(f"Could not read event file for {event_id}: {e}")
+                del self._manifest[event_id]
+                continue
+            for field in self.MANIFEST_ONLY_FIELDS:
+                if entry.get(field) is not None:
+                    event[field] = entry[field]
+            self._manifest[event_id] = self._manifest_entry(event)
+            self._persisted[event_id] = self._content(event)
+            events.append(event)
+        return events
+
+    def _manifest_entry(self, event):
+        return {field: event.get(field) for field in self.MANIFEST_FIELDS}
+
+    @classmethod
+    def _content(cls, event):
+        return json.dumps({k: v for k, v in event.items() if k not in cls.MANIFEST_ONLY_FIELDS}, sort_keys=True)
+
+    def save(self, events, changed_ids, removed_ids):
+        by_id = {e.get("event_id"): e for e in events}
+
+        for event_id in removed_ids:
+            path = self._event_path(event_id)
+            if os.path.exists(path):
+                os.makedirs(self.removed_dir, exist_ok=True)
+                shutil.move(path, os.path.join(self.removed_dir, f"{event_id}.json"))
+            self._manifest.pop(event_id, None)
+            self._persisted.pop(event_id, None)
+
+        for event_id in changed_ids:
+            event = by_id.get(event_id)
+            if event is None:
+                continue
+            content = self._content(event)
+            # A pure status change (plus its version bump) only needs the manifest
+            if self._persisted.get(event_id) != content:
+                atomic_write_json(self._event_path(event_id), event)
+                self._persisted[event_id] = content
+            self._manifest[event_id] = self._manifest_entry(event)
+
+        if changed_ids or removed_ids:
+            atomic_write_json(self.manifest_path, {"events": self._manifest}, pretty=False)
+
+
+class SqliteBackend:
+    """
+    Stores events in normalized SQLite tables (events, roles, participants).
+
+    Only events reported as changed are written, and for those only the rows that
+    differ from the last persisted state: a signup inserts one participant row.
+    """
+
+    name = "sqlite"
+
+    # Event fields with their own column; everything else goes into the JSON "extra" column
+    EVENT_COLUMNS = (
+        "event_id", "thread_id", "message_id", "status", "datetime_obj", "title", "date", "time",
+        "description", "caller_id", "caller_name", "participant_only_mode", "mention_role_id",
+        "image_url", "total_slots", "filled_slots",
+    )
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS events (
+            event_id TEXT PRIMARY KEY,
+            thread_id INTEGER,
+            message_id INTEGER,
+            status TEXT,
+            datetime_obj TEXT,
+            title TEXT,
+            date TEXT,
+            time TEXT,
+            description TEXT,
+            caller_id TEXT,
+            caller_name TEXT,
+            participant_only_mode INTEGER,
+            mention_role_id TEXT,
+            image_url TEXT,
+            total_slots INTEGER,
+            filled_slots INTEGER,
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_events_thread_id ON events(thread_id);
+        CREATE INDEX IF NOT EXISTS idx_events_message_id ON events(message_id);
+        CREATE INDEX IF NOT EXISTS idx_events_status ON events(status);
+        CREATE INDEX IF NOT EXISTS idx_events_datetime_obj ON events(datetime_obj);
+
+        CREATE TABLE IF NOT EXISTS roles (
+            event_id TEXT NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            role_id TEXT,
+            PRIMARY KEY (event_id, position)
+        );
+
+        CREATE TABLE IF NOT EXISTS participants (
+            event_id TEXT NOT NULL REFERENCES events(event_id) ON DELETE CASCADE,
+            role_key TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            name TEXT,
+            timestamp REAL,
+            comment TEXT,
+            PRIMARY KEY (event_id, role_key, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_participants_user_id ON participants(user_id);
+
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        );
+    """
+
+    def __init__(self, path=EVENTS_SQLITE_FILE, import_from=EVENTS_JSON_FILE, read_only=False):
+        self.path = path
+        self.import_from = import_from
+        # Last persisted rows per event, used to write only what changed
+        self._persisted = {}
+        if read_only:
+            # Inspection only: no database is created and no schema is applied
+            self.conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False) \
+                if os.path.exists(path) else None
+            return
+        created = not os.path.exists(path)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.executescript(self.SCHEMA)
+        # Databases created before role IDs existed lack the column
+        if "role_id" not in {row[1] for row in self.conn.execute("PRAGMA table_info(roles)")}:
+            self.conn.execute("ALTER TABLE roles ADD COLUMN role_id TEXT")
+        # events.json is imported once, into a database created here; existing ones had their chance
+        with self.conn:
+            self.conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('json_import', ?)",
+                              ("pending" if created else "done",))
+
+    def watch_paths(self):
+        return [self.path, f"{self.path}-wal"]
+
+    def load(self):
+        """Reads all events; a newly created database first imports events.json once."""
+        pending = self.conn.execute("SELECT value FROM meta WHERE key = 'json_import'").fetchone()
+        if pending and pending[0] == "pending":
+            imported = []
+            if self.import_from and os.path.exists(self.import_from):
+                logger.info(f"New SQLite store - importing events from {self.import_from}")
+                imported = JsonFileBackend(self.import_from).load()
+                self.save(imported, {e.get("event_id") for e in imported}, set())
+            with self.conn:
+                self.conn.execute("UPDATE meta SET value = 'done' WHERE key = 'json_import'")
+            if imported:
+                return imported
+        return self.reload()
+
+    def read(self):
+        """Reads the events as they are, without importing anything; [] if there is no database."""
+        return self.reload() if self.conn is not None else []
+
+    def reload(self):
+        """Reads all events as they are in the database, e.g. after an outside change; never imports."""
+        events = {}
+        cur = self.conn.execute(f"SELECT {', '.join(self.EVENT_COLUMNS)}, extra FROM events")
+        for row in cur:
+            event = dict(zip(self.EVENT_COLUMNS, row[:-1]))
+            event["participant_only_mode"] = bool(event["participant_only_mode"])
+            if row[-1]:
+                event.update(json.loads(row[-1]))
+            event["roles"] = []
+            event["role_ids"] = []
+            event["participants"] = {}
+            events[event["event_id"]] = event
+
+        for event_id, name, role_id in self.conn.execute(
+                "SELECT event_id, name, role_id FROM roles ORDER BY event_id, position"):
+            if event_id in events:
+                events[event_id]["roles"].append(name)
+                events[event_id]["role_ids"].append(role_id)
+        for event in events.values():
+            # Rows written before role IDs existed; migrate_event() assigns them
+            if None in event["role_ids"]:
+                del event["role_ids"]
+
+        for event_id, role_key, user_id, name, timestamp, comment in self.conn.execute(
+                "SELECT event_id, role_key, user_id, name, timestamp, comment FROM participants "
+                "ORDER BY event_id, timestamp, rowid"):
+            if event_id in events:
+                entry = [name, user_id, timestamp] if comment is None else [name, user_id, timestamp, comment]
+                events[event_id]["participants"].setdefault(role_key, []).append(entry)
+
+        self._persisted = {event_id: self._rows(event) for event_id, event in events.items()}
+        return list(events.values())
+
+    def _rows(self, event):
+        """Splits an event into (event row, role rows, participant rows) as stored in the tables."""
+        extra = {k: v for k, v in event.items()
+                 if k not in self.EVENT_COLUMNS and k not in ("roles", "role_ids", "participants")}
+        event_row = tuple(event.get(column) for column in self.EVENT_COLUMNS) + (
+            json.dumps(extra, sort_keys=True) if extra else None,)
+        roles = event.get("roles", [])
+        role_rows = tuple(zip(roles, event.get("role_ids") or [None] * len(roles)))
+        participant_rows = {}
+        for role_key, entries in event.get("participants", {}).items():
+            for entry in entries:
+                if len(entry) < 2:
+                    continue
+                participant_rows[(role_key, str(entry[1]))] = (
+                    entry[0],
+                    entry[2] if len(entry) > 2 else None,
+                    entry[3] if len(entry) > 3 else None,
+                )
+        return event_row, role_rows, participant_rows
+
+    def save(self, events, changed_ids, removed_ids):
+        by_id = {e.get("event_id"): e for e in events}
+        with self.conn:
+            for event_id in removed_ids:
+                self.conn.execute("DELETE FROM events WHERE event_id = ?", (event_id,))
+                self._persisted.pop(event_id, None)
+
+            for event_id in changed_ids:
+                event = by_id.get(event_id)
+                if event is None:
+                    continue
+                self._save_event(event_id, event)
+
+    def _save_event(self, event_id, event):
+        event_row, role_rows, participant_rows = self._rows(event)
+        old_event_row, old_role_rows, old_participant_rows = self._persisted.get(event_id, (None, None, {}))
+
+        if event_row != old_event_row:
+            placeholders = ", ".join("?" for _ in range(len(event_row)))
+            self.conn.execute(
+                f"INSERT INTO events ({', '.join(self.EVENT_COLUMNS)}, extra) VALUES ({placeholders}) "
+                f"ON CONFLICT(event_id) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in self.EVENT_COLUMNS[1:] + ("extra",)),
+                event_row)
+
+        if role_rows != old_role_rows:
+            self.conn.execute("DELETE FROM roles WHERE event_id = ?", (event_id,))
+            self.conn.executemany(
+                "INSERT INTO roles (event_id, position, name, role_id) VALUES (?, ?, ?, ?)",
+                [(event_id, position, name, role_id) for position, (name, role_id) in enumerate(role_rows)])
+
+        for role_key, user_id in old_participant_rows.keys() - participant_rows.keys():
+            self.conn.execute(
+                "DELETE FROM participants WHERE event_id = ? AND role_key = ? AND user_id = ?",
+                (event_id, role_key, user_id))
+        for (role_key, user_id), values in participant_rows.items():
+            if old_participant_rows.get((role_key, user_id)) != values:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO participants (event_id, role_key, user_id, name, timestamp, comment) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (event_id, role_key, user_id) + values)
+
+        self._persisted[event_id] = (event_row, role_rows, participant_rows)
+
+
+class JournaledBackend:
+    """
+    Wraps a snapshot backend with an append-only mutation journal.
+
+    Saving appends one small JSON line per mutation (e.g. "participant added to
+    role key X of event Y") instead of rewriting the snapshot. Once the journal
+    holds JOURNAL_COMPACT_THRESHOLD records, or when compact() is called, the
+    journal is folded into a new snapshot. Loading replays the journal on top of
+    the snapshot. All records are idempotent, so replaying a journal that was
+    already folded into the snapshot is harmless.
+    """
+
+    def __init__(self, snapshot_backend, path=EVENTS_JOURNAL_FILE, archive_dir=JOURNAL_ARCHIVE_DIR,
+                 compact_threshold=JOURNAL_COMPACT_THRESHOLD):
+        self.snapshot_backend = snapshot_backend
+        self.name = f"{snapshot_backend.name}+journal"
+        self.path = path
+        self.archive_dir = archive_dir
+        self.compact_threshold = compact_threshold
+        self.record_count = 0
+        # Journal records per event since the last compaction, as counted by the last replay
+        self.event_record_counts = {}
+        # Last journaled state of every event, used to derive the mutation records
+        self._state = {}
+        # Snapshot content as last read or written (event_id -> dict), to tell hand edits apart
+        self._base = None
+
+    def watch_paths(self):
+        return self.snapshot_backend.watch_paths() + [self.path]
+
+    def load(self):
+        return self.load_from(self.snapshot_backend.load())
+
+    def read(self):
+        """Replays the journal over the snapshot as it is, without creating or recovering anything."""
+        return self.load_from(self.snapshot_backend.read())
+
+    def reload(self):
+        """
+        Re-reads snapshot and journal after an external change.
+
+        The snapshot lacks everything journaled since the last compaction, so replaying
+        the journal over a hand-edited snapshot would undo the edit. Instead, events whose
+        snapshot entry differs from the snapshot as last read or written take the edited
+        version, all others keep their journaled state. An edit is folded into a new
+        snapshot right away, so the journal cannot replay over it later (e.g. on restart).
+
+        Journaled changes of a hand-edited event (e.g. a signup after the last compaction)
+        are lost; each such event is logged with the number of discarded records. Operators
+        must stop the bot before editing: it folds the journal into the snapshot on
+        shutdown, so the file they edit is complete.
+        """
+        snapshot_reload = getattr(self.snapshot_backend, "reload", self.snapshot_backend.load)
+        edited = snapshot_reload()
+        if self._base is None:
+            return self.load_from(edited)
+
+        current = {e.get("event_id"): e for e in self._replay([self._copy(e) for e in self._base.values()])}
+        edited_by_id = {e.get("event_id"): e for e in edited}
+        hand_edited = [event_id for event_id in self._base.keys() | edited_by_id.keys()
+                       if edited_by_id.get(event_id) != self._base.get(event_id)]
+        if not hand_edited:
+            return list(current.values())
+
+        for event_id in hand_edited:
+            discarded = self.event_record_counts.get(event_id, 0)
+            if discarded:
+                logger.warning(f"Event {event_id} was edited by hand - discarding its {discarded} "
+                               f"journal records since the last compaction")
+            if event_id in edited_by_id:
+                current[event_id] = edited_by_id[event_id]
+            else:
+                current.pop(event_id, None)
+        events = list(current.values())
+        logger.info(f"Taking {len(hand_edited)} hand-edited events from the snapshot, keeping the journal for the rest")
+        self.compact(events)
+        self._state = {event_id: self._copy(event) for event_id, event in current.items()}
+        return events
+
+    def load_from(self, snapshot):
+        """Replays the journal over the given snapshot and takes it as the snapshot last read."""
+        self._base = {e.get("event_id"): self._copy(e) for e in snapshot}
+        return self._replay(snapshot)
+
+    def _replay(self, snapshot):
+        events = {e.get("event_id"): e for e in snapshot}
+        self.record_count = 0
+        self.event_record_counts = {}
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        record = loads(line)
+                    except json.JSONDecodeError:
+                        # A torn last line from a crash during append
+                        logger.warning(f"Skipping unreadable journal record in line {line_number}")
+                        continue
+                    self._apply(events, record)
+                    self.record_count += 1
+                    event_id = record.get("event_id")
+                    self.event_record_counts[event_id] = self.event_record_counts.get(event_id, 0) + 1
+            logger.info(f"Replayed {self.record_count} journal records from {self.path}")
+        self._state = {event_id: self._copy(event) for event_id, event in events.items()}
+        return list(events.values())
+
+    @staticmethod
+    def _copy(event):
+        # Normalizes tuples to lists, exactly as a replay would produce them
+        return loads(dumps(event, pretty=False))
+
+    @staticmethod
+    def _apply(events, record):
+        op = record.get("op")
+        event_id = record.get("event_id")
+        if op == "event_put":
+            events[event_id] = record["event"]
+        elif op == "event_remove":
+            events.pop(event_id, None)
+        elif event_id not in events:
+            logger.warning(f"Journal record '{op}' for unknown event {event_id} ignored")
+        elif op == "event_set":
+            events[event_id].update(record.get("fields", {}))
+            for key in record.get("unset", []):
+                events[event_id].pop(key, None)
+        elif op == "participant_add":
+            entries = events[event_id].setdefault("participants", {}).setdefault(record["role_key"], [])
+            entry = record["entry"]
+            # Replace an existing entry of the same user (comment update) or append
+            for i, existing in enumerate(entries):
+                if existing[1] == entry[1]:
+                    entries[i] = entry
+                    break
+            else:
+                entries.append(entry)
+        elif op == "participant_remove":
+            participants = events[event_id].setdefault("participants", {})
+            if record["role_key"] in participants:
+                participants[record["role_key"]] = [
+                    p for p in participants[record["role_key"]] if p[1] != record["user_id"]]
+        else:
+            logger.warning(f"Unknown journal operation '{op}' ignored")
+
+    @staticmethod
+    def _diff(event_id, old, new):
+        """Derives the mutation records that turn the journaled state old into new."""
+        if old is None:
+            return [{"op": "event_put", "event_id": event_id, "event": new}]
+
+        records = []
+        fields = {k: v for k, v in new.items() if k != "participants" and old.get(k) != v}
+        unset = [k for k in old if k not in new]
+        if fields or unset:
+            record = {"op": "event_set", "event_id": event_id, "fields": fields}
+            if unset:
+                record["unset"] = unset
+            records.append(record)
+
+        old_participants = old.get("participants", {})
+        new_participants = new.get("participants", {})
+        for role_key in old_participants.keys() | new_participants.keys():
+            old_entries = {p[1]: p for p in old_participants.get(role_key, [])}
+            new_entries = {p[1]: p for p in new_participants.get(role_key, [])}
+            for user_id in old_entries.keys() - new_entries.keys():
+                records.append({"op": "participant_remove", "event_id": event_id,
+                                "role_key": role_key, "user_id": user_id})
+            for user_id, entry in new_entries.items():
+                if old_entries.get(user_id) != entry:
+                    records.append({"op": "participant_add", "event_id": event_id,
+                                    "role_key": role_key, "entry": entry})
+        return records
+
+    def save(self, events, changed_ids, removed_ids):
+        by_id = {e.get("event_id"): e for e in events}
+        records = []
+        for event_id in removed_ids:
+            if self._state.pop(event_id, None) is not None:
+                records.append({"op": "event_remove", "event_id": event_id})
+        for event_id in changed_ids:
+            if event_id not in by_id:
+                continue
+            new = self._copy(by_id[event_id])
+            records.extend(self._diff(event_id, self._state.get(event_id), new))
+            self._state[event_id] = new
+
+        if records:
+            timestamp = datetime.now(timezone.utc).isoformat()
+            with open(self.path, 'ab') as f:
+                for record in records:
+                    record["ts"] = timestamp
+                    f.write(dumps(record, pretty=False) + b"\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count += len(records)
+            for record in records:
+                event_id = record.get("event_id")
+                self.event_record_counts[event_id] = self.event_record_counts.get(event_id, 0) + 1
+
+        if self.record_count >= self.compact_threshold:
+            self.compact(events)
+
+    def compact(self, events):
+        """Folds the journal into a fresh snapshot and keeps the folded journal as audit segment."""
+        self.snapshot_backend.save(events, {e.get("event_id") for e in events}, set(self._removed_since_snapshot(events)))
+        if os.path.exists(self.path):
+            os.makedirs(self.archive_dir, exist_ok=True)
+            segment = os.path.join(self.archive_dir, f"events_{datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S%f')}.journal")
+            os.replace(self.path, segment)
+            segments = sorted(glob.glob(os.path.join(self.archive_dir, "events_*.journal")))
+            for old_segment in segments[:-JOURNAL_SEGMENTS_TO_KEEP]:
+                os.remove(old_segment)
+        logger.info(f"Compacted {self.record_count} journal records into a new snapshot")
+        self.record_count = 0
+        self.event_record_counts = {}
+        self._base = {e.get("event_id"): self._copy(e) for e in events}
+
+    def _removed_since_snapshot(self, events):
+        # Backends that store events individually need to know which ones disappeared
+        current = {e.get("event_id") for e in events}
+        persisted = getattr(self.snapshot_backend, "_persisted", {})
+        return [event_id for event_id in persisted if event_id not in current]
+
+
+class EventArchive:
+    """
+    Append-only cold storage for events that left the live store.
+
+    Events are appended as JSON lines to one gzip segment per month of the event
+    date (events_YYYY-MM.jsonl.gz); every append adds a new gzip member, so the
+    existing data is never rewritten. A small index.json maps each event_id to its
+    segment together with title, date and status, so history can be listed
+    without opening the segments. An event archived twice is found in its latest
+    segment; the index is the authority.
+    """
+
+    INDEX_NAME = "index.json"
+
+    def __init__(self, directory=EVENTS_ARCHIVE_DIR):
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self._index = None
+
+    @property
+    def index(self):
+        """{event_id: {"segment", "title", "datetime_obj", "status"}}, read on first use."""
+        if self._index is None:
+            try:
+                with open(self.index_path, 'rb') as f:
+                    self._index = loads(f.read())["events"]
+            except FileNotFoundError:
+                self._index = self._rebuild_index()
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.error(f"Archive index {self.index_path} is unreadable, rebuilding it: {e}")
+                self._index = self._rebuild_index()
+        return self._index
+
+    @staticmethod
+    def _index_entry(segment, event):
+        return {
+            "segment": segment,
+            "title": event.get("title"),
+            "datetime_obj": event.get("datetime_obj"),
+            "status": event.get("status"),
+        }
+
+    @staticmethod
+    def segment_name(event):
+        """Segment file of a stored event dict, by the month of its start."""
+        try:
+            month = datetime.fromisoformat(event["datetime_obj"]).strftime("%Y-%m")
+        except (KeyError, TypeError, ValueError):
+            month = datetime.now(timezone.utc).strftime("%Y-%m")
+        return f"events_{month}.jsonl.gz"
+
+    def append(self, events):
+        """Appends stored event dicts to their month segments and updates the index. Runs on the I/O thread."""
+        if not events:
+            return 0
+        by_segment = {}
+        for event in events:
+            by_segment.setdefault(self.segment_name(event), []).append(event)
+
+        os.makedirs(self.directory, exist_ok=True)
+        index = self.index
+        for segment, segment_events in sorted(by_segment.items()):
+            with open(os.path.join(self.directory, segment), 'ab') as raw:
+                with gzip.GzipFile(fileobj=raw, mode='ab') as f:
+                    for event in segment_events:
+                        f.write(dumps(event, pretty=False) + b"\n")
+                raw.flush()
+                os.fsync(raw.fileno())
+            for event in segment_events:
+                index[event.get("event_id")] = self._index_entry(segment, event)
+        atomic_write_json(self.index_path, {"events": index}, pretty=False)
+        logger.info(f"Archived {len(events)} events into {len(by_segment)} segment(s)")
+        return len(events)
+
+    def segments(self):
+        """Names of all segment files, oldest month first."""
+        return sorted(os.path.basename(p) for p in glob.glob(os.path.join(self.directory, "events_*.jsonl.gz")))
+
+    def iter_segment(self, segment):
+        """Yields the stored event dicts of one segment in append order."""
+        path = os.path.join(self.directory, segment)
+        try:
+            with gzip.open(path, 'rb') as f:
+                for line in f:
+                    if line.strip():
+                        yield loads(line)
+        except (EOFError, OSError, ValueError) as e:
+            # A torn last member from a crash during append; everything before it is intact
+            logger.warning(f"Archive segment {path} ends with an unreadable record: {e}")
+
+    def iter_events(self, segments=None):
+        """Yields the latest archived version of every event, optionally limited to some segments."""
+        index = self.index
+        latest = {}
+        for segment in segments or self.segments():
+            for event in self.iter_segment(segment):
+                event_id = event.get("event_id")
+                # Skip versions superseded by an append to another segment
+                if index.get(event_id, {}).get("segment", segment) == segment:
+                    latest[event_id] = event
+        yield from latest.values()
+
+    def find(self, event_id):
+        """Returns the archived event dict, or None."""
+        entry = self.index.get(event_id)
+        if entry is None:
+            return None
+        found = None
+        for event in self.iter_segment(entry["segment"]):
+            if event.get("event_id") == event_id:
+                found = event
+        return found
+
+    def _rebuild_index(self):
+        index = {}
+        for segment in self.segments():
+            for event in self.iter_segment(segment):
+                index[event.get("event_id")] = self._index_entry(segment, event)
+        return index
+
+
+class MessageLedger:
+    """
+    Record of the messages in the event channel that the bot deletes on schedule (message_ledger.json).
+
+    Every entry keeps the channel, creation time (UTC), purpose ("event" post,
+    "overview", "notification" or "user" for messages of others) and, once
+    known, the event it belongs to, so the bot can delete messages when they
+    reach their retention age without reading the channel history. The bot
+    records its own posts as it sends them; other messages are added by an
+    incremental history scan whose cursors are kept per channel (scan_state()).
+    Entries are replaced, never modified, so snapshot() can be written on
+    another thread.
+    """
+
+    PURPOSES = ("event", "overview", "notification", "user")
+
+    def __init__(self, path=MESSAGE_LEDGER_FILE):
+        self.path = path
+        self._entries = {}  # message_id -> entry dict
+        self._by_event = {}  # event_id -> message IDs
+        self._scan = {}  # channel_id -> history scan cursors
+
+    def load(self):
+        """Reads the ledger; a missing or unreadable file gives an empty ledger."""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                data = loads(f.read())
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not read message ledger {self.path}, starting empty: {e}")
+            return
+        self._entries = {int(message_id): entry for message_id, entry in data.get("messages", {}).items()}
+        self._scan = {int(channel_id): state for channel_id, state in data.get("scan", {}).items()}
+        self._by_event = {}
+        for message_id, entry in self._entries.items():
+            if entry.get("event_id"):
+                self._by_event.setdefault(entry["event_id"], set()).add(message_id)
+        logger.info(f"Loaded {len(self._entries)} messages from the message ledger")
+
+    def __contains__(self, message_id):
+        return message_id in self._entries
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, message_id):
+        return self._entries.get(message_id)
+
+    def items(self):
+        return list(self._entries.items())
+
+    def created(self, message_id):
+        """Creation time of a recorded message as an aware datetime."""
+        return datetime.fromisoformat(self._entries[message_id]["created"])
+
+    def by_purpose(self, purpose):
+        return [message_id for message_id, entry in self._entries.items() if entry["purpose"] == purpose]
+
+    def by_event(self, event_id):
+        return set(self._by_event.get(event_id, ()))
+
+    def record(self, message_id, channel_id, purpose, created, event_id=None):
+        """Adds a posted message; created is the message's (aware) creation time."""
+        if purpose not in self.PURPOSES:
+            raise ValueError(f"Unknown message purpose {purpose!r}")
+        self._entries[message_id] = {
+            "channel_id": channel_id,
+            "created": created.astimezone(timezone.utc).isoformat(),
+            "purpose": purpose,
+            "event_id": event_id,
+        }
+        if event_id:
+            self._by_event.setdefault(event_id, set()).add(message_id)
+
+    def link(self, message_id, event_id):
+        """Assigns a recorded message to its event (event posts are sent before the event has an ID)."""
+        entry = self._entries.get(message_id)
+        if entry is None or entry.get("event_id") == event_id:
+            return False
+        self._entries[message_id] = dict(entry, event_id=event_id)
+        self._by_event.setdefault(event_id, set()).add(message_id)
+        return True
+
+    def forget(self, message_ids):
+        """Drops deleted messages. Returns the number of entries removed."""
+        removed = 0
+        for message_id in message_ids:
+            entry = self._entries.pop(message_id, None)
+            if entry is None:
+                continue
+            removed += 1
+            event_messages = self._by_event.get(entry.get("event_id"))
+            if event_messages is not None:
+                event_messages.discard(message_id)
+                if not event_messages:
+                    del self._by_event[entry["event_id"]]
+        return removed
+
+    def scan_state(self, channel_id):
+        """
+        History scan cursors of a channel: "newest" is the newest message classified
+        (scans continue after it), "oldest" the oldest one reached while working back
+        through older history (continued before it), "backfilled" is True once the
+        start of the channel was reached.
+        """
+        return dict(self._scan.get(channel_id, {"newest": None, "oldest": None, "backfilled": False}))
+
+    def set_scan_state(self, channel_id, state):
+        self._scan[channel_id] = dict(state)
+
+    def snapshot(self):
+        return {
+            "messages": {str(message_id): entry for message_id, entry in self._entries.items()},
+            "scan": {str(channel_id): state for channel_id, state in self._scan.items()},
+        }
+
+    def write(self, snapshot):
+        """Writes a snapshot() of the ledger; may run on the I/O thread."""
+        atomic_write_json(self.path, snapshot)
+
+
+def create_backend(kind="json", journal=False, read_only=False):
+    """
+    Returns the storage backend configured by name ("json", "sharded" or "sqlite").
+
+    With journal=True the file based backends are wrapped in a JournaledBackend.
+    With read_only=True constructing the backend creates nothing on disk (see EventStore.load).
+    """
+    if kind == "sqlite":
+        # SQLite has its own write-ahead log
+        return SqliteBackend(read_only=read_only)
+    if kind == "sharded":
+        backend = ShardedJsonBackend(read_only=read_only)
+    else:
+        if kind != "json":
+            logger.warning(f"Unknown storage backend '{kind}', falling back to json")
+        backend = JsonFileBackend()
+    return JournaledBackend(backend) if journal else backend
+
+
+class EventStore:
+    """
+    Resident, in-memory owner of all events.
+
+    The file is parsed once (on first access or via load()) and afterwards every
+    read is served from memory. Events are held as models.Event objects; the
+    lookup methods return the store's own objects, handlers mutate them in place
+    and call upsert()/save() to persist. Lookups by event_id, thread_id and
+    message_id are dict hits on indexes that load(), upsert() and remove() keep
+    up to date. Dicts exist only at the storage boundary: load() migrates and
+    converts them, and every commit (upsert(), expire_events()) converts the
+    event back into its stored dict form.
+
+    snapshot() is copy-on-write: it returns these committed dicts, which are
+    never modified afterwards; a new commit replaces the dict of its event. A
+    snapshot therefore costs one list of references, and it never contains a
+    mutation that a handler has applied to an Event but not yet committed.
+
+    Past events leave the live store through aarchive(), which appends them to
+    the monthly segments of the EventArchive.
+
+    Reads never write: an active event whose start lies more than an hour in the
+    past is already filtered as expired, but its stored status only changes when
+    flush_status_changes() is called.
+
+    With write_behind=True, request_save() only marks the store dirty and the
+    owner calls flush() periodically, so a burst of signups costs one write.
+    Once max_pending events are dirty, request_save() flushes immediately.
+
+    All disk access runs on a single dedicated I/O thread (executor), which also
+    keeps writes in submission order. The a*-methods are the awaitable variants
+    for use inside the event loop: they take a private copy of the events on the
+    loop and hand only that copy to the I/O thread. Long jobs that only read a
+    snapshot, such as backups, run on a second worker (run_background()) so
+    they never hold up regular saves.
+
+    Other processes (admins, scripts) may edit the files while the bot runs.
+    Every write and reload holds the advisory FileLock of the backend, and the
+    store remembers the fingerprint (inode, mtime, size) of the files it last
+    read or wrote. reload_if_changed() only re-reads them if that fingerprint
+    changed, and a save never overwrites an external edit: it reloads first.
+    Reads stay lock-free on the in-memory events.
+    """
+
+    def __init__(self, backend=None, write_behind=False, max_pending=50, archive=None):
+        self.backend = backend or JsonFileBackend()
+        self.archive = archive or EventArchive()
+        self.write_behind = write_behind
+        self.max_pending = max_pending
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eventify-io")
+        self.background_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="eventify-background")
+        self._events = {}  # event_id -> Event, in insertion order
+        # Lookup indexes; _indexed remembers the keys each event is filed under
+        self._by_thread = {}
+        self._by_message = {}
+        self._indexed = {}
+        # Event IDs changed or removed since the last save, so backends can write incrementally
+        self._changed = set()
+        self._removed = set()
+        # Committed stored form of every event (event_id -> dict, in store order);
+        # replaced on commit, never modified, so they can be handed to other threads
+        self._copies = {}
+        self._pending_flush = None
+        self._flush_again = False
+        self.lock = FileLock(f"{self.backend.watch_paths()[0]}.lock")
+        # Fingerprint of the backend files as last read or written by this store
+        self._disk_state = None
+        self._rewrite_all = False
+        # Events brought to the current schema by the last load()
+        self.migrated_ids = set()
+        self._listeners = []
+        self.loaded = False
+        # Set by load(read_only=True): the store never writes
+        self.read_only = False
+
+    @property
+    def dirty(self):
+        """True if there are changes that have not been written to disk yet."""
+        return bool(self._changed or self._removed)
+
+    def load(self, read_only=False):
+        """
+        Reads all events from the backend into memory, replacing the current content.
+
+        A corrupt events.json is recovered by the backend (see JsonFileBackend._recover).
+        Any other read error (permissions, a locked database, an unreadable manifest) is
+        raised and leaves the store unloaded: continuing with an empty store would
+        overwrite all events on the next save.
+
+        With read_only=True the files are read as they are (backend.read()): nothing is
+        created, recovered or imported, migrations stay in memory and the store refuses
+        to write. Meant for inspection tools.
+        """
+        try:
+            with self.lock.hold(exclusive=not read_only):
+                stored = self.backend.read() if read_only else self.backend.load()
+                self._disk_state = self._fingerprint()
+        except Exception as e:
+            logger.error(f"Could not load events from the {self.backend.name} backend: {e}")
+            raise
+        logger.info(f"Loaded {len(stored)} events from the {self.backend.name} backend into the event store")
+        self.read_only = read_only
+        self._changed.clear()
+        self._removed.clear()
+        self._copies = {}
+        migrated = self.migrate(stored)
+        self.migrated_ids = migrated
+        self._events = {}
+        self._by_thread = {}
+        self._by_message = {}
+        self._indexed = {}
+        for data in stored:
+            try:
+                event = Event.from_dict(data)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Skipping unreadable event {data.get('event_id')}: {e}")
+                continue
+            self._events[event.event_id] = event
+            self._index(event)
+            # Unchanged events keep their stored dict as the committed copy
+            self._copies[event.event_id] = event.to_dict() if event.event_id in migrated else data
+        self.loaded = True
+
+    async def run_io(self, func, *args, **kwargs):
+        """Runs a blocking function on the I/O thread and returns its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def run_background(self, func, *args, **kwargs):
+        """Runs a blocking job on the background worker, next to (not behind) regular saves."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.background_executor, functools.partial(func, *args, **kwargs))
+
+    async def aload(self):
+        """Awaitable load(); must complete before the store is used."""
+        await self.run_io(self.load)
+
+    def _fingerprint(self):
+        return file_fingerprint(self.backend.watch_paths())
+
+    def changed_on_disk(self):
+        """True if the backend files were modified by someone else since this store last read or wrote them."""
+        return self._disk_state is not None and self._fingerprint() != self._disk_state
+
+    def _read_external(self):
+        """Runs on the I/O thread. Returns the stored events, or None if they cannot be used."""
+        with self.lock.hold():
+            state = self._fingerprint()
+            if state[0] is None:
+                # Deleted from outside: the next save writes the file again
+                logger.warning(f"{self.backend.watch_paths()[0]} disappeared - keeping the events in memory")
+                self._disk_state = state
+                return None
+            try:
+                stored = getattr(self.backend, "reload", self.backend.load)()
+                # The reload may have rewritten the files itself (a journal folding in a hand edit)
+                state = self._fingerprint()
+            except Exception as e:
+                logger.error(f"Could not reload externally changed events, keeping the events in memory: {e}")
+                stored = None
+            # Also after a failure, so a broken edit is not re-read (and the next full save replaces it)
+            self._disk_state = state
+            return stored
+
+    def _merge_external(self, stored):
+        """
+        Applies events re-read after an external edit to the resident store.
+
+        External changes win, except for events with unsaved changes of our own,
+        which are kept and written with the next save. Resident Event objects
+        are updated in place, so references held elsewhere stay valid.
+        """
+        if stored is None:
+            # Unusable files: make sure the next save rewrites everything, including a journal's snapshot
+            self._changed.update(self._events)
+            self._rewrite_all = True
+            return False
+        pending = set(self._changed)
+        self.migrate(stored)
+        events = {}
+        notify = []
+        updated = added = 0
+        for data in stored:
+            try:
+                loaded = Event.from_dict(data)
+            except (TypeError, ValueError) as e:
+                logger.error(f"Skipping unreadable event {data.get('event_id')}: {e}")
+                continue
+            event_id = loaded.event_id
+            if event_id in self._removed or event_id in events:
+                continue
+            current = self._events.get(event_id)
+            if current is None:
+                events[event_id] = loaded
+                self._index(loaded)
+                self._copies[event_id] = loaded.to_dict()
+                notify.append((event_id, loaded))
+                added += 1
+                continue
+            events[event_id] = current
+            if event_id in pending:
+                logger.warning(f"Event {event_id} has unsaved changes - keeping them over the external edit")
+            elif data != self._copies.get(event_id):
+                # A new version, so running mutations based on the old state retry
+                version = current.version
+                current.update_from(loaded)
+                current.version = version + 1
+                self._index(current)
+                self._copies[event_id] = current.to_dict()
+                notify.append((event_id, current))
+                updated += 1
+        dropped = 0
+        for event_id, current in self._events.items():
+            if event_id in events:
+                continue
+            if event_id in pending:
+                # Created here and not written yet
+                events[event_id] = current
+            else:
+                self._unindex(event_id)
+                notify.append((event_id, None))
+                dropped += 1
+        self._events = events
+        self._copies = {event_id: self._copies[event_id] for event_id in events}
+        for event_id, event in notify:
+            self._notify(event_id, event)
+        logger.info(f"Reloaded events after an external change: {updated} updated, {added} added, {dropped} removed")
+        return True
+
+    def reload_if_changed(self):
+        """
+        Re-reads the backend if its files were changed from outside; cheap otherwise (a stat per file).
+
+        Returns True if external changes were merged into the store.
+        """
+        if not self.loaded:
+            self.load()
+            return True
+        if not self.changed_on_disk():
+            return False
+        return self._merge_external(self.executor.submit(self._read_external).result())
+
+    async def areload_if_changed(self):
+        """Awaitable reload_if_changed()."""
+        if not self.loaded:
+            await self.aload()
+            return True
+        if not self.changed_on_disk():
+            return False
+        return self._merge_external(await self.run_io(self._read_external))
+
+    def migrate(self, stored):
+        """
+        Normalizes stored event dicts to SCHEMA_VERSION once (see migrate_event).
+
+        Migrated events are marked changed; the caller persists them with the next save.
+        Returns the IDs of the migrated events.
+        """
+        migrated = {e.get("event_id") for e in stored if migrate_event(e)}
+        self._changed.update(migrated)
+        if migrated:
+            logger.info(f"Migrated {len(migrated)} events to schema version {SCHEMA_VERSION}")
+        return migrated
+
+    def _index(self, event):
+        """Files the event under its current thread_id and message_id."""
+        self._unindex(event.event_id)
+        if event.thread_id is not None:
+            self._by_thread[event.thread_id] = event
+        if event.message_id is not None:
+            self._by_message[event.message_id] = event
+        self._indexed[event.event_id] = (event.thread_id, event.message_id)
+
+    def _unindex(self, event_id):
+        thread_id, message_id = self._indexed.pop(event_id, (None, None))
+        # Only drop entries that still point to this event
+        if getattr(self._by_thread.get(thread_id), "event_id", None) == event_id:
+            del self._by_thread[thread_id]
+        if getattr(self._by_message.get(message_id), "event_id", None) == event_id:
+            del self._by_message[message_id]
+
+    def _commit(self, event):
+        """Records the current state of a resident event as its committed copy and marks it changed."""
+        event.version += 1
+        self._copies[event.event_id] = event.to_dict()
+        self._changed.add(event.event_id)
+        self._notify(event.event_id, event)
+
+    def add_listener(self, listener):
+        """
+        Registers listener(event_id, event), called after every commit of an event
+        and with event=None after its removal, e.g. to re-arm timers.
+
+        Also called for changes merged from an external edit, but not by load():
+        listeners registered after loading start from events().
+        """
+        self._listeners.append(listener)
+
+    def _notify(self, event_id, event):
+        for listener in self._listeners:
+            try:
+                listener(event_id, event)
+            except Exception as e:
+                logger.error(f"Error in event store listener {listener!r} for event {event_id}: {e}")
+
+    def _ensure_loaded(self):
+        if not self.loaded:
+            self.load()
+
+    def events(self, include_expired=False, include_cleaned=False):
+        """
+        Returns the resident events filtered by status.
+
+        Args:
+            include_expired: Also return events that are no longer active (expired, canceled)
+            include_cleaned: Return all events including those with status "cleaned"
+        """
+        self._ensure_loaded()
+        if include_cleaned:
+            return list(self._events.values())
+        if include_expired:
+            return [e for e in self._events.values() if e.status != "cleaned"]
+        now = datetime.now(timezone.utc)
+        return [e for e in self._events.values() if self.effective_status(e, now) == "active"]
+
+    @staticmethod
+    def effective_status(event, now=None):
+        """The event's status including a pending, not yet persisted expiry."""
+        if event.status == "active" and event_has_expired(event, now):
+            return "expired"
+        return event.status
+
+    def find_by_thread(self, thread_id, include_cleaned=False):
+        """Returns the event belonging to a thread, or None."""
+        self._ensure_loaded()
+        event = self._by_thread.get(_to_int(thread_id))
+        if event is None or (event.status == "cleaned" and not include_cleaned):
+            return None
+        return event
+
+    def find_by_message(self, message_id, include_cleaned=False):
+        """Returns the event whose post is the given message, or None."""
+        self._ensure_loaded()
+        event = self._by_message.get(_to_int(message_id))
+        if event is None or (event.status == "cleaned" and not include_cleaned):
+            return None
+        return event
+
+    def find_by_title(self, title):
+        """Fallback lookup by title for events stored without a thread_id (linear scan)."""
+        return next((e for e in self.events(include_expired=True) if e.title == title), None)
+
+    def find_by_id(self, event_id):
+        self._ensure_loaded()
+        return self._events.get(event_id)
+
+    def expire_events(self, event_ids=None):
+        """
+        Marks events that started more than an hour ago as expired in memory. Returns the number of changes.
+
+        With event_ids only those events are checked (e.g. the ones whose expiry deadline came).
+        """
+        self._ensure_loaded()
+        now = datetime.now(timezone.utc)
+        expired = 0
+        if event_ids is None:
+            candidates = list(self._events.values())
+        else:
+            candidates = [self._events[event_id] for event_id in event_ids if event_id in self._events]
+        for event in candidates:
+            if event.status == "active" and event_has_expired(event, now):
+                event.status = "expired"
+                self._commit(event)
+                expired += 1
+                logger.info(f"Event expired (UTC): {event.title} (Started: {event.datetime_obj}, Current: {now})")
+        if expired > 0:
+            logger.info(f"Marked {expired} events as expired")
+        return expired
+
+    def flush_status_changes(self):
+        """Applies pending expiries and persists them. Writes only if a status actually changed."""
+        changed = self.expire_events()
+        if changed:
+            self.save()
+        return changed
+
+    async def aflush_status_changes(self, event_ids=None):
+        """Awaitable flush_status_changes(), optionally limited to some events (see expire_events)."""
+        changed = self.expire_events(event_ids)
+        if changed:
+            await self.asave()
+        return changed
+
+    def upsert(self, event):
+        """
+        Inserts an event or commits a change to a resident one, identified by its event_id.
+
+        Committing a different Event object than the resident one is a
+        compare-and-swap: it only succeeds if the object was based on the current
+        version, otherwise ConcurrentUpdateError is raised. Stored dicts (e.g.
+        restored backups) are migrated, converted to an Event and always replace
+        the resident one. Every commit increases the event's version.
+        Returns the Event that is now held by the store.
+        """
+        self._ensure_loaded()
+
+        external = isinstance(event, dict)
+        if external:
+            # Storage boundary: events from outside the store may still use an older schema
+            migrate_event(event)
+            event = Event.from_dict(event)
+
+        # If no event_id is present, generate one
+        if not event.event_id:
+            timestamp = datetime.now().strftime("%Y%m%d%H%M")
+            random_string = str(uuid.uuid4())[:8]
+            event.event_id = f"{timestamp}-{random_string}"
+            logger.info(f"Generated new event_id: {event.event_id} for event: {event.title}")
+
+        self._removed.discard(event.event_id)
+
+        # The event_id is the unique identifier
+        current = self._events.get(event.event_id)
+        if current is not None:
+            if external:
+                # Restored data replaces the event deliberately, whatever its stored version
+                event.version = current.version
+            elif current is not event and event.version != current.version:
+                raise ConcurrentUpdateError(
+                    f"Event {event.event_id} is at version {current.version}, commit was based on {event.version}")
+            self._events[event.event_id] = event
+            self._index(event)
+            self._commit(event)
+            return event
+
+        # Stelle sicher, dass neue Events immer den Status "active" haben
+        if event.status != "active":
+            logger.info(f"Ensuring new event '{event.title}' has status 'active' instead of '{event.status}'")
+            event.status = "active"
+        logger.info(f"Adding new event: {event.title} with ID: {event.event_id}")
+        self._events[event.event_id] = event
+        self._index(event)
+        self._commit(event)
+        return event
+
+    def remove(self, event_ids):
+        """Drops the events with the given IDs from the store. Returns the number removed."""
+        self._ensure_loaded()
+        event_ids = set(event_ids)
+        removed = 0
+        for event_id in event_ids:
+            if self._events.pop(event_id, None) is not None:
+                self._unindex(event_id)
+                self._copies.pop(event_id, None)
+                removed += 1
+                self._notify(event_id, None)
+        self._removed.update(event_ids)
+        self._changed.difference_update(event_ids)
+        return removed
+
+    async def amutate(self, event_id, mutator, retries=MUTATION_RETRIES):
+        """
+        Applies mutator to a private working copy of an event and commits it with compare-and-swap.
+
+        mutator(event) gets an Event built from the committed state and may be a
+        coroutine function. It must only change the event it is given: if another
+        commit to the same event happens while it runs, its work is discarded and
+        it runs again on the new state. Side effects such as messages belong after
+        amutate() returns. A mutation that changes nothing is not committed.
+
+        The working copy is committed into the resident Event object, so references
+        held elsewhere stay valid and see the change.
+
+        Returns (event, result): the resident event and the mutator's return value.
+        Raises KeyError for unknown events and ConcurrentUpdateError if every
+        attempt lost against another commit.
+        """
+        self._ensure_loaded()
+        for attempt in range(1 + retries):
+            base = self._copies.get(event_id)
+            if base is None:
+                raise KeyError(event_id)
+            work = Event.from_dict(base)
+            result = mutator(work)
+            if inspect.isawaitable(result):
+                result = await result
+            current = self._events.get(event_id)
+            if current is None:
+                raise KeyError(event_id)
+            # Compare-and-swap: only commit if nobody committed since the copy was taken
+            if current.version == work.version:
+                if work.to_dict() != base:
+                    current.update_from(work)
+                    self._index(current)
+                    self._commit(current)
+                return current, result
+            logger.info(f"Event {event_id} changed during a mutation, retrying ({attempt + 1}/{retries})")
+        raise ConcurrentUpdateError(f"Event {event_id} kept changing, gave up after {1 + retries} attempts")
+
+    async def aarchive(self, event_ids):
+        """
+        Moves events from the live store into the cold archive. Returns the number moved.
+
+        The events are appended to the archive before they are removed and the
+        removal is saved, so a crash in between leaves them in both places rather
+        than in neither.
+        """
+        self._ensure_loaded()
+        events = [self._copies[event_id] for event_id in event_ids if event_id in self._copies]
+        if not events:
+            return 0
+        await self.run_io(self.archive.append, events)
+        removed = self.remove(e["event_id"] for e in events)
+        await self.asave()
+        return removed
+
+    def snapshot(self):
+        """
+        Returns the committed stored form of all events as a consistent point-in-time view.
+
+        The dicts are shared, not copied: the store never modifies them, so the
+        snapshot may be read on any thread while handlers keep mutating events.
+        """
+        self._ensure_loaded()
+        return list(self._copies.values())
+
+    def _take_pending(self):
+        # Called on the owning thread: copies the events and resets the dirty sets
+        events = self.snapshot()
+        changed, removed = set(self._changed), set(self._removed)
+        self._changed.clear()
+        self._removed.clear()
+        return events, changed, removed
+
+    def _restore_pending(self, changed, removed):
+        # A failed write keeps its events dirty so the next save retries them
+        self._changed.update(changed)
+        self._removed.update(removed - self._events.keys())
+
+    def _write(self, events, changed, removed, compact=False):
+        """
+        Runs on the I/O thread.
+
+        Refuses to write (returns False) if the files were changed from outside
+        since they were last read; the caller reloads and retries.
+        """
+        if self.read_only:
+            logger.error("The event store was loaded read-only - not writing")
+            return False
+        try:
+            with self.lock.hold():
+                if self.changed_on_disk():
+                    logger.warning("Events were changed outside the bot - reloading before saving")
+                    return False
+                try:
+                    self.backend.save(events, changed, removed)
+                    logger.info(f"Successfully saved events ({self.backend.name}), total events: {len(events)}")
+                except Exception as e:
+                    logger.error(f"Error saving events: {e}")
+                    return False
+                try:
+                    if compact or (self._rewrite_all and hasattr(self.backend, "compact")):
+                        self.backend.compact(events)
+                    self._rewrite_all = False
+                    return True
+                except Exception as e:
+                    logger.error(f"Error compacting event journal: {e}")
+                    return False
+                finally:
+                    self._disk_state = self._fingerprint()
+        except OSError as e:
+            logger.error(f"Could not lock {self.lock.path}: {e}")
+            return False
+
+    def _compact(self, events, changed, removed):
+        """Runs on the I/O thread."""
+        return self._write(events, changed, removed, compact=True)
+
+    def compact(self):
+        """Folds a mutation journal into a new snapshot (no-op for backends without journal)."""
+        if not hasattr(self.backend, "compact"):
+            return False
+        # Pending changes must be in the journal before it is folded
+        events, changed, removed = self._take_pending()
+        if not self.executor.submit(self._compact, events, changed, removed).result():
+            self._restore_pending(changed, removed)
+            return False
+        return True
+
+    async def acompact(self):
+        """Awaitable compact()."""
+        if not hasattr(self.backend, "compact"):
+            return False
+        events, changed, removed = self._take_pending()
+        if not await self.run_io(self._compact, events, changed, removed):
+            self._restore_pending(changed, removed)
+            return False
+        return True
+
+    def request_save(self):
+        """
+        Persists the store now, or defers it to the next flush() in write-behind mode.
+
+        Inside a running event loop the write is scheduled on the I/O thread
+        instead of blocking the caller. Returns True if the changes were written or queued.
+        """
+        if self.write_behind and len(self._changed) + len(self._removed) < self.max_pending:
+            return True
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return self.save()
+        if self._pending_flush is not None and not self._pending_flush.done():
+            # The running flush may have copied the events before this change
+            self._flush_again = True
+        else:
+            self._pending_flush = asyncio.ensure_future(self._flush_pending())
+        return True
+
+    async def _flush_pending(self):
+        self._flush_again = True
+        while self._flush_again:
+            self._flush_again = False
+            await self.aflush()
+
+    def flush(self):
+        """Writes pending changes, if any. Returns True if nothing was left unwritten."""
+        if not self.dirty:
+            return True
+        return self.save()
+
+    async def aflush(self):
+        """Awaitable flush()."""
+        if not self.dirty:
+            return True
+        return await self.asave()
+
+    def save(self):
+        """
+        Persists the whole store to disk as it is and waits for the write.
+
+        Role counts are maintained by upsert() and status changes by
+        flush_status_changes(); saving does not modify any event.
+        """
+        for attempt in range(2):
+            events, changed, removed = self._take_pending()
+            if self.executor.submit(self._write, events, changed, removed).result():
+                return True
+            self._restore_pending(changed, removed)
+            # Only an external edit is worth an immediate retry, after merging it
+            if attempt or not self.reload_if_changed():
+                return False
+        return False
+
+    async def asave(self):
+        """Awaitable save(); the event loop keeps running while the I/O thread writes."""
+        for attempt in range(2):
+            events, changed, removed = self._take_pending()
+            if await self.run_io(self._write, events, changed, removed):
+                return True
+            self._restore_pending(changed, removed)
+            if attempt or not await self.areload_if_changed():
+                return False
+        return False
@@ -5,15 +5,16 @@ import os
 from datetime import datetime, time, timedelta, timezone
 import json
 import logging
-import uuid  # For generating random IDs
 from discord.ext import tasks
 import asyncio
 import sys
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
-import glob
-import copy
 import re
-from zoneinfo import ZoneInfo
+from event_store import (BackupRepository, EventStore, MessageLedger, atomic_write_json, configure_serializer,
+                         create_backend, event_start, expiry_deadline)
+from models import (FILLALL_ALIASES, FILLALL_ROLE, Event, Participant, calculate_role_counts, format_local_datetime,
+                    format_reminder_offset, local_to_utc, parse_duration, parse_reminder_offsets)
+from scheduler import DeadlineScheduler
 
 """
 LANGUAGE POLICY:
@@ -76,7 +77,61 @@ load_dotenv()
 DISCORD_TOKEN = os.getenv("DISCORD_TOKEN")
 AUTHORIZED_GUILD_ID = int(os.getenv("AUTHORIZED_GUILD_ID", "0"))  # Default to 0 if not set
 CHANNEL_ID_EVENT = int(os.getenv("CHANNEL_ID_EVENT"))
-EVENTS_JSON_FILE = "events.json"
+
+# Resident event store - the single source of truth for all event data
+# Data files are written compact with orjson if available; EVENTIFY_PRETTY_JSON=1 indents them for debugging
+configure_serializer(
+    os.getenv("EVENTIFY_SERIALIZER", "auto"),
+    pretty=os.getenv("EVENTIFY_PRETTY_JSON", "0").lower() in ("1", "true", "yes", "on"),
+)
+
+# Mutations are appended to a journal and folded into the snapshot from time to time
+# (EVENTIFY_JOURNAL=0 rewrites the snapshot on every save instead)
+EVENTIFY_JOURNAL = os.getenv("EVENTIFY_JOURNAL", "1").lower() not in ("0", "false", "no", "off")
+# Write-behind: changes are flushed at most once per interval (0 writes every change immediately)
+# or as soon as EVENTIFY_FLUSH_MAX_PENDING events are dirty
+EVENTIFY_FLUSH_INTERVAL = float(os.getenv("EVENTIFY_FLUSH_INTERVAL", "2"))
+# How often the event files are checked for external edits (one stat per file)
+EVENTIFY_RELOAD_CHECK_INTERVAL = float(os.getenv("EVENTIFY_RELOAD_CHECK_INTERVAL", "2"))
+# Automatic reminders before every event, e.g. "24h,30m" (empty: none); /reminders overrides them per event
+try:
+    DEFAULT_REMINDERS = parse_reminder_offsets(os.getenv("EVENTIFY_REMINDERS", ""))
+except ValueError as e:
+    logger.error(f"Invalid EVENTIFY_REMINDERS, automatic reminders disabled: {e}")
+    DEFAULT_REMINDERS = []
+# Reminder DMs sent at the same time (stays well below Discord's rate limits)
+REMINDER_DM_CONCURRENCY = 5
+EVENTIFY_FLUSH_MAX_PENDING = int(os.getenv("EVENTIFY_FLUSH_MAX_PENDING", "50"))
+store = EventStore(
+    create_backend(os.getenv("EVENTIFY_STORAGE", "json"), journal=EVENTIFY_JOURNAL),
+    write_behind=EVENTIFY_FLUSH_INTERVAL > 0,
+    max_pending=EVENTIFY_FLUSH_MAX_PENDING,
+)
+# Incremental backups: only changed events are written, unchanged runs write nothing
+backups = BackupRepository()
+# Messages the bot posted in the event channel; they are deleted on schedule instead of crawling the history
+ledger = MessageLedger()
+# How long the bot's messages stay in the event channel (event posts at least while their event is active)
+MESSAGE_RETENTION = timedelta(days=1)
+# Delay before a failed deletion is tried again
+MESSAGE_DELETE_RETRY = timedelta(minutes=15)
+# Older channel history read per cleanup run until all of it is classified
+HISTORY_BACKFILL_LIMIT = 1000
+# Event threads are closed this long after the event start; parts add up, e.g. "1h 30m" (aus: never).
+# The default is 30 minutes after the event expired, so signups in the thread work until then
+try:
+    THREAD_CLEANUP_MINUTES = parse_duration(os.getenv("EVENTIFY_THREAD_CLEANUP", "90m"))
+    THREAD_CLEANUP_DELAY = timedelta(minutes=THREAD_CLEANUP_MINUTES) if THREAD_CLEANUP_MINUTES else None
+except ValueError as e:
+    logger.error(f"Invalid EVENTIFY_THREAD_CLEANUP, using 90 minutes: {e}")
+    THREAD_CLEANUP_DELAY = timedelta(minutes=90)
+# "archive" archives and locks the thread (history stays readable), "delete" removes it
+THREAD_CLEANUP_ACTION = os.getenv("EVENTIFY_THREAD_CLEANUP_ACTION", "archive").lower()
+if THREAD_CLEANUP_ACTION not in ("archive", "delete"):
+    logger.error(f"Invalid EVENTIFY_THREAD_CLEANUP_ACTION {THREAD_CLEANUP_ACTION!r}, archiving threads instead")
+    THREAD_CLEANUP_ACTION = "archive"
+# Delay before a failed thread cleanup is tried again
+THREAD_CLEANUP_RETRY = timedelta(minutes=15)
 
 # Set up proper intents
 intents = discord.Intents.default()
@@ -84,86 +139,62 @@ intents.guilds = True  # Important for slash command sync
 intents.messages = True  # Allow the bot to see messages
 intents.message_content = True  # Allow the bot to read message content
 
-# Definiere europäische Zeitzone (CET/CEST)
-EUROPE_BERLIN = ZoneInfo("Europe/Berlin")
-
-# UTC conversion helper functions
-def local_to_utc(local_dt, is_date_time_string=False, date_str=None, time_str=None):
-    """
-    Konvertiert CET/CEST zu UTC mit korrekter Behandlung von Sommer/Winterzeit
-    
-    Args:
-        local_dt: Lokales Datetime-Objekt oder None wenn Strings verwendet werden
-        is_date_time_string: True wenn separate Datums- und Zeitstrings verwendet werden
-        date_str: Datumsstring im Format "DD.MM.YYYY" oder "DDMMYYYY"
-        time_str: Zeitstring im Format "HH:MM" oder "HHMM"
-    """
-    # Bei Verwendung von Strings für Datum/Zeit (über Slash-Befehle oder Modal)
-    if is_date_time_string and date_str and time_str:
-        try:
-            # Parse date (format: DD.MM.YYYY or DDMMYYYY)
-            if "." in date_str:
-                day, month, year = map(int, date_str.split("."))
-            else:
-                day = int(date_str[:2])
-                month = int(date_str[2:4])
-                year = int(date_str[4:])
-            
-            # Parse time (format: HH:MM or HHMM)
-            if ":" in time_str:
-                hour, minute = map(int, time_str.split(":"))
-            else:
-                hour = int(time_str[:2])
-                minute = int(time_str[2:])
-            
-            # Erstelle Datetime mit Europe/Berlin Zeitzone
-            # Dies berücksichtigt automatisch, ob das Datum in Sommer- oder Winterzeit fällt
-            local_dt = datetime(year, month, day, hour, minute, tzinfo=EUROPE_BERLIN)
-            logger.info(f"Converted local time {local_dt} (Europe/Berlin) to UTC")
-            return local_dt.astimezone(timezone.utc)
-        except Exception as e:
-            logger.error(f"Error converting date/time strings to UTC: {e}")
-            return None
-    
-    # Bei Verwendung eines vorhandenen Datetime-Objekts
-    if local_dt:
-        if local_dt.tzinfo is None:
-            # Setze Zeitzone auf Europe/Berlin
-            local_dt = local_dt.replace(tzinfo=EUROPE_BERLIN)
-        return local_dt.astimezone(timezone.utc)
-    
-    return None
-
-def utc_to_local(utc_dt):
-    """Konvertiert UTC zu CET/CEST basierend auf dem Datum"""
-    if utc_dt is None:
-        return None
-        
-    if utc_dt.tzinfo is None:
-        utc_dt = utc_dt.replace(tzinfo=timezone.utc)
-    
-    # Konvertiere nach Europe/Berlin, berücksichtigt automatisch DST
-    return utc_dt.astimezone(EUROPE_BERLIN)
-
-def format_local_datetime(utc_dt):
-    """Formatiert UTC-Zeit zur lokalen Anzeige in CET/CEST"""
-    local_dt = utc_to_local(utc_dt)
-    if local_dt is None:
-        return {
-            "date": None,
-            "time": None,
-            "datetime": None
-        }
-    return {
-        "date": local_dt.strftime("%d.%m.%Y"),
-        "time": local_dt.strftime("%H:%M"),
-        "datetime": local_dt
-    }
-
 class MyBot(discord.Client):
     def __init__(self):
         super().__init__(intents=intents)
         self.tree = app_commands.CommandTree(self)
+        # Sleeps until the next active event reaches start + 1h instead of polling
+        self.expiry_scheduler = DeadlineScheduler(self.expire_due_events, name="expiry")
+        # One scheduler for all automatic reminders, keyed (event_id, minutes before start)
+        self.reminder_scheduler = DeadlineScheduler(self.send_due_reminders, name="reminders")
+        self._armed_reminders = {}  # event_id -> scheduled reminder keys
+        # Deletes each recorded bot message when it reaches its retention age
+        self.message_scheduler = DeadlineScheduler(self.delete_due_messages, name="messages")
+        # Archives or deletes event threads after the event, keyed by thread ID
+        self.thread_scheduler = DeadlineScheduler(self.close_due_threads, name="threads")
+
+    async def setup_hook(self):
+        """Called once before connecting - loads the event store into memory"""
+        await store.aload()
+        # Events migrated to the current schema during load are written once
+        await store.aflush()
+        # Every commit re-arms the expiry of its event (created, canceled, rescheduled)
+        store.add_listener(self.arm_expiry)
+        store.add_listener(self.arm_reminders)
+        store.add_listener(self.arm_message_cleanup)
+        store.add_listener(self.arm_thread_cleanup)
+        await store.run_io(ledger.load)
+        for event in store.events(include_cleaned=True):
+            self.arm_expiry(event.event_id, event)
+            self.arm_reminders(event.event_id, event)
+            self.arm_message_cleanup(event.event_id, event)
+            self.arm_thread_cleanup(event.event_id, event)
+        for message_id, _ in ledger.items():
+            self.arm_message(message_id)
+        # Without write-behind the loop only watches for external edits
+        interval = EVENTIFY_FLUSH_INTERVAL if store.write_behind else EVENTIFY_RELOAD_CHECK_INTERVAL
+        self.flush_event_store.change_interval(seconds=interval)
+        self.flush_event_store.start()
+
+    async def close(self):
+        """Writes pending changes and folds the mutation journal into the snapshot before shutting down"""
+        self.flush_event_store.cancel()
+        self.expiry_scheduler.stop()
+        self.reminder_scheduler.stop()
+        self.message_scheduler.stop()
+        self.thread_scheduler.stop()
+        await store.aflush()
+        await store.acompact()
+        await super().close()
+
+    @tasks.loop(seconds=2)
+    async def flush_event_store(self):
+        """
+        Picks up external edits of the event files and writes all changes collected
+        since the last run at once (write-behind)
+        """
+        await store.areload_if_changed()
+        await store.aflush()
 
     async def on_ready(self):
         """Called when the bot is online"""
@@ -208,11 +239,9 @@ class MyBot(discord.Client):
         try:
             # Überprüfe Ereignisse sofort
             logger.info("Checking for expired events at startup...")
-            events_data = load_upcoming_events(include_expired=True, include_cleaned=False)
-            updated_data = clean_old_events(events_data)
+            await store.aflush_status_changes()
             
-            # Speichern und Übersicht aktualisieren
-            save_events_to_json(updated_data)
+            # Übersicht aktualisieren
             
             # Aktualisiere die Eventübersicht in allen Guilds
             for guild in self.guilds:
@@ -222,8 +251,11 @@ class MyBot(discord.Client):
         except Exception as e:
             logger.error(f"Error during initial event cleanup: {e}")
         
-        # Start the loops
-        self.check_expired_events.start()
+        # Start the loops; deadlines that passed while the bot was offline are due immediately
+        self.expiry_scheduler.start()
+        self.reminder_scheduler.start()
+        self.message_scheduler.start()
+        self.thread_scheduler.start()
         self.cleanup_event_channel.start()  # New loop added
 
     async def on_message(self, message):
@@ -243,13 +275,8 @@ class MyBot(discord.Client):
 
             thread_id = message.channel.id
             
-            # Load events from JSON (auch abgelaufene Events einschließen, damit Anmeldungen nach Eventstart möglich sind)
-            events_data = load_upcoming_events(include_expired=True)
-            if not events_data or "events" not in events_data:
-                return
-                
-            # Find the event for this thread
-            event = next((e for e in events_data["events"] if str(e.get('thread_id')) == str(thread_id)), None)
+            # Find the event for this thread (auch abgelaufene Events einschließen, damit Anmeldungen nach Eventstart möglich sind)
+            event = store.find_by_thread(thread_id)
             
             if not event:
                 return
@@ -257,7 +284,7 @@ class MyBot(discord.Client):
             # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
             try:
                 # Event-Zeit direkt aus datetime_obj verwenden
-                event_dt = datetime.fromisoformat(event.get('datetime_obj'))
+                event_dt = event.datetime_obj
                 now = datetime.now(timezone.utc)
                 
                 # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, keine Zahlenanmeldungen mehr zulassen
@@ -266,16 +293,16 @@ class MyBot(discord.Client):
                     if message.content.strip().isdigit() or (message.content.strip() and message.content.strip()[0].isdigit()):
                         await message.add_reaction('❌')  # Zeitsymbol als Reaktion
                         await message.add_reaction('⏱️')  # Zeitsymbol als Reaktion
-                        await message.author.send(f"Anmeldungen für das Event **{event.get('title')}** sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
-                        logger.info(f"Blocked registration from {message.author.name} - event {event.get('title')} started more than 1 hour ago")
+                        await message.author.send(f"Anmeldungen für das Event **{event.title}** sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
+                        logger.info(f"Blocked registration from {message.author.name} - event {event.title} started more than 1 hour ago")
                         return
                     
                     # Für Abmeldungen (- oder -X) ebenfalls blockieren
                     if message.content.strip() == '-' or (message.content.strip().startswith('-') and message.content.strip()[1:].isdigit()):
                         await message.add_reaction('❌')  # Zeitsymbol als Reaktion
                         await message.add_reaction('⏱️')  # Zeitsymbol als Reaktion
-                        await message.author.send(f"Abmeldungen für das Event **{event.get('title')}** sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
-                        logger.info(f"Blocked unregistration from {message.author.name} - event {event.get('title')} started more than 1 hour ago")
+                        await message.author.send(f"Abmeldungen für das Event **{event.title}** sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
+                        logger.info(f"Blocked unregistration from {message.author.name} - event {event.title} started more than 1 hour ago")
                         return
             except Exception as e:
                 logger.error(f"Error checking event time for registration limit: {e}")
@@ -283,370 +310,231 @@ class MyBot(discord.Client):
 
             # Process role signup (single digit number)
             if message.content.strip().isdigit():
-                await self._handle_role_signup(message, event['title'], int(message.content))
+                await self._handle_role_signup(message, event, int(message.content))
                 
             # Process role signup with comment (number followed by text)
             elif message.content.strip() and message.content.strip()[0].isdigit():
                 # Extract the number part
                 parts = message.content.strip().split(' ', 1)
                 if parts[0].isdigit():
-                    await self._handle_role_signup(message, event['title'], int(parts[0]))
+                    await self._handle_role_signup(message, event, int(parts[0]))
                 
             # Process role unregister
             elif message.content.strip() == '-':
-                await self._handle_unregister(message)
+                await self._handle_unregister(message, event)
                 
             # Process specific role unregister (e.g., "-2" to unregister from role 2)
             elif message.content.strip().startswith('-') and message.content[1:].isdigit():
                 role_number = int(message.content[1:])
-                await self._handle_unregister(message, is_specific_role=True, role_number=role_number)
+                await self._handle_unregister(message, event, is_specific_role=True, role_number=role_number)
                 
         except Exception as e:
             logger.error(f"Error in on_message: {e}")
             logger.exception("Full traceback:")
 
-    async def _handle_role_signup(self, message, event_title, role_number):
+    async def _handle_role_signup(self, message, event, role_number):
+        """Handles a role number posted in an event thread (event is already resolved by on_message)."""
         try:
             # Zunächst Standard-Berechnung
             visual_role_number = role_number
             
-            # Load events from JSON (auch abgelaufene Events einschließen, damit Anmeldungen nach Eventstart möglich sind)
-            events_data = load_upcoming_events(include_expired=True)
-            logger.info(f"Loaded events data from JSON")
-            
-            # First try to find the event by thread_id (most reliable)
-            thread_id = message.channel.id
-            event = next((e for e in events_data["events"] if e.get('thread_id') == thread_id), None)
-            
-            # Fallback: try to find by title (for backwards compatibility)
-            if not event:
-                event = next((e for e in events_data["events"] if e.get('title') == event_title), None)
+            # Prüfe, ob das Event abgesagt wurde
+            if event.status == "canceled" or "[ABGESAGT]" in event.title:
+                await message.add_reaction('❌')
+                await message.author.send(f"Dieses Event wurde bereits abgesagt. Anmeldungen sind nicht mehr möglich.")
+                return
             
-            if event:
-                # Prüfe, ob das Event abgesagt wurde
-                if event.get('status') == "canceled" or "[ABGESAGT]" in event.get('title', ''):
+            # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
+            try:
+                # Event-Zeit direkt aus datetime_obj verwenden
+                event_dt = event.datetime_obj
+                now = datetime.now(timezone.utc)
+                
+                # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Anmeldungen blockieren
+                if now > event_dt + timedelta(hours=1):
+                    # Benutzer informieren
                     await message.add_reaction('❌')
-                    await message.author.send(f"Dieses Event wurde bereits abgesagt. Anmeldungen sind nicht mehr möglich.")
+                    await message.author.send(f"Anmeldungen sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
+                    logger.info(f"Blocked role signup from {message.author.name} - event {event.title} started more than 1 hour ago")
                     return
+            except Exception as e:
+                logger.error(f"Error checking event time for role signup: {e}")
+                # Im Fehlerfall Anmeldung trotzdem erlauben
+            
+            # Berechne den korrekten Rollenindex unter Berücksichtigung der Überschriften
+            role_index = -1
+            header_count = 0
+            
+            for i, role in enumerate(event.roles):
+                # Überschriften in Klammern überspringen
+                if role.startswith('(') and role.endswith(')'):
+                    header_count += 1
+                    continue
                 
-                # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
-                try:
-                    # Event-Zeit direkt aus datetime_obj verwenden
-                    event_dt = datetime.fromisoformat(event.get('datetime_obj'))
-                    now = datetime.now(timezone.utc)
-                    
-                    # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Anmeldungen blockieren
-                    if now > event_dt + timedelta(hours=1):
-                        # Benutzer informieren
-                        await message.add_reaction('❌')
-                        await message.author.send(f"Anmeldungen sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
-                        logger.info(f"Blocked role signup from {message.author.name} - event {event.get('title')} started more than 1 hour ago")
-                        return
-                except Exception as e:
-                    logger.error(f"Error checking event time for role signup: {e}")
-                    # Im Fehlerfall Anmeldung trotzdem erlauben
+                # Zählen der normalen Rollen
+                if (i - header_count + 1) == visual_role_number:
+                    role_index = i
+                    break
+            
+            if role_index == -1:
+                logger.warning(f"Invalid role number: {visual_role_number}. Event has {len(event.roles) - header_count} roles.")
+                await message.channel.send(f"Ungültige Rollennummer: {visual_role_number}. Das Event hat {len(event.roles) - header_count} Rollen.", delete_after=10)
+                return
+            
+            logger.info(f"Found matching event: {event.title} (ID: {event.event_id})")
+            
+            # Check if we're in participant_only_mode
+            is_participant_only = event.participant_only_mode
+            
+            # Check if this is the FILLALL role by name instead of position
+            is_fill_role = event.roles[role_index] == FILLALL_ROLE
+            
+            # In participant_only_mode, treat the participant role like Fill (but NOT like FillALL)
+            # This allows comments in participant_only_mode
+            if is_participant_only:
+                is_fill_role = True
+                # Don't set FillALL to allow comments
+                is_fillall_role = False
+            
+            if 0 <= role_index < len(event.roles):
+                role_name = event.roles[role_index]
+                player_name = message.author.name
+                player_id = str(message.author.id)
+                current_time = datetime.now().timestamp()  # For sorting by signup time
+
+                # Extract optional comment if any
+                # Look for the first space after the role number
+                if ' ' in message.content:
+                    # The comment is everything after the first space
+                    comment = message.content.split(' ', 1)[1].strip()
+                    # Remove all @ characters from comments
+                    comment = comment.replace('@', '')
+                    logger.info(f"Extracted comment: '{comment}'")
+                else:
+                    comment = ""
                 
-                # Berechne den korrekten Rollenindex unter Berücksichtigung der Überschriften
-                role_index = -1
-                header_count = 0
+                logger.info(f"Assigning {player_name} to role {role_name} at index {role_index} with comment: {comment}")
                 
-                for i, role in enumerate(event['roles']):
-                    # Überschriften in Klammern überspringen
-                    if role.startswith('(') and role.endswith(')'):
-                        header_count += 1
-                        continue
-                    
-                    # Zählen der normalen Rollen
-                    if (i - header_count + 1) == visual_role_number:
-                        role_index = i
-                        break
-                
-                if role_index == -1:
-                    logger.warning(f"Invalid role number: {visual_role_number}. Event has {len(event['roles']) - header_count} roles.")
-                    await message.channel.send(f"Ungültige Rollennummer: {visual_role_number}. Das Event hat {len(event['roles']) - header_count} Rollen.", delete_after=10)
-                    return
+                # Participants are keyed by the role's stable ID, which also handles duplicate role names
+                role_key = event.role_key(role_index)
                 
-                logger.info(f"Found matching event: {event['title']} (ID: {event.get('event_id', 'unknown')})")
-                
-                # Check if we're in participant_only_mode
-                is_participant_only = event.get('participant_only_mode', False)
-                
-                # Check if this is the "Fill" role by name instead of position
-                is_fill_role = False
-                if 0 <= role_index < len(event['roles']):
-                    is_fill_role = event['roles'][role_index].lower() == "fill" or event['roles'][role_index].lower() == "fillall"
-                
-                # In participant_only_mode, treat the participant role like Fill (but NOT like FillALL)
-                # This allows comments in participant_only_mode
-                if is_participant_only:
-                    is_fill_role = True
-                    # Don't set FillALL to allow comments
-                    is_fillall_role = False
-                
-                if 0 <= role_index < len(event['roles']):
-                    role_name = event['roles'][role_index]
-                    player_name = message.author.name
-                    player_id = str(message.author.id)
-                    current_time = datetime.now().timestamp()  # For sorting by signup time
-
-                    # Extract optional comment if any
-                    # Look for the first space after the role number
-                    if ' ' in message.content:
-                        # The comment is everything after the first space
-                        comment = message.content.split(' ', 1)[1].strip()
-                        # Remove all @ characters from comments
-                        comment = comment.replace('@', '')
-                        logger.info(f"Extracted comment: '{comment}'")
-                    else:
-                        comment = ""
-                    
-                    logger.info(f"Assigning {player_name} to role {role_name} at index {role_index} with comment: {comment}")
+                is_fillall_role = is_fill_role and not is_participant_only
+                
+                def apply_signup(work):
+                    """Signs the player up on a working copy of the event; returns (outcome, details)."""
+                    # Check if player is already signed up for this role
+                    existing_data = work.find_participant(role_key, player_id)
+                    if existing_data is not None:
+                        # If comment is different or provided when none existed before, update it
+                        if comment != existing_data.comment:
+                            work.add_participant(role_key, existing_data._replace(comment=comment))
+                            return "comment_updated", None
+                        return "unchanged", None
                     
-                    # Initialize participants dict if needed
-                    if 'participants' not in event:
-                        event['participants'] = {}
-                        
-                    # Use role_index as part of the key for participants to handle duplicate role names
-                    role_key = f"{role_index}:{role_name}"
+                    # For Fill role, no limit on players and can be added even if already registered for another role
+                    if is_fillall_role:
+                        # Remove the player from all other roles, FILLALL replaces them
+                        left_roles = [work.role_name(r_key) for r_key in work.remove_user(player_id)]
+                        # Limit comment to 30 characters for FILLALL roles
+                        fill_comment = comment[:30] + "..." if len(comment) > 30 else comment
+                        work.add_participant(role_key, Participant(player_name, player_id, current_time, fill_comment))
+                        return "fillall_added", left_roles
+                    if is_fill_role:
+                        # participant_only_mode: add new entry with timestamp and comment
+                        work.add_participant(role_key, Participant(player_name, player_id, current_time, comment))
+                        return "fill_added", None
                     
-                    if role_key not in event['participants']:
-                        event['participants'][role_key] = []
+                    # Check if player is already signed up for another role (except FILLALL)
+                    fillall_key = work.fillall_key
+                    previous_key = next(iter(work.roles_of(player_id) - {fillall_key}), None)
                     
-                    # Check if player is already signed up for this role
-                    existing_entry = next((i for i, entry in enumerate(event['participants'][role_key]) 
-                                         if entry[1] == player_id), None)
+                    # Check if role already has participants (except for Fill roles)
+                    holders = work.participants.get(role_key)
+                    if holders:
+                        return "taken", (holders[0], previous_key is not None)
                     
-                    if existing_entry is not None:
-                        # Player is already signed up, update comment if provided
-                        existing_data = event['participants'][role_key][existing_entry]
-                        existing_comment = existing_data[3] if len(existing_data) > 3 else None
-                        
-                        # If comment is different or provided when none existed before, update it
-                        if comment != existing_comment:
-                            # Update with comment (name, id, timestamp, comment)
-                            event['participants'][role_key][existing_entry] = (existing_data[0], existing_data[1], existing_data[2], comment)
-                            await self._update_event_and_save(message, event, events_data)
-                            await message.add_reaction('✅')  # Add confirmation reaction
-                        else:
-                            # Just acknowledge if no change in comment status
-                            logger.info(f"{player_name} already assigned to role {role_name} at index {role_index}")
-                            await message.add_reaction('ℹ️')  # Info reaction
-                            # Send a joke message as DM instead of in channel
-                            try:
-                                event_link = f"https://discord.com/channels/{message.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                                dm_message = (
-                                    f"Für die Rolle **{role_name}** bist du doch schon angemeldet, du Pappnase!\n"
-                                    f"Ändere doch wenigstens den Kommentar ;)\n"
-                                    f"Event: {event['title']}\n"
-                                    f"Datum: {event['date']}\n"
-                                    f"Uhrzeit: {event['time']}\n"
-                                    f"[Zum Event]({event_link})"
-                                )
-                                await message.author.send(dm_message)
-                            except Exception as e:
-                                logger.error(f"Failed to send DM to user {message.author.id}: {e}")
-                    else:
-                        # For Fill role, no limit on players and can be added even if already registered for another role
-                        if is_fill_role:
-                            # Check if the role is specifically FillALL (not for participant_only_mode)
-                            if not is_participant_only:
-                                is_fillall_role = event['roles'][role_index].lower() == "fillall"
-                            else:
-                                is_fillall_role = False  # In participant_only_mode we allow comments
-                            
-                            # For FillALL role
-                            if is_fillall_role:
-                                # Check if player is already signed up for another role (and remove them from it)
-                                for r_idx, r_name in enumerate(event['roles']):
-                                    # Skip FILLALL roles and headers in the check
-                                    if (r_name.lower() == "fill" or r_name.lower() == "fillall" or 
-                                        (r_name.startswith('(') and r_name.endswith(')'))):
-                                        continue
-                                    
-                                    r_key = f"{r_idx}:{r_name}"
-                                    if r_key in event.get('participants', {}):
-                                        # Find and remove the player if present
-                                        initial_count = len(event['participants'][r_key])
-                                        event['participants'][r_key] = [p for p in event['participants'][r_key] if p[1] != player_id]
-                                        if initial_count > len(event['participants'][r_key]):
-                                            logger.info(f"Removed {player_name} from role {r_name} when signing up for FILLALL")
-                                
-                                # Add player to FILLALL role
-                                if comment:
-                                    # Limit comment to 30 characters for FILLALL roles
-                                    if len(comment) > 30:
-                                        comment = comment[:30] + "..."
-                                    event['participants'][role_key].append((player_name, player_id, current_time, comment))
-                                    logger.info(f"Adding {player_name} to FillALL role with comment: '{comment}'")
-                                else:
-                                    event['participants'][role_key].append((player_name, player_id, current_time))
-                                    logger.info(f"Added {player_name} to FillALL role")
-                                
-                                # Update the event message and save to JSON
-                                await self._update_event_and_save(message, event, events_data)
-                                await message.add_reaction('✅')  # Add confirmation reaction
-                            else:
-                                # This is a regular Fill role (not FillALL) or participant_only_mode
-                                # Add new entry with timestamp and comment
-                                if comment:
-                                    event['participants'][role_key].append((player_name, player_id, current_time, comment))
-                                    logger.info(f"Adding {player_name} to role {role_name} with comment: '{comment}'")
-                                else:
-                                    event['participants'][role_key].append((player_name, player_id, current_time))
-                                
-                                logger.info(f"Added {player_name} to Fill role or participant_only_mode")
-                                
-                                # Update the event message and save to JSON
-                                await self._update_event_and_save(message, event, events_data)
-                                await message.add_reaction('✅')  # Add confirmation reaction
-                        else:
-                            # For normal roles, check if player is already signed up for FILLALL and remove them
-                            fillall_removed = False
-                            for r_idx, r_name in enumerate(event['roles']):
-                                if r_name.lower() == "fill" or r_name.lower() == "fillall":
-                                    r_key = f"{r_idx}:{r_name}"
-                                    if r_key in event.get('participants', {}):
-                                        # Find and remove the player if present
-                                        initial_count = len(event['participants'][r_key])
-                                        event['participants'][r_key] = [p for p in event['participants'][r_key] if p[1] != player_id]
-                                        if initial_count > len(event['participants'][r_key]):
-                                            logger.info(f"Removed {player_name} from FILLALL when signing up for role {role_name}")
-                                            fillall_removed = True
-                            
-                            # The rest of the normal role signup continues as before...
-                            
-                            # Check if player is already signed up for another role (except Fill)
-                            already_signed_up = False
-                            player_current_role = None
-                            player_current_role_key = None
-                            
-                            for r_idx, r_name in enumerate(event['roles']):
-                                if r_name.lower() == "fill" or r_name.lower() == "fillall":
-                                    continue  # Skip Fill and FillALL roles
-                                
-                                r_key = f"{r_idx}:{r_name}"
-                                if r_key in event.get('participants', {}):
-                                    for entry_idx, entry in enumerate(event['participants'][r_key]):
-                                        if entry[1] == player_id:
-                                            already_signed_up = True
-                                            player_current_role = r_name
-                                            player_current_role_key = r_key
-                                            player_current_entry_idx = entry_idx
-                                            break
-                                    if already_signed_up:
-                                        break
-                            
-                            if already_signed_up:
-                                # Automatically unregister from previous role
-                                logger.info(f"Automatically unregistering {player_name} from role {player_current_role}")
-                                
-                                # Check if the new role already has participants (except for Fill roles)
-                                if not is_fill_role and len(event['participants'][role_key]) > 0:
-                                    logger.info(f"Role {role_name} already has a participant, rejecting registration from {player_name}")
-                                    await message.add_reaction('ℹ️')  # Rejection reaction
-                                    # Send as DM instead of in channel
-                                    try:
-                                        event_link = f"https://discord.com/channels/{message.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                                        
-                                        # Get current role holder info
-                                        current_holder = event['participants'][role_key][0]
-                                        current_holder_id = current_holder[1]
-                                        current_holder_name = current_holder[0]
-                                        
-                                        dm_message = (
-                                            f"Nene, so geht das nicht. Die Rolle **{role_name}** hat sich bereits **{current_holder_name}** ausgesucht, du Schlingel.\n"                                            f"Event: {event['title']}\n"
-                                            f"Datum: {event['date']}\n"
-                                            f"Uhrzeit: {event['time']}\n"
-                                            f"[Zum Event]({event_link})"
-                                        )
-                                        await message.author.send(dm_message)
-                                    except Exception as e:
-                                        logger.error(f"Failed to send DM to user {message.author.id}: {e}")
-                                    return
-                                
-                                # Remove player from previous role
-                                event['participants'][player_current_role_key].pop(player_current_entry_idx)
-                                
-                                # Add player to new role
-                                if comment:
-                                    event['participants'][role_key].append((player_name, player_id, current_time, comment))
-                                else:
-                                    event['participants'][role_key].append((player_name, player_id, current_time))
-                                
-                                logger.info(f"Added {player_name} to role {role_name}")
-                                
-                                # Update the event message and save to JSON
-                                await self._update_event_and_save(message, event, events_data)
-                                await message.add_reaction('✅')  # Add confirmation reaction
-                            else:
-                                # Check if role already has participants (except for Fill roles)
-                                if len(event['participants'][role_key]) > 0:
-                                    logger.info(f"Role {role_name} already has a participant, rejecting registration from {player_name}")
-                                    await message.add_reaction('ℹ️')  # Rejection reaction
-                                    # Send as DM instead of in channel
-                                    try:
-                                        event_link = f"https://discord.com/channels/{message.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                                        
-                                        # Get current role holder info
-                                        current_holder = event['participants'][role_key][0]
-                                        current_holder_id = current_holder[1]
-                                        
-                                        
-                                        dm_message = (
-                                            f"Nene, so geht das nicht. Die Rolle **{role_name}** hat sich bereits <@{current_holder_id}> ausgesucht, du Schlingel.\n"
-                                            f"Event: {event['title']}\n"
-                                            f"Datum: {event['date']}\n"
-                                            f"Uhrzeit: {event['time']}\n"
-                                            f"[Zum Event]({event_link})"
-                                        )
-                                        await message.author.send(dm_message)
-                                    except Exception as e:
-                                        logger.error(f"Failed to send DM to user {message.author.id}: {e}")
-                                    return
-                                
-                                # Add new entry with timestamp and comment
-                                if comment:
-                                    event['participants'][role_key].append((player_name, player_id, current_time, comment))
-                                    logger.info(f"Adding {player_name} to role {role_name} with comment: '{comment}'")
-                                else:
-                                    event['participants'][role_key].append((player_name, player_id, current_time))
-                                
-                                logger.info(f"Added {player_name} to role {role_name}")
-                                
-                                # Update the event message and save to JSON
-                                await self._update_event_and_save(message, event, events_data)
-                                await message.add_reaction('✅')  # Add confirmation reaction
-                else:
-                    logger.warning(f"Invalid role index: {role_index}. Event has {len(event['roles'])} roles.")
-                    # No message to user
+                    # For normal roles, a signup for FILLALL is replaced by the role
+                    left_fillall = bool(fillall_key and work.remove_participant(fillall_key, player_id))
+                    # Automatically unregister from previous role
+                    previous_role = None
+                    if previous_key is not None:
+                        previous_role = work.role_name(previous_key)
+                        work.remove_participant(previous_key, player_id)
+                    work.add_participant(role_key, Participant(player_name, player_id, current_time, comment))
+                    return "added", (previous_role, left_fillall)
+                
+                # Applied with compare-and-swap, so concurrent signups never overwrite each other
+                event, (outcome, details) = await mutate_event(event, apply_signup)
+                
+                if outcome == "unchanged":
+                    # Just acknowledge if no change in comment status
+                    logger.info(f"{player_name} already assigned to role {role_name} at index {role_index}")
+                    await message.add_reaction('ℹ️')  # Info reaction
+                    # Send a joke message as DM instead of in channel
+                    try:
+                        event_link = f"https://discord.com/channels/{message.guild.id}/{CHANNEL_ID_EVENT}/{event.message_id}"
+                        dm_message = (
+                            f"Für die Rolle **{role_name}** bist du doch schon angemeldet, du Pappnase!\n"
+                            f"Ändere doch wenigstens den Kommentar ;)\n"
+                            f"Event: {event.title}\n"
+                            f"Datum: {event.date}\n"
+                            f"Uhrzeit: {event.time}\n"
+                            f"[Zum Event]({event_link})"
+                        )
+                        await message.author.send(dm_message)
+                    except Exception as e:
+                        logger.error(f"Failed to send DM to user {message.author.id}: {e}")
+                    return
+                
+                if outcome == "taken":
+                    current_holder, had_other_role = details
+                    logger.info(f"Role {role_name} already has a participant, rejecting registration from {player_name}")
+                    await message.add_reaction('ℹ️')  # Rejection reaction
+                    # Send as DM instead of in channel
+                    try:
+                        event_link = f"https://discord.com/channels/{message.guild.id}/{CHANNEL_ID_EVENT}/{event.message_id}"
+                        holder_text = f"**{current_holder.name}**" if had_other_role else f"<@{current_holder.user_id}>"
+                        dm_message = (
+                            f"Nene, so geht das nicht. Die Rolle **{role_name}** hat sich bereits {holder_text} ausgesucht, du Schlingel.\n"
+                            f"Event: {event.title}\n"
+                            f"Datum: {event.date}\n"
+                            f"Uhrzeit: {event.time}\n"
+                            f"[Zum Event]({event_link})"
+                        )
+                        await message.author.send(dm_message)
+                    except Exception as e:
+                        logger.error(f"Failed to send DM to user {message.author.id}: {e}")
+                    return
+                
+                if outcome == "fillall_added":
+                    for r_name in details:
+                        logger.info(f"Removed {player_name} from role {r_name} when signing up for FILLALL")
+                    logger.info(f"Added {player_name} to FillALL role with comment: '{comment}'")
+                elif outcome == "fill_added":
+                    logger.info(f"Added {player_name} to Fill role or participant_only_mode")
+                elif outcome == "added":
+                    previous_role, left_fillall = details
+                    if left_fillall:
+                        logger.info(f"Removed {player_name} from FILLALL when signing up for role {role_name}")
+                    if previous_role is not None:
+                        logger.info(f"Automatically unregistering {player_name} from role {previous_role}")
+                    logger.info(f"Added {player_name} to role {role_name}")
+                
+                # Update the event message and the overview
+                await self._update_event_posts(message, event)
+                await message.add_reaction('✅')  # Add confirmation reaction
             else:
-                logger.warning(f"No event found matching thread name: {event_title}")
-                await message.channel.send("Kein passendes Event für diesen Thread gefunden.", ephemeral=True)
+                logger.warning(f"Invalid role index: {role_index}. Event has {len(event.roles)} roles.")
+                # No message to user
         except Exception as e:
             logger.error(f"Error processing role assignment: {e}")
             await message.channel.send(f"Fehler bei der Verarbeitung deiner Anfrage: {str(e)}", ephemeral=True)
 
-    async def _handle_unregister(self, message, is_specific_role=False, role_number=None, role_index=None):
+    async def _handle_unregister(self, message, event, is_specific_role=False, role_number=None, role_index=None):
+        """Handles "-" / "-X" posted in an event thread (event is already resolved by on_message)."""
         try:
-            # Load events from JSON (auch abgelaufene Events einschließen, damit Abmeldungen nach Eventstart möglich sind)
-            events_data = load_upcoming_events(include_expired=True)
-            
-            # First try to find the event by thread_id (most reliable)
-            thread_id = message.channel.id
-            event = next((e for e in events_data["events"] if e.get('thread_id') == thread_id), None)
-            
-            # Fallback: try to find by title (for backwards compatibility)
-            if not event:
-                event_title = message.channel.name
-                event = next((e for e in events_data["events"] if e.get('title') == event_title), None)
-            
-            if not event:
-                await message.add_reaction('⚠️')
-                await message.channel.send("Kein passendes Event für diesen Thread gefunden.")
-                return
-            
             # Prüfe, ob das Event abgesagt wurde
-            if event.get('status') == "canceled" or "[ABGESAGT]" in event.get('title', ''):
+            if event.status == "canceled" or "[ABGESAGT]" in event.title:
                 await message.add_reaction('❌')
                 await message.author.send(f"Dieses Event wurde bereits abgesagt. Abmeldungen sind nicht mehr möglich.")
                 return
@@ -654,7 +542,7 @@ class MyBot(discord.Client):
             # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
             try:
                 # Event-Zeit direkt aus datetime_obj verwenden
-                event_dt = datetime.fromisoformat(event.get('datetime_obj'))
+                event_dt = event.datetime_obj
                 now = datetime.now(timezone.utc)
                 
                 # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Abmeldungen blockieren
@@ -662,7 +550,7 @@ class MyBot(discord.Client):
                     # Benutzer informieren
                     await message.add_reaction('❌')
                     await message.author.send(f"Abmeldungen sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.")
-                    logger.info(f"Blocked unregister from {message.author.name} - event {event.get('title')} started more than 1 hour ago")
+                    logger.info(f"Blocked unregister from {message.author.name} - event {event.title} started more than 1 hour ago")
                     return
             except Exception as e:
                 logger.error(f"Error checking event time for unregister: {e}")
@@ -675,23 +563,14 @@ class MyBot(discord.Client):
             # If it's a general unregister from all roles (-)
             if not is_specific_role:
                 # Keep track of how many roles the player was removed from
-                removed_count = 0
-                
-                # Check all roles
-                for r_idx, r_name in enumerate(event['roles']):
-                    r_key = f"{r_idx}:{r_name}"
-                    if r_key in event.get('participants', {}):
-                        # Check if player is in this role
-                        initial_count = len(event['participants'][r_key])
-                        event['participants'][r_key] = [p for p in event['participants'][r_key] if p[1] != player_id]
-                        removed_count += initial_count - len(event['participants'][r_key])
+                event, removed_count = await mutate_event(event, lambda work: len(work.remove_user(player_id)))
                 
-                logger.info(f"Removed {player_name} from {removed_count} roles in event {event['title']}")
+                logger.info(f"Removed {player_name} from {removed_count} roles in event {event.title}")
                 
                 # Only reply if player was actually removed from something
                 if removed_count > 0:
                     # Update the event message
-                    await self._update_event_and_save(message, event, events_data)
+                    await self._update_event_posts(message, event)
                     await message.add_reaction('✅')  # Add confirmation reaction
                 else:
                     await message.add_reaction('❓')  # Player wasn't registered
@@ -701,23 +580,20 @@ class MyBot(discord.Client):
                 if role_number is not None:
                     role_index = self.role_number_to_index(event, role_number)
                 
-                if role_index is not None and 0 <= role_index < len(event['roles']):
-                    role_name = event['roles'][role_index]
-                    role_key = f"{role_index}:{role_name}"
+                if role_index is not None and 0 <= role_index < len(event.roles):
+                    role_name = event.roles[role_index]
+                    role_key = event.role_key(role_index)
                     
                     logger.info(f"Unregistering {player_name} from role {role_name} at index {role_index}")
                     
-                    if role_key in event.get('participants', {}):
+                    if event.participants.get(role_key):
                         # Find and remove the player from the role
-                        initial_count = len(event['participants'][role_key])
-                        event['participants'][role_key] = [p for p in event['participants'][role_key] if p[1] != player_id]
-                        removed_count = initial_count - len(event['participants'][role_key])
-                        
-                        if removed_count > 0:
+                        event, removed = await mutate_event(event, lambda work: work.remove_participant(role_key, player_id))
+                        if removed is not None:
                             logger.info(f"Removed {player_name} from role {role_name}")
                             
-                            # Update the event message and save to JSON
-                            await self._update_event_and_save(message, event, events_data)
+                            # Update the event message and the overview
+                            await self._update_event_posts(message, event)
                             await message.add_reaction('✅')  # Add confirmation reaction
                         else:
                             logger.info(f"{player_name} was not registered for role {role_name}")
@@ -726,50 +602,15 @@ class MyBot(discord.Client):
                         logger.info(f"Role {role_name} has no participants")
                         await message.add_reaction('❓')  # Info reaction
                 else:
-                    logger.warning(f"Invalid role index: {role_index}. Event has {len(event['roles'])} roles.")
+                    logger.warning(f"Invalid role index: {role_index}. Event has {len(event.roles)} roles.")
                     await message.add_reaction('❓')  # Invalid role
         except Exception as e:
             logger.error(f"Error processing unregister: {e}")
             await message.channel.send(f"Fehler bei der Verarbeitung deiner Anfrage: {str(e)}", ephemeral=True)
 
-    async def _update_event_and_save(self, message, event, events):
+    async def _update_event_posts(self, message, event):
+        """Refreshes the event post and the overview after a committed change."""
         try:
-            # Ensure events is a dictionary with an "events" key
-            if isinstance(events, list):
-                events = {"events": events}
-            elif not isinstance(events, dict) or "events" not in events:
-                logger.error("Invalid events format in _update_event_and_save")
-                return False
-
-            # If event is a dictionary, recalculate the role counts
-            if isinstance(event, dict):
-                # Berechne Rollenanzahl über die zentrale Hilfsfunktion
-                filled_slots, total_slots = calculate_role_counts(event.get('roles', []), event.get('participants', {}))
-                
-                # Update the counts
-                event['total_slots'] = total_slots
-                event['filled_slots'] = filled_slots
-
-            # Find the event by ID if available, otherwise by title
-            event_id = event.get("event_id")
-            if event_id:
-                # Find the event in the events list by ID
-                for e in events["events"]:
-                    if e.get("event_id") == event_id:
-                        # Update the event
-                        e.update(event)
-                        break
-            else:
-                # Fallback to title for backward compatibility
-                for e in events["events"]:
-                    if e["title"] == event["title"]:
-                        # Update the event
-                        e.update(event)
-                        break
-            
-            # Save the updated events
-            save_events_to_json(events)
-            
             # Update the event message
             thread = message.channel
             await self.update_event_message(thread, event)
@@ -786,7 +627,7 @@ class MyBot(discord.Client):
 
     async def update_event_message(self, thread, event):
         try:
-            logger.info(f"Updating event message for event: {event.get('title') if isinstance(event, dict) else event.title}")
+            logger.info(f"Updating event message for event: {event.title}")
             
             # Get guild and channel
             guild = thread.guild
@@ -798,11 +639,7 @@ class MyBot(discord.Client):
             
             # Get the event message
             try:
-                if isinstance(event, dict):
-                    message_id = event.get("message_id")
-                else:
-                    message_id = getattr(event, "message_id", None)
-                    
+                message_id = event.message_id
                 if not message_id:
                     logger.error("No message_id found in event")
                     return False
@@ -813,12 +650,12 @@ class MyBot(discord.Client):
                 return False
             
             # Create the embed with CYAN color - Titel bleibt unterstrichen
-            title = event.get('title') if isinstance(event, dict) else event.title
+            title = event.title
             embed = discord.Embed(title=f"__**{title}**__", color=0x0dceda)
             
             # Get date, time and weekday
-            date = event.get('date') if isinstance(event, dict) else getattr(event, 'date', '')
-            time = event.get('time') if isinstance(event, dict) else getattr(event, 'time', '')
+            date = event.date
+            time = event.time
             weekday = get_weekday_abbr(date)
             
             # Add date and time as inline fields (only these two in the first row)
@@ -828,8 +665,8 @@ class MyBot(discord.Client):
             embed.add_field(name="\u200b", value="\u200b", inline=True)
             
             # Add creator and mention role as inline fields (in the second row)
-            caller_id = event.get('caller_id') if isinstance(event, dict) else getattr(event, 'caller_id', None)
-            mention_role_id = event.get('mention_role_id') if isinstance(event, dict) else getattr(event, 'mention_role_id', None)
+            caller_id = event.caller_id
+            mention_role_id = event.mention_role_id
             
             creator_mention = f"<@{caller_id}>" if caller_id else "Unbekannt"
             
@@ -845,23 +682,23 @@ class MyBot(discord.Client):
             embed.add_field(name="\u200b", value="\u200b", inline=True)
             
             # Add description
-            description = event.get('description') if isinstance(event, dict) else getattr(event, 'description', '')
+            description = event.description
             if description:
                 if len(description) > 1020:  # Leave room for ellipsis
                     description = description[:1020] + "..."
                 embed.add_field(name="Beschreibung", value=description, inline=False)
             
             # Add image if available (direkt nach der Beschreibung)
-            image_url = event.get('image_url') if isinstance(event, dict) else getattr(event, 'image_url', None)
+            image_url = event.image_url
             if image_url:
                 embed.set_image(url=image_url)
             
             # ===== Role display based on v0.3.4 =====
-            roles = event.get('roles', []) if isinstance(event, dict) else getattr(event, 'roles', [])
-            participants = event.get('participants', {}) if isinstance(event, dict) else getattr(event, 'participants', {})
+            roles = event.roles
+            participants = event.participants
 
             # Check for participant_only_mode
-            is_participant_only = event.get('participant_only_mode', False) if isinstance(event, dict) else getattr(event, 'participant_only_mode', False)
+            is_participant_only = event.participant_only_mode
             
             # In participant_only mode, we should only display the participant role
             if is_participant_only:
@@ -869,7 +706,7 @@ class MyBot(discord.Client):
                 if len(roles) > 0:
                     role_idx = 0
                     role_name = roles[0]
-                    role_key = f"{role_idx}:{role_name}"
+                    role_key = event.role_key(role_idx)
                     
                     # Combine role name and number
                     participant_title = f"1. {role_name}"
@@ -878,11 +715,7 @@ class MyBot(discord.Client):
                     role_participants = participants.get(role_key, [])
                     
                     # Count unique participants
-                    unique_participants = set()
-                    for p in role_participants:
-                        if len(p) >= 2:
-                            unique_participants.add(p[1])
-                    participant_count = len(unique_participants)
+                    participant_count = len({p.user_id for p in role_participants})
                     
                     # Combine role name and number with participant count
                     participant_title = f"1. {role_name} ({participant_count})"
@@ -890,21 +723,10 @@ class MyBot(discord.Client):
                     # If participants are present, format them with comments (different from FillALL)
                     if role_participants:
                         # Sort participants by timestamp
-                        sorted_participants = sorted(role_participants, key=lambda x: x[2] if len(x) > 2 else 0)
+                        sorted_participants = sorted(role_participants, key=lambda p: p.timestamp)
                         
                         # Display with comments (different from FillALL)
-                        participants_text = ""
-                        for p in sorted_participants:
-                            if len(p) >= 2:
-                                # Check if a comment is present
-                                if len(p) >= 4 and p[3]:
-                                    # Truncate comment to 30 characters if necessary
-                                    comment = p[3]
-                                    if len(comment) > 30:
-                                        comment = comment[:30] + "..."
-                                    participants_text += f"<@{p[1]}> {comment}\n"
-                                else:
-                                    participants_text += f"<@{p[1]}>\n"
+                        participants_text = "".join(f"{format_participant(p)}\n" for p in sorted_participants)
                         
                         # Add the field - Teilnehmer role with signup instruction
                         embed.add_field(name=f"{participant_title}", value=participants_text or "\u200b", inline=False)
@@ -913,8 +735,8 @@ class MyBot(discord.Client):
                         embed.add_field(name=f"{participant_title}", value="\u200b", inline=False)
             else:
                 # Standard mode with multiple roles
-                # Find the Fill role - case insensitive check
-                fill_index = next((i for i, role in enumerate(roles) if role.lower() in ["fill", "fillall"]), None)
+                fill_key = event.fillall_key
+                fill_index = event.role_ids.index(fill_key) if fill_key else None
                 
                 # Extract regular roles (all except FillALL)
                 regular_roles = []
@@ -947,34 +769,15 @@ class MyBot(discord.Client):
                         # This is a normal role
                         total_roles += 1
                         # Display role and participants
-                        role_key = f"{role_idx}:{role_name}"
+                        role_key = event.role_key(role_idx)
                         role_participants = participants.get(role_key, [])
                         
                         if role_participants:
                             filled_roles += 1
                             
-                            # Sort participants by timestamp and show only the first
-                            sorted_participants = sorted(role_participants, key=lambda x: x[2] if len(x) > 2 else 0)
-                            p_data = sorted_participants[0]
-                            
-                            if len(p_data) >= 2:  # Ensure we have at least name and ID
-                                p_id = p_data[1]
-                                
-                                # Role and player in one line
-                                field_content += f"{role_counter}. {role_name} <@{p_id}>"
-                                
-                                # Comment if available
-                                if len(p_data) >= 4 and p_data[3]:
-                                    # Truncate comment to 30 characters if necessary
-                                    comment = p_data[3]
-                                    if len(comment) > 30:
-                                        comment = comment[:30] + "..."
-                                    field_content += f" {comment}"
-                                    logger.info(f"Including comment for role {role_name}: '{p_data[3]}'")
-                                
-                                field_content += "\n"
-                            else:
-                                field_content += f"{role_counter}. {role_name}\n"
+                            # Show only the earliest signup; role and player in one line
+                            first = min(role_participants, key=lambda p: p.timestamp)
+                            field_content += f"{role_counter}. {role_name} {format_participant(first)}\n"
                         else:
                             field_content += f"{role_counter}. {role_name}\n"
                         
@@ -984,12 +787,7 @@ class MyBot(discord.Client):
                 # Add all regular roles as a single field with occupancy count
                 if field_content:
                     # Count all FILLALL participants (no longer need to check for regular roles overlap)
-                    fillall_count = 0
-                    if fill_index is not None:
-                        fill_key = f"{fill_index}:{roles[fill_index]}"
-                        fill_participants = participants.get(fill_key, [])
-                        if fill_participants:
-                            fillall_count = len([p for p in fill_participants if len(p) >= 2])
+                    fillall_count = len(participants.get(fill_key, ())) if fill_key else 0
                     
                     # Add occupancy count in the field name
                     embed.add_field(name=f"Rollen ({filled_roles + fillall_count}/{total_roles})", value=field_content, inline=True)
@@ -999,15 +797,14 @@ class MyBot(discord.Client):
                     fill_text = f"{role_counter}. {roles[fill_index]}"
                     
                     # Get participants for Fill role
-                    fill_key = f"{fill_index}:{roles[fill_index]}"
                     fill_participants = participants.get(fill_key, [])
                     
                     if fill_participants:
                         # Sort participants by timestamp
-                        sorted_fill = sorted(fill_participants, key=lambda x: x[2] if len(x) > 2 else 0)
+                        sorted_fill = sorted(fill_participants, key=lambda p: p.timestamp)
                         
                         # Display all FILLALL participants (no need to filter)
-                        fill_players_text = fill_text + "\n" + "\n".join([f"<@{p[1]}>" + (f" {p[3][:30] + '...' if len(p) > 3 and p[3] and len(p[3]) > 30 else p[3]}" if len(p) > 3 and p[3] else "") for p in sorted_fill if len(p) >= 2])
+                        fill_players_text = fill_text + "\n" + "\n".join(format_participant(p) for p in sorted_fill)
                         
                         
                         # Add Fill role to embed with empty name to reduce spacing
@@ -1030,18 +827,10 @@ class MyBot(discord.Client):
         Converts a role number to its corresponding index in the event's roles list.
         Returns -1 if the role number is invalid.
         """
-        regular_roles = event.get("roles", [])
-        fill_index = None
+        regular_roles = event.roles
         
         # Find the index of the FillALL role if it exists
-        for i, role in enumerate(regular_roles):
-            # Check if role is a string or a dictionary
-            if isinstance(role, dict) and role.get("name") == "FILLALL":
-                fill_index = i
-                break
-            elif isinstance(role, str) and role.lower() in ["fill", "fillall"]:
-                fill_index = i
-                break
+        fill_index = regular_roles.index(FILLALL_ROLE) if FILLALL_ROLE in regular_roles else None
         
         if role_number <= len(regular_roles):
             # Regular role number
@@ -1058,13 +847,14 @@ class MyBot(discord.Client):
         """
         Cleans up the event channel based on status and age:
         - Keeps active events
-        - Removes expired events after 1 day
-        - Removes regular messages after 1 day
+        - Archives expired events after 1 day
+        - Classifies messages posted since the last run into the message ledger,
+          whose scheduler removes them after 1 day (see scan_channel_history)
         """
         logger.info(f"{datetime.now()} - Starting event channel cleanup...")
         
         # Backup erstellen bevor Änderungen vorgenommen werden
-        self.create_backup()
+        await self.create_backup()
         
         DAYS_TO_KEEP = 1
         
@@ -1081,106 +871,115 @@ class MyBot(discord.Client):
                 continue
                 
             try:
-                # Events laden
-                events_data = load_upcoming_events(include_expired=True, include_cleaned=True)
-                events_to_keep = []
-                original_events_count = len(events_data.get("events", []))
-                
-                # IDs der AKTIVEN Event-Nachrichten sammeln
-                active_event_message_ids = set()
-                for event in events_data["events"]:
-                    if event.get("status") == "active" and event.get("message_id"):
-                        active_event_message_ids.add(int(event["message_id"]))
+                # Events aus dem Store
+                all_events = store.events(include_expired=True, include_cleaned=True)
+                events_to_archive = []
                 
                 # Events nach Status/Alter sortieren
                 current_time = datetime.now(timezone.utc)
-                for event in events_data["events"]:
-                    if event.get("status") == "active":
-                        events_to_keep.append(event)
-                    else:
-                        try:
-                            event_time = datetime.fromisoformat(event["datetime_obj"])
-                            # Stelle sicher, dass es UTC ist
-                            if event_time.tzinfo is None:
-                                event_time = event_time.replace(tzinfo=timezone.utc)
-                            days_difference = (current_time - event_time).days
-                            
-                            if days_difference > DAYS_TO_KEEP:
-                                # Alte abgelaufene Events nicht behalten
-                                pass
-                            else:
-                                events_to_keep.append(event)
-                        except (ValueError, KeyError) as e:
-                            logger.error(f"Fehler beim Verarbeiten des Events {event.get('title', 'Unbekannt')}: {e}")
-                            events_to_keep.append(event)  # Im Zweifelsfall behalten
-                
-                # Bereinigung aller alten Nachrichten (inkl. abgelaufener Events)
-                cutoff_date = datetime.now(timezone.utc) - timedelta(days=DAYS_TO_KEEP)
-                
-                def should_delete_message(message):
-                    # Aktive Events schützen
-                    if message.id in active_event_message_ids:
-                        return False
-                    # Neue Nachrichten schützen
-                    if message.created_at > cutoff_date:
-                        return False
-                    # Alte Nachrichten löschen
-                    return True
-                
-                # Purge mit Filter ausführen
+                for event in all_events:
+                    if event.status == "active":
+                        continue
+                    try:
+                        event_time = event.datetime_obj
+                        # Stelle sicher, dass es UTC ist
+                        if event_time.tzinfo is None:
+                            event_time = event_time.replace(tzinfo=timezone.utc)
+                        days_difference = (current_time - event_time).days
+                        
+                        if days_difference > DAYS_TO_KEEP:
+                            # Alte abgelaufene Events ins Archiv verschieben
+                            events_to_archive.append(event.event_id)
+                    except (ValueError, KeyError) as e:
+                        logger.error(f"Fehler beim Verarbeiten des Events {event.title}: {e}")
+                        # Im Zweifelsfall behalten
+                
+                # Nachrichten seit dem letzten Lauf klassifizieren; gelöscht werden sie vom Message-Scheduler
                 try:
-                    deleted_msgs = await channel.purge(check=should_delete_message, limit=10000)
-                    logger.info(f"Guild {guild.id}: {len(deleted_msgs)} alte Nachrichten gelöscht")
+                    recorded = await self.scan_channel_history(channel)
+                    logger.info(f"Guild {guild.id}: {recorded} neue Nachrichten im Ledger erfasst")
                 except Exception as e:
-                    logger.error(f"Fehler beim Purge: {e}")
+                    logger.error(f"Fehler beim Durchsuchen des Kanalverlaufs: {e}")
                 
-                # Events-Datei aktualisieren
-                events_data["events"] = events_to_keep
-                save_events_to_json(events_data)
+                # Move old events out of the live store into the monthly archive segments
+                archived_count = await store.aarchive(events_to_archive)
+                # Fold the mutation journal into the snapshot once per cleanup run
+                await store.acompact()
                 
-                removed_count = original_events_count - len(events_to_keep)
-                logger.info(f"Event-Bereinigung abgeschlossen: {removed_count} Events entfernt, {len(events_to_keep)} Events behalten")
+                logger.info(f"Event-Bereinigung abgeschlossen: {archived_count} Events archiviert, {len(all_events) - archived_count} Events behalten")
                 
             except Exception as e:
                 logger.error(f"Fehler bei der Bereinigung des Event-Kanals: {e}")
 
-    def create_backup(self):
-        """Erstellt ein tägliches Backup der Events-Datei."""
+    async def scan_channel_history(self, channel):
+        """
+        Records messages of the channel that are not in the message ledger yet (user chatter,
+        bot messages from before the ledger) so the message scheduler deletes them when due.
+
+        Only unclassified history is read: messages after the persisted "newest" cursor, and
+        older history page by page before the "oldest" cursor until the channel start is
+        reached (at most HISTORY_BACKFILL_LIMIT messages per run). Returns the number recorded.
+        """
+        state = ledger.scan_state(channel.id)
+        recorded = 0
+
+        def classify(message):
+            nonlocal recorded
+            if message.id in ledger:
+                return
+            if message.author.id == self.user.id:
+                event = store.find_by_message(message.id, include_cleaned=True)
+                if event is not None:
+                    purpose = "event"
+                elif message.id == overview_id:
+                    purpose = "overview"
+                else:
+                    purpose = "notification"
+                ledger.record(message.id, channel.id, purpose, message.created_at, event.event_id if event else None)
+            else:
+                ledger.record(message.id, channel.id, "user", message.created_at)
+            self.arm_message(message.id)
+            recorded += 1
+
+        overview_id = await load_overview_id()
+        overview_id = int(overview_id) if overview_id else None
+
+        # Neue Nachrichten seit dem letzten Lauf (vorwärts ab dem Cursor)
+        if state["newest"] is not None or state["backfilled"]:
+            after = discord.Object(id=state["newest"]) if state["newest"] is not None else None
+            async for message in channel.history(limit=None, after=after, oldest_first=True):
+                classify(message)
+                state["newest"] = message.id
+
+        # Älteren, noch nicht erfassten Verlauf seitenweise nachholen (rückwärts ab dem Cursor)
+        if not state["backfilled"]:
+            before = discord.Object(id=state["oldest"]) if state["oldest"] is not None else None
+            count = 0
+            async for message in channel.history(limit=HISTORY_BACKFILL_LIMIT, before=before):
+                classify(message)
+                count += 1
+                state["oldest"] = message.id
+                if state["newest"] is None or message.id > state["newest"]:
+                    state["newest"] = message.id
+            if count < HISTORY_BACKFILL_LIMIT:
+                state["backfilled"] = True
+                logger.info(f"History of channel {channel.id} fully classified")
+
+        ledger.set_scan_state(channel.id, state)
+        await save_message_ledger()
+        return recorded
+
+    async def create_backup(self):
+        """Erstellt einen Backup-Snapshot; nur geänderte Events werden geschrieben."""
         try:
-            # Backup-Ordner erstellen falls nicht vorhanden
-            os.makedirs("backups", exist_ok=True)
-            
-            # Heutiges Datum für Dateinamen
-            today = datetime.now().strftime("%Y%m%d")
-            backup_path = os.path.join("backups", f"events_backup_{today}.json")
-            
-            # Daten kopieren
-            events_data = load_upcoming_events(include_expired=True, include_cleaned=True)
-            with open(backup_path, 'w', encoding='utf-8') as f:
-                json.dump(events_data, f, ensure_ascii=False, indent=4)
-            
-            logger.info(f"Backup erstellt: {backup_path}")
-                
-            # Alte Backups löschen (nur 42 behalten)
-            self.rotate_backups()
+            # The snapshot is a consistent copy-on-write view of all committed changes;
+            # hashing, writing and pruning run on the background worker while signups go on
+            backup_path = await store.run_background(backups.create, store.snapshot())
+            if backup_path:
+                logger.info(f"Backup erstellt: {backup_path}")
             
         except Exception as e:
             logger.error(f"Fehler beim Erstellen des Backups: {e}")
-    
-    def rotate_backups(self):
-        """Behält nur die neuesten 42 Backups."""
-        try:
-            MAX_BACKUPS = 42
-            backup_files = sorted(glob.glob(os.path.join("backups", "events_backup_*.json")))
-            
-            # Wenn mehr als MAX_BACKUPS Dateien, lösche die ältesten
-            if len(backup_files) > MAX_BACKUPS:
-                files_to_delete = backup_files[:-MAX_BACKUPS]
-                for file in files_to_delete:
-                    os.remove(file)
-                logger.info(f"{len(files_to_delete)} alte Backups gelöscht. {MAX_BACKUPS} Backups behalten.")
-        except Exception as e:
-            logger.error(f"Fehler bei der Backup-Rotation: {e}")
 
     # Wait until the bot is ready before starting the loop
     @cleanup_event_channel.before_loop
@@ -1251,34 +1050,27 @@ class MyBot(discord.Client):
         else:
             logger.info(f"Bot joined authorized server: {guild.name}")
 
-    @tasks.loop(minutes=5)
-    async def check_expired_events(self):
-        """Überprüft alle 5 Minuten, ob Events als expired markiert werden müssen"""
+    def arm_expiry(self, event_id, event):
+        """Store listener: keeps the expiry deadline (start + 1h) of every active event scheduled"""
+        deadline = expiry_deadline(event) if event is not None and event.status == "active" else None
+        if deadline is None:
+            self.expiry_scheduler.cancel(event_id)
+        else:
+            self.expiry_scheduler.schedule(event_id, deadline)
+
+    async def expire_due_events(self, event_ids):
+        """Expiry scheduler callback - marks exactly the due events as expired and updates the overview"""
         try:
-            logger.info("Checking for expired events...")
-            # Events laden
-            events_data = load_upcoming_events(include_expired=True, include_cleaned=False)
-            
-            # Status aktualisieren - Achtung: clean_old_events wird bereits durch load_upcoming_events aufgerufen
-            # Dies stellt sicher, dass alle abgelaufenen Events jetzt als "expired" markiert werden
-            updated_data = clean_old_events(events_data)
-            
-            # Prüfen ob sich etwas geändert hat
-            events_changed = False
-            if len(updated_data.get("events", [])) != len(events_data.get("events", [])):
-                events_changed = True
-            else:
-                # Prüfe, ob sich event.status geändert hat bei mindestens einem Event
-                for i, event in enumerate(updated_data.get("events", [])):
-                    if i < len(events_data.get("events", [])):
-                        if event.get("status") != events_data["events"][i].get("status"):
-                            events_changed = True
-                            break
-            
-            # Wenn sich etwas geändert hat, speichern und Übersicht aktualisieren
+            events_changed = await store.aflush_status_changes(event_ids) > 0
+            # Woken a moment too early: still active, so arm again
+            for event_id in event_ids:
+                event = store.find_by_id(event_id)
+                if event is not None and event.status == "active":
+                    self.arm_expiry(event_id, event)
+
+            # Wenn sich etwas geändert hat, Übersicht aktualisieren
             if events_changed:
-                logger.info("Events updated, saving changes and updating event listing")
-                save_events_to_json(updated_data)
+                logger.info(f"{len(event_ids)} events due for expiry, updating event listing")
                 # Aktualisiere die Eventübersicht in allen Guilds
                 for guild in self.guilds:
                     try:
@@ -1286,179 +1078,223 @@ class MyBot(discord.Client):
                         logger.info(f"Event listing updated for guild: {guild.name}")
                     except Exception as guild_error:
                         logger.error(f"Error updating event listing for guild {guild.name}: {guild_error}")
-            else:
-                logger.info("No expired events found, event listing not updated")
-    
+
         except Exception as e:
-            logger.error(f"Error in check_expired_events: {e}")
+            logger.error(f"Error in expire_due_events: {e}")
             import traceback
             logger.error(traceback.format_exc())
+            self.expiry_scheduler.retry(event_ids)
+
+    def arm_reminders(self, event_id, event):
+        """Store listener: keeps the pending automatic reminders of every upcoming active event scheduled"""
+        wanted = {}
+        start = event_start(event) if event is not None and event.status == "active" else None
+        if start is not None and start > datetime.now(timezone.utc):
+            offsets = DEFAULT_REMINDERS if event.reminders is None else event.reminders
+            # Reminders that were already due when the event was created are not sent
+            created = event.created_at
+            for offset in offsets:
+                deadline = start - timedelta(minutes=offset)
+                if offset not in event.reminders_sent and (created is None or deadline > created):
+                    wanted[(event_id, offset)] = deadline
+        for key in self._armed_reminders.pop(event_id, set()) - wanted.keys():
+            self.reminder_scheduler.cancel(key)
+        for key, deadline in wanted.items():
+            self.reminder_scheduler.schedule(key, deadline)
+        if wanted:
+            self._armed_reminders[event_id] = set(wanted)
+
+    def message_deadline(self, message_id):
+        """When a recorded bot message is due for deletion, or None while it has to stay"""
+        entry = ledger.get(message_id)
+        if entry is None or entry["purpose"] == "overview":
+            # The current overview stays until create_event_listing replaces it
+            return None
+        if entry["purpose"] == "event":
+            event = store.find_by_message(message_id, include_cleaned=True)
+            if event is not None and event.status == "active":
+                return None
+        return ledger.created(message_id) + MESSAGE_RETENTION
+
+    def arm_message(self, message_id):
+        deadline = self.message_deadline(message_id)
+        if deadline is None:
+            self.message_scheduler.cancel(message_id)
+        else:
+            self.message_scheduler.schedule(message_id, deadline)
+
+    def arm_message_cleanup(self, event_id, event):
+        """Store listener: an event post becomes due for deletion once its event is no longer active"""
+        if event is not None and event.message_id in ledger and ledger.link(event.message_id, event_id):
+            request_ledger_save()
+        for message_id in ledger.by_event(event_id):
+            self.arm_message(message_id)
+
+    async def delete_due_messages(self, message_ids):
+        """Message scheduler callback - deletes the bot's messages that reached their retention age"""
+        now = datetime.now(timezone.utc)
+        by_channel = {}
+        for message_id in message_ids:
+            deadline = self.message_deadline(message_id)
+            if deadline is None:
+                continue
+            if deadline > now:
+                self.message_scheduler.schedule(message_id, deadline)
+                continue
+            by_channel.setdefault(ledger.get(message_id)["channel_id"], []).append(message_id)
+
+        deleted = 0
+        for channel_id, channel_message_ids in by_channel.items():
+            channel = self.get_channel(channel_id)
+            gone = set()
+            if channel is None:
+                logger.warning(f"Channel {channel_id} not found, cannot delete {len(channel_message_ids)} messages yet")
+            else:
+                gone = await delete_channel_messages(channel, channel_message_ids)
+            deleted += ledger.forget(gone)
+            for message_id in set(channel_message_ids) - gone:
+                self.message_scheduler.schedule(message_id, now + MESSAGE_DELETE_RETRY)
+        if deleted:
+            logger.info(f"Deleted {deleted} bot messages that reached their retention age")
+            await save_message_ledger()
+
+    def thread_deadline(self, event):
+        """
+        When the event's thread is due for cleanup (start + THREAD_CLEANUP_DELAY), or None.
 
-    @check_expired_events.before_loop
-    async def before_check_expired_events(self):
-        await self.wait_until_ready()
+        The deadline is rounded up to the full minute, so threads of events starting in the
+        same minute are closed in one scheduler run.
+        """
+        start = event_start(event)
+        if start is None or not event.thread_id or event.thread_closed or not THREAD_CLEANUP_DELAY:
+            return None
+        deadline = start + THREAD_CLEANUP_DELAY
+        if deadline.second or deadline.microsecond:
+            deadline = deadline.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        return deadline
 
-# Füge die Hilfsfunktion direkt vor der Event-Klasse ein
-def calculate_role_counts(roles, participants):
-    """
-    Berechnet die Anzahl der besetzten und insgesamt verfügbaren Rollen für ein Event.
-    
-    Args:
-        roles: Liste der Rollen im Event
-        participants: Dictionary mit den Teilnehmern pro Rolle
-    
-    Returns:
-        Tuple (filled_slots, total_slots)
-    """
-    filled_slots = 0
-    total_slots = 0
-    
-    # Count regular roles (excluding headers and FILLALL)
-    for i, role in enumerate(roles):
-        # Überschriften und FILL/FILLALL-Rollen überspringen
-        if (isinstance(role, str) and 
-            ((role.strip().startswith('(') and role.strip().endswith(')')) or 
-             role.lower() in ["fill", "fillall"])):
-            continue
-            
-        # Als Slot zählen
-        total_slots += 1
-        
-        # Prüfen ob dieser Slot besetzt ist
-        role_key = f"{i}:{role}"
-        if role_key in participants and len(participants[role_key]) > 0:
-            filled_slots += 1
-    
-    # FILLALL-Teilnehmer zählen (jetzt einfach alle, da keine Überschneidung möglich)
-    fill_index = None
-    for i, role in enumerate(roles):
-        if isinstance(role, str) and role.lower() in ["fill", "fillall"]:
-            fill_index = i
-            break
-    
-    if fill_index is not None:
-        fill_key = f"{fill_index}:{roles[fill_index]}"
-        if fill_key in participants:
-            for participant in participants[fill_key]:
-                if len(participant) >= 2:
-                    filled_slots += 1
-    
-    return filled_slots, total_slots
+    def arm_thread_cleanup(self, event_id, event):
+        """
+        Store listener: keeps the thread cleanup of every event scheduled, whatever its status.
 
-class Event:
-    def __init__(self, title, date, time, description, roles, datetime_obj=None, caller_id=None, caller_name=None, participant_only_mode=False, event_id=None):
-        self.title = title
-        self.date = date
-        self.time = time
-        self.description = description
-        self.roles = roles
-        self.participants = {}
-        self.caller_id = caller_id  # Discord ID of the creator
-        self.caller_name = caller_name  # Name of the creator
-        self.message_id = None  # Message ID of the event post
-        self.thread_id = None  # Thread ID of the event thread
-        self.participant_only_mode = participant_only_mode  # Flag for participant-only mode
-        self.mention_role_id = None  # Add mention_role_id field
-        self.status = "active"  # Neues Statusfeld: "active", "expired" oder "cleaned"
-        self.image_url = None  # Attribut für Bild-URL hinzufügen
-        
-        # Konvertiere datetime_obj zu einem tatsächlichen UTC datetime-Objekt
-        if datetime_obj is None:
-            try:
-                # Versuche, aus Datum und Uhrzeit ein datetime-Objekt zu erstellen und in UTC zu konvertieren
-                dt_str = f"{date} {time}"
-                local_dt = datetime.strptime(dt_str, "%d.%m.%Y %H:%M")
-                # Lokale Zeit zu UTC konvertieren
-                self.datetime_obj = local_to_utc(local_dt)
-            except:
-                # Fallback auf aktuelle Zeit in UTC
-                self.datetime_obj = datetime.now(timezone.utc)
-                logger.warning(f"Konnte kein datetime-Objekt aus Datum '{date}' und Zeit '{time}' erstellen. Verwende aktuelle UTC-Zeit.")
-        elif isinstance(datetime_obj, str):
-            try:
-                # Versuche, den String in ein datetime-Objekt zu konvertieren
-                local_dt = datetime.fromisoformat(datetime_obj)
-                # In UTC konvertieren
-                self.datetime_obj = local_to_utc(local_dt)
-            except:
-                # Fallback auf aktuelle Zeit in UTC
-                self.datetime_obj = datetime.now(timezone.utc)
-                logger.warning(f"Konnte kein datetime-Objekt aus String '{datetime_obj}' erstellen. Verwende aktuelle UTC-Zeit.")
-        else:
-            # Stelle sicher, dass es UTC ist
-            self.datetime_obj = local_to_utc(datetime_obj)
-        
-        # Use provided event_id or generate a new one
-        if event_id:
-            self.event_id = event_id
-            logger.info(f"Using provided event_id: {event_id} for event: {title}")
+        A removed (e.g. archived) event leaves its pending cleanup in place - its thread
+        still has to be closed.
+        """
+        if event is None:
+            return
+        deadline = self.thread_deadline(event)
+        if deadline is None:
+            if event.thread_id:
+                self.thread_scheduler.cancel(int(event.thread_id))
         else:
-            # Generate a unique ID for the event that includes the UTC timestamp
-            timestamp = self.datetime_obj.strftime("%Y%m%d%H%M")
-            random_string = str(uuid.uuid4())[:8]  # Use first 8 characters of UUID
-            self.event_id = f"{timestamp}-{random_string}"
-            logger.info(f"Generated new event_id: {self.event_id} for event: {title}")
-    
-    def get(self, attr, default=None):
-        """Emulates dictionary-like get method to maintain compatibility."""
-        return getattr(self, attr, default)
-    
-    @staticmethod
-    def get_datetime_from_event_id(event_id):
-        """Extrahiert den Zeitstempel aus der Event-ID und gibt ein datetime-Objekt zurück."""
+            self.thread_scheduler.schedule(int(event.thread_id), deadline)
+
+    async def close_thread(self, thread_id):
+        """
+        Archives and locks or deletes one thread (THREAD_CLEANUP_ACTION).
+
+        Looks the thread up in the cache first and fetches it by ID otherwise, instead of
+        walking the archived threads of every channel. Returns True if the thread is closed
+        or gone, False if it should be tried again.
+        """
         try:
-            # Extrahiere den Zeitstempel-Teil (vor dem Bindestrich)
-            timestamp_str = event_id.split('-')[0]
-            # Konvertiere zu datetime mit UTC-Zeitzone
-            dt = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
-            return dt.replace(tzinfo=timezone.utc)
-        except:
-            # Bei Fehlern None zurückgeben
-            return None
-    
-    def to_dict(self):
-        """Convert the event to a dictionary for JSON serialization"""
-        # Convert datetime_obj to ISO format string for JSON serialization
-        datetime_str = None
-        if hasattr(self, 'datetime_obj') and self.datetime_obj:
+            thread = self.get_channel(thread_id)
+            if thread is None:
+                thread = await self.fetch_channel(thread_id)
+            if THREAD_CLEANUP_ACTION == "delete":
+                await thread.delete()
+            elif not thread.archived:
+                # Locked, so a late message cannot reopen it into the active thread cache
+                await thread.edit(archived=True, locked=True)
+            return True
+        except discord.NotFound:
+            return True
+        except discord.HTTPException as e:
+            logger.error(f"Could not {THREAD_CLEANUP_ACTION} thread {thread_id}: {e}")
+            return False
+
+    async def close_due_threads(self, thread_ids):
+        """
+        Thread scheduler callback - archives or deletes the threads of events that are over.
+
+        Threads due in the same minute arrive together; after downtime, all missed ones do.
+        Each closed thread is marked on its event, so a restart does not close it again.
+        """
+        now = datetime.now(timezone.utc)
+        closed = 0
+        for thread_id in thread_ids:
             try:
-                datetime_str = self.datetime_obj.isoformat()
-            except:
-                logger.warning(f"Could not convert datetime_obj to ISO format for event: {self.title}")
-        
-        # Get local date and time for display
-        local_format = None
-        if hasattr(self, 'datetime_obj') and self.datetime_obj:
+                event = store.find_by_thread(thread_id, include_cleaned=True)
+                if event is not None:
+                    deadline = self.thread_deadline(event)
+                    if deadline is None:
+                        continue
+                    if deadline > now:
+                        # Rescheduled in the meantime
+                        self.thread_scheduler.schedule(thread_id, deadline)
+                        continue
+
+                if not await self.close_thread(thread_id):
+                    self.thread_scheduler.schedule(thread_id, now + THREAD_CLEANUP_RETRY)
+                    continue
+                closed += 1
+
+                if event is not None:
+                    def apply_closed(work):
+                        work.thread_closed = True
+
+                    await mutate_event(event, apply_closed)
+            except Exception as e:
+                logger.error(f"Error closing thread {thread_id}: {e}")
+                self.thread_scheduler.retry([thread_id])
+        if closed:
+            action = "Deleted" if THREAD_CLEANUP_ACTION == "delete" else "Archived"
+            logger.info(f"{action} {closed} event threads after their events")
+
+    async def send_due_reminders(self, keys):
+        """
+        Reminder scheduler callback - sends one reminder per event, even if several of its
+        reminders are due at once (e.g. caught up after downtime)
+        """
+        due_offsets = {}
+        for event_id, offset in keys:
+            due_offsets.setdefault(event_id, []).append(offset)
+            self._armed_reminders.get(event_id, set()).discard((event_id, offset))
+
+        for event_id, offsets in due_offsets.items():
             try:
-                local_format = format_local_datetime(self.datetime_obj)
-                self.date = local_format["date"]
-                self.time = local_format["time"]
-            except:
-                logger.warning(f"Could not format local datetime for event: {self.title}")
-        
-        # Berechne Rollenanzahl über die zentrale Hilfsfunktion
-        filled_slots, total_slots = calculate_role_counts(self.roles, self.participants)
-        
-        return {
-            "title": self.title,
-            "date": self.date,
-            "time": self.time,
-            "description": self.description,
-            "roles": self.roles,
-            "participants": self.participants,
-            "event_id": self.event_id,  # Store the unique ID
-            "caller_id": self.caller_id,  # Store the creator's ID
-            "caller_name": self.caller_name,  # Store the creator's name
-            "message_id": self.message_id,  # Store the event post's message ID
-            "thread_id": self.thread_id,  # Store the event thread's ID
-            "participant_only_mode": self.participant_only_mode,  # Store the flag for participant-only mode
-            "mention_role_id": self.mention_role_id,  # Store the mention role ID
-            "datetime_obj": datetime_str,  # Store the datetime as ISO format string
-            "status": getattr(self, 'status', 'active'),  # Store the status, default to "active" if not set
-            "image_url": self.image_url,  # Store the image URL
-            "total_slots": total_slots,  # Store total role slots
-            "filled_slots": filled_slots  # Store filled role slots
-        }
+                event = store.find_by_id(event_id)
+                start = event_start(event) if event is not None else None
+                if event is None or event.status != "active" or start is None or start <= datetime.now(timezone.utc):
+                    continue
+
+                # Mark them sent before sending, so a crash cannot send a reminder twice
+                def apply_sent(work):
+                    new = [offset for offset in offsets if offset not in work.reminders_sent]
+                    work.reminders_sent.extend(new)
+                    return new
+
+                event, new_offsets = await mutate_event(event, apply_sent)
+                if not new_offsets:
+                    continue
+
+                guild = self.get_guild(AUTHORIZED_GUILD_ID) or (self.guilds[0] if self.guilds else None)
+                message = build_reminder_message(
+                    event, guild.id if guild else None,
+                    lead=f"Das Event beginnt in {format_time_until(start)}.")
+                success_count, failed_count = await send_reminder_dms(self, event, message)
+                logger.info(f"Automatic reminder for event {event.title} ({event_id}): "
+                            f"{success_count} sent, {failed_count} failed")
+
+                thread = self.get_channel(event.thread_id) if event.thread_id else None
+                if thread and success_count:
+                    await thread.send("Automatische Erinnerung an alle Teilnehmer per DN versendet.")
+            except Exception as e:
+                logger.error(f"Error sending automatic reminder for event {event_id}: {e}")
+                # Offsets already marked sent are skipped when they come up again
+                keys = [(event_id, offset) for offset in offsets]
+                self.reminder_scheduler.retry(keys)
+                self._armed_reminders.setdefault(event_id, set()).update(keys)
 
 class EventModal(discord.ui.Modal, title="Eventify"):
     def __init__(self, title: str, date: str, time: str, caller_id: str, caller_name: str, mention_role: discord.Role = None, image_url: str = None):
@@ -1532,15 +1368,15 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                     header_text = role.strip()[1:-1].strip()  # Remove first and last character and any whitespace
                     roles[i] = f"({header_text})"  # Store in a consistent format
             
-            # Find the Fill role - case insensitive check
-            fill_index = next((i for i, role in enumerate(roles) if role.lower() in ["fill", "fillall"]), None)
+            # Find the Fill role in the input - case insensitive check
+            fill_index = next((i for i, role in enumerate(roles) if role.lower() in FILLALL_ALIASES), None)
             if fill_index is None:
                 # If no Fill role found, add one
                 fill_index = len(roles)
-                roles.append("FILLALL")
+                roles.append(FILLALL_ROLE)
             else:
-                # Make sure it's consistently named "FILLALL"
-                roles[fill_index] = "FILLALL"
+                # Make sure it's consistently named FILLALL_ROLE
+                roles[fill_index] = FILLALL_ROLE
             
             # Make sure FILLALL is always the last role
             if fill_index < len(roles) - 1:
@@ -1620,8 +1456,8 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                 section_headers = []
                 fill_index = None
                 
-                # Find the Fill role - case insensitive check
-                fill_index = next((i for i, role in enumerate(event.roles) if role.lower() in ["fill", "fillall"]), None)
+                fill_key = event.fillall_key
+                fill_index = event.role_ids.index(fill_key) if fill_key else None
                 
                 for i, role in enumerate(event.roles):
                     if i != fill_index:  # Everything except the FILLALL role
@@ -1653,7 +1489,7 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                 # Add all regular roles as a single field
                 if field_content:
                     # Count total roles (excluding section headers and FILLALL)
-                    total_roles = len([r for r in event.roles if not (r.strip().startswith('(') and r.strip().endswith(')')) and r.lower() not in ["fill", "fillall"]])
+                    total_roles = len([r for r in event.roles if not (r.strip().startswith('(') and r.strip().endswith(')')) and r != FILLALL_ROLE])
                     embed.add_field(name=f"Rollen (0/{total_roles})", value=field_content, inline=False)
                 
                 if fill_index is not None:
@@ -1667,6 +1503,7 @@ class EventModal(discord.ui.Modal, title="Eventify"):
             channel = interaction.guild.get_channel(CHANNEL_ID_EVENT)
             event_post = await channel.send(embed=embed)
             logger.info(f"Event post created for '{event.title}' with message ID: {event_post.id}")
+            await record_bot_message(event_post, "event")
             
             try:
                 logger.info(f"Attempting to create thread for '{event.title}'")
@@ -1753,9 +1590,8 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                 
                 # Verify event data is properly stored
                 try:
-                    # Reload events from JSON to verify the event was properly saved
-                    verification_events = load_upcoming_events(include_expired=True)
-                    verification_event = next((e for e in verification_events["events"] if e.get('thread_id') == thread.id), None)
+                    # Look the event up in the store to verify the event was properly saved
+                    verification_event = store.find_by_thread(thread.id)
                     
                     if verification_event:
                         logger.info(f"[Thread Creation] Event verification successful - found event in JSON with thread_id: {thread.id}")
@@ -1790,12 +1626,12 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                 # Rollen hinzufügen, falls es keine Teilnehmer-only Veranstaltung ist
                 if not event.participant_only_mode and event.roles:
                     # Entferne FILLALL aus der Rollenliste für die Vorlage, da es automatisch hinzugefügt wird
-                    roles_list = [role for role in event.roles if role.lower() != "fillall"]
+                    roles_list = [role for role in event.roles if role != FILLALL_ROLE]
                     roles_text = "\\n".join(roles_list)
                     template_command += f" roles:{roles_text}"
                 
                 # Mention-Rolle mit angeben, wenn vorhanden
-                if hasattr(event, 'mention_role_id') and event.mention_role_id:
+                if event.mention_role_id:
                     try:
                         mention_role = interaction.guild.get_role(int(event.mention_role_id))
                         if mention_role:
@@ -1806,7 +1642,7 @@ class EventModal(discord.ui.Modal, title="Eventify"):
                         template_command += " mention_role:"
                 
                 # Bild-URL hinzufügen, falls vorhanden
-                if hasattr(event, 'image_url') and event.image_url:
+                if event.image_url:
                     template_command += f" image_url:{event.image_url}"
                 
                 # Sende die Vorlage als direkte Nachricht an den Event-Ersteller
@@ -1922,22 +1758,21 @@ event_listing_lock = asyncio.Lock()
 async def create_event_listing(guild):
     # Lock zur Vermeidung paralleler Ausführungen
     async with event_listing_lock:
-        # Lösche alte Übersicht
+        # Lösche alte Übersicht (alle Nachrichten, nicht nur die erste)
         channel = guild.get_channel(CHANNEL_ID_EVENT)
-        old_message_id = load_overview_id()
+        old_message_ids = ledger.by_purpose("overview")
+        old_message_id = await load_overview_id()
+        if old_message_id and int(old_message_id) not in old_message_ids:
+            # Overview posted before the ledger existed
+            old_message_ids.append(int(old_message_id))
         
-        if channel and old_message_id:
-            try:
-                old_message = await channel.fetch_message(int(old_message_id))
-                await old_message.delete()
-                logger.info(f"Alte Eventübersicht gelöscht: {old_message_id}")
-            except discord.NotFound:
-                logger.info(f"Alte Übersichtsnachricht existiert nicht mehr")
-            except discord.HTTPException as e:
-                logger.warning(f"Konnte alte Übersicht nicht löschen: {e}")
+        if channel and old_message_ids:
+            gone = await delete_channel_messages(channel, old_message_ids)
+            ledger.forget(gone)
+            logger.info(f"Alte Eventübersicht gelöscht: {len(gone)} Nachrichten")
         
-        # Lade nur aktive Events (keine abgelaufenen oder bereinigten)
-        events_data = load_upcoming_events(include_expired=False, include_cleaned=False)
+        # Nur aktive Events (keine abgelaufenen oder bereinigten)
+        events_data = {"events": store.events()}
         
         # Create base embed
         base_embed = discord.Embed(
@@ -1949,7 +1784,8 @@ async def create_event_listing(guild):
             logger.info("No upcoming events to list.")
             base_embed.description = "Aktuell sind keine Events geplant."
             message = await channel.send(embed=base_embed)
-            save_overview_id(message.id)
+            await record_bot_message(message, "overview")
+            await save_overview_id(message.id)
             return message
         
         # Get the guild ID for links
@@ -1962,35 +1798,35 @@ async def create_event_listing(guild):
         
         # Filter events where no corresponding event post exists and ensure only active events are shown
         valid_events = []
+        orphaned_event_ids = []
         for event in events_data["events"]:
-            if not isinstance(event, dict):
-                logger.warning(f"Invalid event format: {event}")
-                continue
-                
-            message_id = event.get("message_id")
-            status = event.get("status", "active")
+            message_id = event.message_id
+            status = event.status
             
             # Skip events without message_id or non-active events
             if not message_id:
-                logger.warning(f"Event {event.get('title')} has no message_id and will be skipped.")
+                logger.warning(f"Event {event.title} has no message_id and will be skipped.")
+                orphaned_event_ids.append(event.event_id)
                 continue
                 
             if status != "active":
-                logger.info(f"Event {event.get('title')} has status '{status}' and will be skipped from overview.")
+                logger.info(f"Event {event.title} has status '{status}' and will be skipped from overview.")
                 continue
                 
             valid_events.append(event)
         
         # Update the events.json to remove orphaned events
-        if len(valid_events) < len(events_data["events"]):
-            logger.info(f"Remove {len(events_data['events']) - len(valid_events)} orphaned events from the JSON.")
-            save_events_to_json({"events": valid_events})
+        if orphaned_event_ids:
+            logger.info(f"Remove {len(orphaned_event_ids)} orphaned events from the JSON.")
+            store.remove(orphaned_event_ids)
+            await store.asave()
         
         if not valid_events:
             logger.info("No valid events with existing posts found.")
             base_embed.description = "Aktuell sind keine Events geplant."
             message = await channel.send(embed=base_embed)
-            save_overview_id(message.id)
+            await record_bot_message(message, "overview")
+            await save_overview_id(message.id)
             return message
         
         # Sort events by date and time
@@ -1999,24 +1835,20 @@ async def create_event_listing(guild):
             events_with_datetime = []
             for event in valid_events:
                 # Try to convert date and time to a datetime object
-                if 'datetime_obj' in event and event['datetime_obj']:
-                    try:
-                        dt_obj = datetime.fromisoformat(event['datetime_obj'])
-                        # Stelle sicher, dass es UTC ist
-                        if dt_obj.tzinfo is None:
-                            dt_obj = dt_obj.replace(tzinfo=timezone.utc)
-                        events_with_datetime.append((event, dt_obj))
-                    except (ValueError, TypeError):
-                        # If datetime_obj parsing fails, try date and time fields
-                        dt_obj = None
+                if event.datetime_obj:
+                    dt_obj = event.datetime_obj
+                    # Stelle sicher, dass es UTC ist
+                    if dt_obj.tzinfo is None:
+                        dt_obj = dt_obj.replace(tzinfo=timezone.utc)
+                    events_with_datetime.append((event, dt_obj))
                 else:
                     dt_obj = None
                 
                 # If datetime_obj is not available or invalid, parse date and time
                 if dt_obj is None:
                     try:
-                        date_str = event['date']
-                        time_str = event['time']
+                        date_str = event.date
+                        time_str = event.time
                         # Convert German date format (dd.mm.yyyy) to datetime
                         day, month, year = map(int, date_str.split('.'))
                         hour, minute = map(int, time_str.split(':'))
@@ -2024,7 +1856,7 @@ async def create_event_listing(guild):
                         local_dt = datetime(year, month, day, hour, minute)
                         dt_obj = local_to_utc(local_dt)
                     except (ValueError, KeyError) as e:
-                        logger.error(f"Error parsing date/time for event {event.get('title', 'unknown')}: {e}")
+                        logger.error(f"Error parsing date/time for event {event.title}: {e}")
                         # Add the event with the current timestamp so it is displayed
                         dt_obj = datetime.now(timezone.utc)
                     
@@ -2040,7 +1872,7 @@ async def create_event_listing(guild):
         # Group events by date
         events_by_date = {}
         for event in sorted_events:
-            date = event.get('date', 'Unknown date')
+            date = event.date
             if date not in events_by_date:
                 events_by_date[date] = []
             events_by_date[date].append(event)
@@ -2061,31 +1893,27 @@ async def create_event_listing(guild):
             current_description = ""
             
             for event in date_events:
-                title = event.get('title', 'Unbekanntes Event')
-                time = event.get('time', '')
-                caller_id = event.get('caller_id', None)
-                caller_name = event.get('caller_name', None)  # Get the caller's name
-                message_id = event.get('message_id')
+                title = event.title
+                time = event.time
+                caller_id = event.caller_id
+                caller_name = event.caller_name  # Get the caller's name
+                message_id = event.message_id
                 
                 # Berechne die Rollenanzahl neu für die korrekte Anzeige
                 # Falls keine Rollen im Event sind, bleiben die Werte bei 0
-                filled_slots, total_slots = calculate_role_counts(event.get('roles', []), event.get('participants', {}))
+                filled_slots, total_slots = calculate_role_counts(event.roles, event.participants, event.role_ids)
                 
                 # Create role count display
                 role_count_display = ""
-                if event.get('participant_only_mode', False):
+                if event.participant_only_mode:
                     # Für Nur-Teilnehmer-Modus zählen wir einfach die Anzahl der Teilnehmer
                     participant_count = 0
-                    if event.get('roles', []) and event.get('participants', {}):
+                    if event.roles and event.participants:
                         # Im participant_only_mode ist nur die erste Rolle relevant (Index 0)
-                        role_key = f"0:{event['roles'][0]}"
-                        if role_key in event['participants']:
+                        role_key = event.role_key(0)
+                        if role_key in event.participants:
                             # Zähle die eindeutigen Teilnehmer
-                            unique_participants = set()
-                            for participant in event['participants'][role_key]:
-                                if len(participant) >= 2:
-                                    unique_participants.add(participant[1])
-                            participant_count = len(unique_participants)
+                            participant_count = len({p.user_id for p in event.participants[role_key]})
                     role_count_display = f" ({participant_count})"
                 elif total_slots > 0:
                     role_count_display = f" ({filled_slots}/{total_slots})"
@@ -2148,12 +1976,13 @@ async def create_event_listing(guild):
         
         for i, embed in enumerate(embeds):
             message = await channel.send(embed=embed)
+            await record_bot_message(message, "overview")
             if i == 0:  # Store the ID of the first message only
                 first_message = message
         
         if first_message:
             # Speichere die ID der ersten Übersichtsnachricht
-            save_overview_id(first_message.id)
+            await save_overview_id(first_message.id)
             logger.info(f"Neue Eventübersicht erstellt: {first_message.id}")
         
         logger.info(f"Event listing created successfully with {len(embeds)} embeds.")
@@ -2194,6 +2023,15 @@ def parse_time(time_str: str):
         print(f"Error parsing time: {e}")
         return None
 
+def format_participant(participant):
+    """Mention of a participant for the event post, followed by the comment cut to 30 characters"""
+    comment = participant.comment
+    if not comment:
+        return f"<@{participant.user_id}>"
+    if len(comment) > 30:
+        comment = comment[:30] + "..."
+    return f"<@{participant.user_id}> {comment}"
+
 def get_weekday_abbr(date_str: str):
     """
     Returns the German weekday abbreviation for a date in format DD.MM.YYYY.
@@ -2213,263 +2051,26 @@ def get_weekday_abbr(date_str: str):
         return ""
 
 def save_event_to_json(event):
+    """Inserts or updates a single event in the event store and persists it."""
     try:
-        # Check if file exists, create it if not
-        if not os.path.exists(EVENTS_JSON_FILE):
-            logger.info(f"Creating new events file: {EVENTS_JSON_FILE}")
-            with open(EVENTS_JSON_FILE, 'w') as f:
-                json.dump({"events": []}, f, indent=4)
-        
-        # Load existing events
-        with open(EVENTS_JSON_FILE, 'r') as f:
-            try:
-                events_data = json.load(f)
-                logger.info(f"Loaded {len(events_data.get('events', []))} existing events from {EVENTS_JSON_FILE}")
-            except json.JSONDecodeError:
-                # File is corrupted, reset it
-                logger.error(f"JSON file is corrupted. Resetting {EVENTS_JSON_FILE}")
-                events_data = {"events": []}
-        
-        # Validate format
-        if not isinstance(events_data, dict) or "events" not in events_data:
-            logger.warning(f"Invalid format in {EVENTS_JSON_FILE}, resetting to empty events list")
-            events_data = {"events": []}
-        
-        # Falls das Event ein Dictionary ist, berechne die Rollenanzahl neu
-        if isinstance(event, dict) and not hasattr(event, 'to_dict'):
-            # Berechne filled_slots und total_slots direkt hier
-            filled_slots, total_slots = calculate_role_counts(event.get('roles', []), event.get('participants', {}))
-            event['filled_slots'] = filled_slots
-            event['total_slots'] = total_slots
-            
-            # Stelle sicher, dass der Status auf "active" gesetzt ist, falls es ein neues Event ist
-            if 'status' not in event:
-                event['status'] = "active"
-                logger.info(f"Setting initial status 'active' for event: {event.get('title', 'Unknown')}")
-            
-            logger.info(f"Updated role counts for event: {event.get('title', 'Unknown')}, slots: {filled_slots}/{total_slots}, status: {event.get('status', 'active')}")
-        
-        # Check if the event already exists by the event_id
-        event_exists = False
-        event_id = None
-        
-        # Extract the event_id
-        if isinstance(event, dict):
-            event_id = event.get("event_id")
-        else:
-            event_id = getattr(event, "event_id", None)
-        
-        # If no event_id is present (for older events), generate one
-        if not event_id:
-            timestamp = datetime.now().strftime("%Y%m%d%H%M")
-            random_string = str(uuid.uuid4())[:8]
-            event_id = f"{timestamp}-{random_string}"
-            logger.info(f"Generated new event_id: {event_id} for event: {event.get('title') if isinstance(event, dict) else event.title}")
-            
-            if isinstance(event, dict):
-                event["event_id"] = event_id
-            else:
-                event.event_id = event_id
-        
-        # Search for the event by the ID only - this is the unique identifier
-        for i, e in enumerate(events_data["events"]):
-            if e.get("event_id") == event_id:
-                # Update existing event
-                logger.info(f"Updating existing event with ID: {event_id}")
-                if hasattr(event, 'to_dict'):
-                    events_data["events"][i] = event.to_dict()
-                else:
-                    events_data["events"][i] = event
-                event_exists = True
-                break
-        
-        # If event doesn't exist, add it as a new event
-        # We no longer check for title match - this allows multiple events with the same title
-        if not event_exists:
-            event_title = event["title"] if isinstance(event, dict) else event.title
-            logger.info(f"Adding new event: {event_title} with ID: {event_id}")
-            
-            # Stelle sicher, dass neue Events immer den Status "active" haben
-            if hasattr(event, 'to_dict'):
-                event_dict = event.to_dict()
-                # Überprüfe und setze den Status für neue Events
-                if event_dict.get('status') != "active":
-                    logger.info(f"Ensuring new event '{event_title}' has status 'active' instead of '{event_dict.get('status')}'")
-                    event_dict['status'] = "active"
-                events_data["events"].append(event_dict)
-            else:
-                # Überprüfe und setze den Status für neue Events
-                if isinstance(event, dict) and event.get('status') != "active":
-                    logger.info(f"Ensuring new event '{event_title}' has status 'active' instead of '{event.get('status')}'")
-                    event['status'] = "active"
-                events_data["events"].append(event)
-        
-        # Save back to file
-        with open(EVENTS_JSON_FILE, 'w') as f:
-            json.dump(events_data, f, indent=4)
-        
-        logger.info(f"Successfully saved events to {EVENTS_JSON_FILE}, total events: {len(events_data.get('events', []))}")
-        return True
+        store.upsert(event)
+        return store.request_save()
     except Exception as e:
         logger.error(f"Error saving event to JSON: {e}")
         return False
 
-def clean_old_events(events_data):
-    """Markiert Events als abgelaufen (expired), wenn sie seit mehr als einer Stunde begonnen haben (UTC)."""
-    updated_events = []
-    expired_count = 0
-    already_expired = 0
-    
-    # Aktuelle Zeit in UTC
-    now = datetime.now(timezone.utc)
-    
-    for event in events_data["events"]:
-        current_status = event.get("status", "active")
-        event_title = event.get("title", "Unknown Event")
-        
-        # Überspringe bereits bereinigte Events ("cleaned")
-        if current_status == "cleaned":
-            updated_events.append(event)
-            continue
-            
-        # Prüfe bereits abgelaufene Events
-        if current_status == "expired":
-            already_expired += 1
-            updated_events.append(event)
-            continue
-            
-        try:
-            # Verwende das datetime_obj (ist bereits in UTC)
-            if "datetime_obj" in event and event["datetime_obj"]:
-                event_dt = datetime.fromisoformat(event["datetime_obj"])
-                if event_dt.tzinfo is None:
-                    event_dt = event_dt.replace(tzinfo=timezone.utc)
-                
-                # Prüfe ob Event seit mehr als einer Stunde läuft (alles in UTC)
-                if now > event_dt + timedelta(hours=1) and current_status == "active":
-                    event["status"] = "expired"
-                    expired_count += 1
-                    logger.info(f"Event expired (UTC): {event_title} (Started: {event_dt}, Current: {now}")
-            
-        except Exception as e:
-            logger.error(f"Error processing event {event_title}: {e}")
-        
-        updated_events.append(event)
-    
-    if expired_count > 0:
-        logger.info(f"Marked {expired_count} events as expired")
-    
-    if already_expired > 0:
-        logger.info(f"Found {already_expired} events already marked as expired")
-    
-    events_data["events"] = updated_events
-    return events_data
-
-def load_upcoming_events(include_expired=False, include_cleaned=False):
+async def mutate_event(event, mutator):
     """
-    Lade Events aus der JSON-Datei mit optionaler Statusfilterung
-    
-    Args:
-        include_expired: Wenn True, werden auch abgelaufene Events (status="expired") zurückgegeben
-        include_cleaned: Wenn True, werden auch bereinigte Events (status="cleaned") zurückgegeben
-        
-    Returns:
-        Dictionary mit Events, gefiltert nach Status
-    """
-    try:
-        # Use absolute path from the script's location
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        events_file = os.path.join(script_dir, 'events.json')
-        
-        if not os.path.exists(events_file):
-            logger.info("events.json nicht gefunden - erstelle neue Datei")
-            # Create the file with empty events list
-            with open(events_file, 'w', encoding='utf-8') as f:
-                json.dump({"events": []}, f, indent=4)
-            return {"events": []}
-            
-        with open(events_file, 'r', encoding='utf-8') as f:
-            events = json.load(f)
-            if not isinstance(events, dict):
-                logger.error("Invalid events format in events.json")
-                return {"events": []}
-            if "events" not in events:
-                logger.error("Missing 'events' key in events.json")
-                return {"events": []}
-            
-            # Aktualisiere Status der Events
-            events = clean_old_events(events)
-            
-            # Speichere die aktualisierten Status zurück
-            with open(events_file, 'w', encoding='utf-8') as f:
-                json.dump(events, f, indent=4)
-            
-            # Filtere nach Status, falls erforderlich
-            if not include_expired and not include_cleaned:
-                # Nur aktive Events für die Anzeige
-                filtered_events = {"events": []}
-                
-                for event in events["events"]:
-                    if event.get("status", "active") == "active":
-                        filtered_events["events"].append(event)
-                
-                logger.info(f"Loaded {len(filtered_events['events'])} active events from events.json")
-                return filtered_events
-            elif not include_cleaned:
-                # Aktive und abgelaufene Events (für Thread-Management)
-                filtered_events = {"events": []}
-                
-                for event in events["events"]:
-                    if event.get("status", "active") != "cleaned":
-                        filtered_events["events"].append(event)
-                
-                logger.info(f"Loaded {len(filtered_events['events'])} non-cleaned events from events.json")
-                return filtered_events
-            else:
-                # Alle Events (für administrative Zwecke)
-                logger.info(f"Loaded all {len(events['events'])} events from events.json")
-                return events
-    except json.JSONDecodeError as e:
-        logger.error(f"Error decoding events.json: {e}")
-        return {"events": []}
-    except Exception as e:
-        logger.error(f"Unexpected error loading events: {e}")
-        return {"events": []}
+    Applies a change to an event without losing concurrent updates and schedules the save.
 
-def save_events_to_json(events):
-    """Save events to JSON file"""
-    try:
-        # Ensure we have the right format
-        if isinstance(events, list):
-            events_data = {"events": events}
-        elif isinstance(events, dict) and "events" in events:
-            events_data = events
-        else:
-            logger.error("Invalid events format for save_events_to_json")
-            return False
-            
-        # Aktualisiere Rollenanzahl für alle Dictionary-Events
-        for event in events_data.get("events", []):
-            if isinstance(event, dict) and not hasattr(event, 'to_dict'):
-                # Berechne filled_slots und total_slots
-                filled_slots, total_slots = calculate_role_counts(event.get('roles', []), event.get('participants', {}))
-                event['filled_slots'] = filled_slots
-                event['total_slots'] = total_slots
-            
-        # Aktualisiere Event-Status (markiere abgelaufene Events)
-        events_data = clean_old_events(events_data)
-            
-        # Use absolute path from the script's location
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        events_file = os.path.join(script_dir, 'events.json')
-        
-        with open(events_file, 'w', encoding='utf-8') as f:
-            json.dump(events_data, f, indent=4)
-        logger.info(f"Successfully saved events to events.json, total events: {len(events_data['events'])}")
-        return True
-    except Exception as e:
-        logger.error(f"Error saving events to JSON: {e}")
-        return False
+    The mutator gets a working copy of the current state and must not send messages or
+    touch anything but that copy; it is re-run if another change to the event was
+    committed in the meantime (see EventStore.amutate). Returns (event, result) with
+    the resident (updated) event and the mutator's return value.
+    """
+    event, result = await store.amutate(event.event_id, mutator)
+    store.request_save()
+    return event, result
 
 @bot.tree.command(name="eventify", description="Erstelle ein Event")
 @app_commands.describe(
@@ -2542,15 +2143,15 @@ async def eventify(
                         header_text = role.strip()[1:-1].strip()  # Remove first and last character and any whitespace
                         roles_list[i] = f"({header_text})"  # Store in a consistent format
                 
-                # Find the Fill role - case insensitive check
-                fill_index = next((i for i, role in enumerate(roles_list) if role.lower() in ["fill", "fillall"]), None)
+                # Find the Fill role in the input - case insensitive check
+                fill_index = next((i for i, role in enumerate(roles_list) if role.lower() in FILLALL_ALIASES), None)
                 if fill_index is None:
                     # If no Fill role found, add one
                     fill_index = len(roles_list)
-                    roles_list.append("FILLALL")
+                    roles_list.append(FILLALL_ROLE)
                 else:
-                    # Make sure it's consistently named "FILLALL"
-                    roles_list[fill_index] = "FILLALL"
+                    # Make sure it's consistently named FILLALL_ROLE
+                    roles_list[fill_index] = FILLALL_ROLE
                 
                 # Make sure FILLALL is always the last role
                 if fill_index < len(roles_list) - 1:
@@ -2660,7 +2261,7 @@ async def eventify(
             # Add all regular roles as a single field
             if field_content:
                 # Count total roles (excluding section headers and FILLALL)
-                total_roles = len([r for r in roles_list if not (r.strip().startswith('(') and r.strip().endswith(')')) and r.lower() not in ["fill", "fillall"]])
+                total_roles = len([r for r in roles_list if not (r.strip().startswith('(') and r.strip().endswith(')')) and r != FILLALL_ROLE])
                 if is_participant_only_mode:
                     embed.add_field(name="Rollen (0)", value=field_content, inline=False)
                 else:
@@ -2671,15 +2272,15 @@ async def eventify(
                 fill_text = f"{role_counter}. {roles_list[fill_index]}"
                 
                 # Get participants for Fill role
-                fill_key = f"{fill_index}:{roles_list[fill_index]}"
+                fill_key = event.role_key(fill_index)
                 fill_participants = event.participants.get(fill_key, [])
                 
                 if fill_participants:
                     # Sort participants by timestamp
-                    sorted_fill = sorted(fill_participants, key=lambda x: x[2] if len(x) > 2 else 0)
+                    sorted_fill = sorted(fill_participants, key=lambda p: p.timestamp)
                     
                     # Display all participants for FillALL without extra newline
-                    fill_players_text = fill_text + "\n" + "\n".join([f"<@{p[1]}>" + (f" {p[3][:30] + '...' if len(p) > 3 and p[3] and len(p[3]) > 30 else p[3]}" if len(p) > 3 and p[3] else "") for p in sorted_fill if len(p) >= 2])
+                    fill_players_text = fill_text + "\n" + "\n".join(format_participant(p) for p in sorted_fill)
                     
                     # Add Fill role to embed with empty name to reduce spacing
                     embed.add_field(name="", value=fill_players_text or fill_text, inline=False)
@@ -2700,6 +2301,7 @@ async def eventify(
             # Send the temporary event post without the image
             event_post = await channel.send(embed=temp_embed)
             logger.info(f"Temporary event post created for '{event.title}' with message ID: {event_post.id}")
+            await record_bot_message(event_post, "event")
             
             try:
                 logger.info(f"Attempting to create thread for '{event.title}'")
@@ -2756,9 +2358,8 @@ async def eventify(
                 
                 # Verify event data is properly stored
                 try:
-                    # Reload events from JSON to verify the event was properly saved
-                    verification_events = load_upcoming_events(include_expired=True)
-                    verification_event = next((e for e in verification_events["events"] if e.get('thread_id') == thread.id), None)
+                    # Look the event up in the store to verify the event was properly saved
+                    verification_event = store.find_by_thread(thread.id)
                     
                     if verification_event:
                         logger.info(f"[Thread Creation] Event verification successful - found event in JSON with thread_id: {thread.id}")
@@ -2856,6 +2457,54 @@ async def eventify(
         print(f"Error in create_event: {e}")
         await interaction.response.send_message(f"Ein Fehler ist aufgetreten: {str(e)}", ephemeral=True)
 
+def build_reminder_message(event, guild_id, comment=None, lead=None):
+    """Builds the reminder DM for an event, optionally with a comment and a lead line (automatic reminders)"""
+    reminder_message = (
+        f"**Erinnerung** an Event: {event.title}\n"
+        f"Datum: {event.date} ({get_weekday_abbr(event.date)})\n"
+        f"Uhrzeit: {event.time}\n"
+    )
+    if lead:
+        reminder_message += f"{lead}\n"
+
+    # Add the custom message if it exists
+    if comment:
+        reminder_message += f"Kommentar: **{comment}**\n"
+
+    if event.message_id and guild_id:
+        reminder_message += f"[Zum Event](https://discord.com/channels/{guild_id}/{CHANNEL_ID_EVENT}/{event.message_id})"
+    return reminder_message
+
+async def send_reminder_dms(client, event, reminder_message):
+    """
+    Sends the reminder to every participant of the event once, a few DMs at a time.
+
+    Returns (success_count, failed_count).
+    """
+    # Collect all unique participants
+    participant_ids = {participant.user_id for entries in event.participants.values() for participant in entries}
+    semaphore = asyncio.Semaphore(REMINDER_DM_CONCURRENCY)
+
+    async def send(participant_id):
+        async with semaphore:
+            try:
+                user = await client.fetch_user(int(participant_id))
+                await user.send(reminder_message)
+                return True
+            except Exception as e:
+                logger.error(f"Failed to send reminder to user {participant_id}: {e}")
+                return False
+
+    results = await asyncio.gather(*(send(participant_id) for participant_id in participant_ids))
+    return sum(results), len(results) - sum(results)
+
+def format_time_until(start):
+    """German duration until start for reminder texts, e.g. "30 Minuten" or "24 Stunden"."""
+    minutes = max(1, round((start - datetime.now(timezone.utc)).total_seconds() / 60))
+    if minutes < 120:
+        return f"{minutes} Minuten"
+    return f"{round(minutes / 60)} Stunden"
+
 @bot.tree.command(name="remind", description="Sende eine Erinnerung an alle eingetragenen Teilnehmer")
 @app_commands.guild_only()
 async def remind_participants(interaction: discord.Interaction, comment: str = None):
@@ -2865,83 +2514,49 @@ async def remind_participants(interaction: discord.Interaction, comment: str = N
             await interaction.response.send_message("Dieser Befehl kann nur in einem Event-Thread verwendet werden.", ephemeral=True)
             return
 
-        # Load the event (auch abgelaufene Events einschließen)
-        events_data = load_upcoming_events(include_expired=True)
+        # Find the event (auch abgelaufene Events einschließen)
         # First try to find the event by thread_id (most reliable)
         thread_id = interaction.channel.id
-        event = next((e for e in events_data["events"] if e.get('thread_id') == thread_id), None)
+        event = store.find_by_thread(thread_id)
         
         # Fallback: try to find by title (for backwards compatibility)
         if not event:
-            event = next((e for e in events_data["events"] if e.get('title') == interaction.channel.name), None)
+            event = store.find_by_title(interaction.channel.name)
 
         if not event:
             await interaction.response.send_message("Kein passendes Event für diesen Thread gefunden.", ephemeral=True)
             return
             
         # Prüfe, ob das Event abgesagt wurde
-        if event.get('status') == "canceled" or "[ABGESAGT]" in event.get('title', ''):
+        if event.status == "canceled" or "[ABGESAGT]" in event.title:
             await interaction.response.send_message("Dieses Event wurde abgesagt. Erinnerungen können nicht mehr versendet werden.", ephemeral=True)
             return
 
         # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
         try:
             # Event-Zeit direkt aus datetime_obj verwenden
-            event_dt = datetime.fromisoformat(event.get('datetime_obj'))
+            event_dt = event.datetime_obj
             now = datetime.now(timezone.utc)
             
             # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Slash-Befehl blockieren
             if now > event_dt + timedelta(hours=1):
                 # Benutzer informieren (ephemeral im Thread)
                 await interaction.response.send_message("Erinnerungen sind nicht mehr möglich, da das Event vor über einer Stunde begonnen hat.", ephemeral=True)
-                logger.info(f"Blocked /remind command from {interaction.user.name} - event {event.get('title')} started more than 1 hour ago")
+                logger.info(f"Blocked /remind command from {interaction.user.name} - event {event.title} started more than 1 hour ago")
                 return
         except Exception as e:
             logger.error(f"Error checking event time for /remind command: {e}")
             # Im Fehlerfall Command dennoch erlauben
 
         # Remove the check that restricts to event creator
-        # if str(interaction.user.id) != event.get('caller_id'):
+        # if str(interaction.user.id) != event.caller_id:
         #     await interaction.response.send_message("Nur der Event-Ersteller kann Erinnerungen versenden.", ephemeral=True)
         #     return
 
-        # Create the event link
-        message_id = event.get('message_id')
-        guild_id = interaction.guild.id
-        event_link = f"https://discord.com/channels/{guild_id}/{CHANNEL_ID_EVENT}/{message_id}" if message_id else None
-
-        # Collect all unique participants
-        participant_ids = set()
-        for role_key, participants in event.get('participants', {}).items():
-            for participant in participants:
-                if len(participant) >= 2:  # Ensure we have an ID
-                    participant_ids.add(participant[1])  # participant[1] is the Discord ID
-
         # Send DMs to all participants
-        success_count = 0
-        failed_count = 0
-        for participant_id in participant_ids:
-            try:
-                user = await interaction.client.fetch_user(int(participant_id))
-                if user:
-                    reminder_message = (
-                        f"**Erinnerung** an Event: {event['title']}\n"
-                        f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                        f"Uhrzeit: {event['time']}\n"
-                    )
-                    
-                    # Add the custom message if it exists
-                    if comment:
-                        reminder_message += f"Kommentar: **{comment}**\n"
-                    
-                    if event_link:
-                        reminder_message += f"[Zum Event]({event_link})"
-                    
-                    await user.send(reminder_message)
-                    success_count += 1
-            except Exception as e:
-                logger.error(f"Failed to send reminder to user {participant_id}: {e}")
-                failed_count += 1
+        reminder_message = build_reminder_message(event, interaction.guild.id, comment=comment)
+        success_count, failed_count = await send_reminder_dms(interaction.client, event, reminder_message)
+        logger.info(f"{interaction.user.name} sent reminders for event {event.title}: {success_count} sent, {failed_count} failed")
         
         # Add message in thread about the reminder
         comment_text = ""
@@ -2958,6 +2573,56 @@ async def remind_participants(interaction: discord.Interaction, comment: str = N
             ephemeral=True
         )
 
+@bot.tree.command(name="reminders", description="Legt die automatischen Erinnerungen für dieses Event fest")
+@app_commands.describe(
+    zeiten="Zeitpunkte vor Eventbeginn, z.B. 24h,30m - 'aus' für keine, 'standard' für die Servereinstellung"
+)
+@app_commands.guild_only()
+async def set_reminders(interaction: discord.Interaction, zeiten: str):
+    try:
+        if not isinstance(interaction.channel, discord.Thread):
+            await interaction.response.send_message("Dieser Befehl kann nur in einem Event-Thread verwendet werden.", ephemeral=True)
+            return
+
+        event = store.find_by_thread(interaction.channel.id)
+        if not event or event.status != "active":
+            await interaction.response.send_message("Kein aktives Event für diesen Thread gefunden.", ephemeral=True)
+            return
+
+        if str(interaction.user.id) != str(event.caller_id):
+            await interaction.response.send_message("Nur der Event-Ersteller kann die Erinnerungen festlegen.", ephemeral=True)
+            return
+
+        if zeiten.strip().lower() in ("standard", "default"):
+            offsets = None
+        else:
+            try:
+                offsets = parse_reminder_offsets(zeiten)
+            except ValueError:
+                await interaction.response.send_message(
+                    "Ungültige Angabe. Beispiel: `24h,30m` (m = Minuten, h = Stunden, d = Tage) oder `aus`.",
+                    ephemeral=True)
+                return
+
+        def apply_reminders(work):
+            work.reminders = offsets
+
+        # The store listener re-arms the reminder scheduler with the new offsets
+        await mutate_event(event, apply_reminders)
+
+        effective = DEFAULT_REMINDERS if offsets is None else offsets
+        if effective:
+            text = ", ".join(format_reminder_offset(offset) for offset in effective) + " vor Beginn"
+        else:
+            text = "keine"
+        suffix = " (Servereinstellung)" if offsets is None else ""
+        await interaction.response.send_message(f"Automatische Erinnerungen: {text}{suffix}", ephemeral=True)
+        logger.info(f"{interaction.user.name} set reminders of event {event.title} to {offsets}")
+
+    except Exception as e:
+        logger.error(f"Error in set_reminders: {e}")
+        await interaction.response.send_message("Ein Fehler ist beim Festlegen der Erinnerungen aufgetreten.", ephemeral=True)
+
 @bot.tree.command(name="cancel", description="Sagt ein Event ab und benachrichtigt alle Teilnehmer")
 @app_commands.describe(
     reason="Optional: Der Grund für die Absage des Events"
@@ -2973,38 +2638,39 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
         
         thread = interaction.channel
         
-        # Events laden
-        events_data = load_upcoming_events()
-        if not events_data or "events" not in events_data:
-            await interaction.response.send_message("Keine Events gefunden.", ephemeral=True)
-            return
-        
-        # Event finden
-        event = None
-        for e in events_data["events"]:
-            if str(e.get("thread_id")) == str(thread.id):
-                event = e
-                break
+        # Event finden (nur aktive Events können abgesagt werden)
+        event = store.find_by_thread(thread.id)
+        if event and event.status != "active":
+            event = None
         
         if not event:
             await interaction.response.send_message("Kein zugehöriges Event gefunden.", ephemeral=True)
             return
         
         # Überprüfen, ob der Benutzer der Event-Ersteller ist
-        if str(interaction.user.id) != str(event.get("caller_id")):
+        if str(interaction.user.id) != str(event.caller_id):
             await interaction.response.send_message("Du kannst nur Events absagen, die du selbst erstellt hast.", ephemeral=True)
             return
         
         await interaction.response.defer(ephemeral=True)
         
-        # Event als abgesagt markieren
-        event["title"] = f"[ABGESAGT] {event['title']}"
-        event["status"] = "canceled"  # Setze den Status auf abgesagt
+        # Event als abgesagt markieren (sofort committen, damit parallele Anmeldungen es sehen)
+        def apply_cancel(work):
+            if work.status != "active":
+                return False
+            work.title = f"[ABGESAGT] {work.title}"
+            work.status = "canceled"  # Setze den Status auf abgesagt
+            return True
+
+        event, canceled = await mutate_event(event, apply_cancel)
+        if not canceled:
+            await interaction.followup.send("Das Event ist nicht mehr aktiv.", ephemeral=True)
+            return
         
         # Event-Nachricht aktualisieren
         try:
             channel = interaction.guild.get_channel(CHANNEL_ID_EVENT)
-            message_id = event.get("message_id")
+            message_id = event.message_id
             if channel and message_id:
                 message = await channel.fetch_message(int(message_id))
                 if message:
@@ -3012,7 +2678,7 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
                     embeds = message.embeds
                     if embeds:
                         embed = embeds[0]
-                        embed.title = f"__**{event['title']}**__"
+                        embed.title = f"__**{event.title}**__"
                         await message.edit(embed=embed)
         except Exception as e:
             logger.error(f"Fehler beim Aktualisieren der Event-Nachricht: {e}")
@@ -3021,7 +2687,7 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
         event_link = None
         try:
             guild_id = interaction.guild.id
-            message_id = event.get("message_id")
+            message_id = event.message_id
             if message_id:
                 event_link = f"https://discord.com/channels/{guild_id}/{CHANNEL_ID_EVENT}/{message_id}"
         except Exception as e:
@@ -3030,16 +2696,15 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
         # Alle Teilnehmer benachrichtigen
         participants = []
         notified_user_ids = set()  # Track user IDs that have already been notified
-        for role_key, role_participants in event.get("participants", {}).items():
+        for role_key, role_participants in event.participants.items():
             for participant in role_participants:
-                if len(participant) >= 2:
-                    user_id = int(participant[1])
-                    if user_id not in notified_user_ids:
-                        participants.append(participant)
-                        notified_user_ids.add(user_id)
+                user_id = int(participant.user_id)
+                if user_id not in notified_user_ids:
+                    participants.append(participant)
+                    notified_user_ids.add(user_id)
         
         # Erstelle die Absage-Nachricht
-        cancel_message = f"**Event abgesagt:** {event['title']}\nDatum: {event['date']} \nZeit: {event['time']}"
+        cancel_message = f"**Event abgesagt:** {event.title}\nDatum: {event.date} \nZeit: {event.time}"
         if reason:
             cancel_message += f"\nGrund: **{reason}**"
         if event_link:
@@ -3049,7 +2714,7 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
         sent_count = 0
         for participant_data in participants:
             try:
-                user_id = int(participant_data[1])
+                user_id = int(participant_data.user_id)
                 user = await interaction.client.fetch_user(user_id)
                 if user:
                     await user.send(cancel_message)
@@ -3057,9 +2722,6 @@ async def cancel_event(interaction: discord.Interaction, reason: str = None):
             except Exception as e:
                 logger.error(f"Error sending cancellation DM to {user_id}: {e}")
 
-        # Event speichern (nicht mehr löschen)
-        save_events_to_json(events_data)
-        
         # Neue Eventübersicht erstellen
         await create_event_listing(interaction.guild)
         
@@ -3098,43 +2760,42 @@ async def add_participant(
             await interaction.response.send_message("Dieser Befehl kann nur in einem Event-Thread verwendet werden.", ephemeral=True)
             return
 
-        # Load the event (auch abgelaufene Events einschließen)
-        events_data = load_upcoming_events(include_expired=True)
+        # Find the event (auch abgelaufene Events einschließen)
         # First try to find the event by thread_id (most reliable)
         thread_id = interaction.channel.id
-        event = next((e for e in events_data["events"] if e.get('thread_id') == thread_id), None)
+        event = store.find_by_thread(thread_id)
         
         # Fallback: try to find by title (for backwards compatibility)
         if not event:
-            event = next((e for e in events_data["events"] if e.get('title') == interaction.channel.name), None)
+            event = store.find_by_title(interaction.channel.name)
 
         if not event:
             await interaction.response.send_message("Kein passendes Event für diesen Thread gefunden.", ephemeral=True)
             return
         
         # Prüfe, ob das Event abgesagt wurde
-        if event.get('status') == "canceled" or "[ABGESAGT]" in event.get('title', ''):
+        if event.status == "canceled" or "[ABGESAGT]" in event.title:
             await interaction.response.send_message("Dieses Event wurde abgesagt. Anmeldungen sind nicht mehr möglich.", ephemeral=True)
             return
         
         # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
         try:
             # Event-Zeit direkt aus datetime_obj verwenden
-            event_dt = datetime.fromisoformat(event.get('datetime_obj'))
+            event_dt = event.datetime_obj
             now = datetime.now(timezone.utc)
             
             # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Slash-Befehl blockieren
             if now > event_dt + timedelta(hours=1):
                 # Benutzer informieren (ephemeral im Thread)
                 await interaction.response.send_message("Teilnehmer können nicht mehr hinzugefügt werden, da das Event vor über einer Stunde begonnen hat.", ephemeral=True)
-                logger.info(f"Blocked /add command from {interaction.user.name} - event {event.get('title')} started more than 1 hour ago")
+                logger.info(f"Blocked /add command from {interaction.user.name} - event {event.title} started more than 1 hour ago")
                 return
         except Exception as e:
             logger.error(f"Error checking event time for /add command: {e}")
             # Im Fehlerfall Command dennoch erlauben
 
         # Remove the check that restricts to event creator
-        # if str(interaction.user.id) != event.get('caller_id'):
+        # if str(interaction.user.id) != event.caller_id:
         #     await interaction.response.send_message("Nur der Event-Ersteller kann Teilnehmer hinzufügen.", ephemeral=True)
         #     return
         
@@ -3146,48 +2807,84 @@ async def add_participant(
             return
             
         # Get the role name
-        role_name = event['roles'][actual_role_index]
-        role_key = f"{actual_role_index}:{role_name}"
-        
-        # Initialisiere participants dict falls nötig
-        if 'participants' not in event:
-            event['participants'] = {}
-            
-        if role_key not in event['participants']:
-            event['participants'][role_key] = []
+        role_name = event.roles[actual_role_index]
+        role_key = event.role_key(actual_role_index)
             
         # Check if the participant is already registered for this role
         player_name = user.display_name
         player_id = str(user.id)
         current_time = datetime.now().timestamp()
         
-        existing_entry = next((i for i, entry in enumerate(event['participants'][role_key]) 
-                              if entry[1] == player_id), None)
-                              
-        if existing_entry is not None:
-            # Participant is already registered, update only the comment if it exists
-            if comment:
-                # Limit comment to 30 characters
-                if len(comment) > 30:
-                    comment = comment[:30] + "..."
-                existing_data = event['participants'][role_key][existing_entry]
-                if len(existing_data) >= 4:
-                    event['participants'][role_key][existing_entry] = (existing_data[0], existing_data[1], existing_data[2], comment)
-                else:
-                    event['participants'][role_key][existing_entry] = (existing_data[0], existing_data[1], existing_data[2], comment)
-                
+        # Limit comment to 30 characters
+        if comment and len(comment) > 30:
+            comment = comment[:30] + "..."
+        
+        # Check if we're in participant_only_mode - in that case, we can add multiple people to the same role
+        is_participant_only = event.participant_only_mode
+        is_fillall_role = role_name == FILLALL_ROLE
+        
+        def apply_add(work):
+            """Adds the user on a working copy of the event; returns (outcome, details)."""
+            existing_data = work.find_participant(role_key, player_id)
+            if existing_data is not None:
+                # Participant is already registered, update only the comment if it exists
+                if comment:
+                    work.add_participant(role_key, existing_data._replace(comment=comment))
+                    return "comment_updated", None
+                return "already_registered", None
+            
+            # FILLALL special handling - if adding to FILLALL, remove from regular roles
+            if is_fillall_role:
+                removed_roles = [work.role_name(r_key) for r_key in work.remove_user(player_id)]
+                work.add_participant(role_key, Participant(player_name, player_id, current_time, comment or ""))
+                return "fillall_added", removed_roles
+            
+            # Check if the role already has participants (except in participant_only_mode)
+            holders = work.participants.get(role_key)
+            if not is_participant_only and holders:
+                return "taken", holders[0]
+            
+            # For regular roles, a FILLALL signup is replaced by the role
+            fillall_key = work.fillall_key
+            if fillall_key:
+                work.remove_participant(fillall_key, player_id)
+            
+            # Check if user is already assigned to another role in this event (except FILLALL)
+            previous_role = None
+            previous_key = next(iter(work.roles_of(player_id) - {role_key}), None)
+            if previous_key is not None and not is_participant_only:
+                previous_role = work.role_name(previous_key)
+                work.remove_participant(previous_key, player_id)
+            
+            work.add_participant(role_key, Participant(player_name, player_id, current_time, comment or ""))
+            return "added", previous_role
+        
+        # Applied with compare-and-swap; messages are only sent once the change is committed
+        event, (outcome, details) = await mutate_event(event, apply_add)
+        event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.message_id}"
+        
+        if outcome == "taken":
+            current_holder = details
+            await interaction.response.send_message(
+                f"Die Rolle {role_name} ist bereits von {current_holder.name} besetzt. "
+                f"Entferne zunächst diesen Teilnehmer mit `/remove`, bevor du einen neuen hinzufügst.", 
+                ephemeral=True
+            )
+            return
+        
+        if outcome in ("comment_updated", "already_registered"):
+            if outcome == "comment_updated":
                 await interaction.response.send_message(f"Kommentar für **{player_name}** in Rolle **{role_name}** aktualisiert.\nNeuer Kommentar: **{comment}**")
             else:
                 await interaction.response.send_message(f"{player_name} ist bereits für Rolle **{role_name}** eingetragen.")
             
             # Inform the participant about the comment update
             try:
-                event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
                 dm_message = (
-                    f"**{event['caller_name']}** hat deinen Kommentar für die Rolle **{role_name}** aktualisiert.\n"
-                    f"Event: {event['title']}\n"
-                    f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                    f"Uhrzeit: {event['time']}\n"
+                    f"**{event.caller_name}** hat deinen Kommentar für die Rolle **{role_name}** aktualisiert.\n"
+                    f"Event: {event.title}\n"
+                    f"Datum: {event.date} ({get_weekday_abbr(event.date)})\n"
+                    f"Uhrzeit: {event.time}\n"
                     f"Neuer Kommentar: **{comment}**\n"
 
                     f"[Zum Event]({event_link})"
@@ -3195,222 +2892,89 @@ async def add_participant(
                 await user.send(dm_message)
             except Exception as e:
                 logger.error(f"Failed to send DM to user {user.id}: {e}")
-                
-        else:
-            # Check if we're in participant_only_mode - in that case, we can add multiple people to the same role
-            is_participant_only = event.get('participant_only_mode', False)
+        
+        elif outcome == "fillall_added":
+            removed_roles = details
+            for r_name in removed_roles:
+                logger.info(f"Removed {player_name} from role {r_name} when adding to FILLALL")
             
-            # Check if this is the "Fill" role by name
-            is_fill_role = role_name.lower() == "fill" or role_name.lower() == "fillall"
-            is_fillall_role = role_name.lower() == "fillall"
+            # Modify thread message to include removed roles information
+            thread_message = f"**{interaction.user.display_name}** hat **{player_name}** zur Rolle **{role_name}** hinzugefügt."
+            if removed_roles:
+                thread_message += f" (Automatisch entfernt aus: **{', '.join(removed_roles)}**)"
+            if comment:
+                thread_message += f"\nKommentar: **{comment}**"
+            await interaction.response.send_message(thread_message)
             
-            # FILLALL special handling - if adding to FILLALL, remove from regular roles
-            if is_fillall_role:
-                removed_roles = []
+            # Notify the user about the role assignment and removals
+            try:
+                dm_message = f"Du wurdest von **{interaction.user.display_name}** für die Rolle **{role_name}** eingetragen.\n"
                 
-                # First remove user from any regular roles
-                for r_idx, r_name in enumerate(event['roles']):
-                    # Skip FILLALL roles and headers in the check
-                    if (r_name.lower() == "fill" or r_name.lower() == "fillall" or 
-                        (r_name.startswith('(') and r_name.endswith(')'))):
-                        continue
-                    
-                    r_key = f"{r_idx}:{r_name}"
-                    if r_key in event.get('participants', {}):
-                        # Find and remove the player if present
-                        initial_count = len(event['participants'][r_key])
-                        event['participants'][r_key] = [p for p in event['participants'][r_key] if p[1] != player_id]
-                        if initial_count > len(event['participants'][r_key]):
-                            removed_roles.append(r_name)
-                            logger.info(f"Removed {player_name} from role {r_name} when adding to FILLALL")
-                
-                # Modify thread message to include removed roles information
-                thread_message = f"**{interaction.user.display_name}** hat **{player_name}** zur Rolle **{role_name}** hinzugefügt."
                 if removed_roles:
-                    thread_message += f" (Automatisch entfernt aus: **{', '.join(removed_roles)}**)"
-                if comment:
-                    thread_message += f"\nKommentar: **{comment}**"
-                await interaction.response.send_message(thread_message)
-                
-                # Notify the user about the role assignment and removals
-                try:
-                    event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                    dm_message = f"Du wurdest von **{interaction.user.display_name}** für die Rolle **{role_name}** eingetragen.\n"
-                    
-                    if removed_roles:
-                        dm_message += f"(Automatisch entfernt aus: **{', '.join(removed_roles)}**)\n"
-                    
-                    dm_message += (
-                        f"Event: {event['title']}\n"
-                        f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                        f"Uhrzeit: {event['time']}\n"
-                    )
-                    if comment:
-                        dm_message += f"Kommentar: **{comment}**\n"
-                    dm_message += f"[Zum Event]({event_link})"
-                    await user.send(dm_message)
-                except Exception as e:
-                    logger.error(f"Failed to send DM to user {user.id}: {e}")
+                    dm_message += f"(Automatisch entfernt aus: **{', '.join(removed_roles)}**)\n"
                 
-                # Add the participant to the FILLALL role
-                entry = [player_name, player_id, current_time]
+                dm_message += (
+                    f"Event: {event.title}\n"
+                    f"Datum: {event.date} ({get_weekday_abbr(event.date)})\n"
+                    f"Uhrzeit: {event.time}\n"
+                )
                 if comment:
-                    # Limit comment to 30 characters
-                    if len(comment) > 30:
-                        comment = comment[:30] + "..."
-                    entry.append(comment)
-                event['participants'][role_key].append(tuple(entry))
-                
-                # Update the event and save to JSON
-                save_event_to_json(event)
-                await bot.update_event_message(interaction.channel, event)
-                return
+                    dm_message += f"Kommentar: **{comment}**\n"
+                dm_message += f"[Zum Event]({event_link})"
+                await user.send(dm_message)
+            except Exception as e:
+                logger.error(f"Failed to send DM to user {user.id}: {e}")
+        
+        elif details is not None:
+            already_in_role = details
+            # Post a message in the thread
+            thread_message = f"**{interaction.user.display_name}** hat **{player_name}** aus der Rolle **{already_in_role}** entfernt und zur Rolle **{role_name}** hinzugefügt."
+            if comment:
+                thread_message += f"\nKommentar: **{comment}**"
+            await interaction.response.send_message(thread_message)
             
-            # For regular roles, check if player is in FILLALL and remove them
-            elif not is_fill_role:
-                fillall_removed = False
-                fillall_role_name = None
-                
-                for r_idx, r_name in enumerate(event['roles']):
-                    if r_name.lower() in ["fill", "fillall"]:
-                        fillall_role_name = r_name
-                        r_key = f"{r_idx}:{r_name}"
-                        if r_key in event.get('participants', {}):
-                            # Find and remove the player if present
-                            initial_count = len(event['participants'][r_key])
-                            event['participants'][r_key] = [p for p in event['participants'][r_key] if p[1] != player_id]
-                            if initial_count > len(event['participants'][r_key]):
-                                logger.info(f"Removed {player_name} from {r_name} when adding to role {role_name}")
-                                fillall_removed = True
-            
-            # Continue with existing role assignment logic
-            
-            # Check if the role already has participants (except for Fill roles or participant_only_mode)
-            if not is_fill_role and not is_participant_only and len(event['participants'][role_key]) > 0:
-                # Get current role holder info
-                current_holder = event['participants'][role_key][0]
-                current_holder_id = current_holder[1]
-                current_holder_name = current_holder[0]
-                
-                await interaction.response.send_message(
-                    f"Die Rolle {role_name} ist bereits von {current_holder_name} besetzt. "
-                    f"Entferne zunächst diesen Teilnehmer mit `/remove`, bevor du einen neuen hinzufügst.", 
-                    ephemeral=True
+            # Notify the user about being moved to a different role
+            try:
+                dm_message = (
+                    f"Du wurdest von **{interaction.user.display_name}** aus der Rolle **{already_in_role}** in die Rolle **{role_name}** verschoben.\n"
                 )
-                return
-            
-            # NEW CODE: Check if user is already assigned to another role in this event (except Fill/FillALL)
-            if not is_fill_role:  # Only check for regular roles
-                already_in_role = None
-                already_in_role_index = None
-                already_in_role_key = None
-                already_in_entry_idx = None
-                
-                for r_idx, r_name in enumerate(event['roles']):
-                    # Skip Fill/FillALL roles in the check
-                    if r_name.lower() == "fill" or r_name.lower() == "fillall":
-                        continue
-                    
-                    r_key = f"{r_idx}:{r_name}"
-                    if r_key in event.get('participants', {}):
-                        for entry_idx, entry in enumerate(event['participants'][r_key]):
-                            if entry[1] == player_id:
-                                already_in_role = r_name
-                                already_in_role_index = r_idx
-                                already_in_role_key = r_key
-                                already_in_entry_idx = entry_idx
-                                break
-                        
-                        if already_in_role:
-                            break
-                
-                if already_in_role:
-                    # Remove player from previous role
-                    event['participants'][already_in_role_key].pop(already_in_entry_idx)
-                    
-                    # Post a message in the thread
-                    thread_message = f"**{interaction.user.display_name}** hat **{player_name}** aus der Rolle **{already_in_role}** entfernt und zur Rolle **{role_name}** hinzugefügt."
-                    if comment:
-                        thread_message += f"\nKommentar: **{comment}**"
-                    await interaction.response.send_message(thread_message)
-                    
-                    # Notify the user about being moved to a different role
-                    try:
-                        event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                        dm_message = (
-                            f"Du wurdest von **{interaction.user.display_name}** aus der Rolle **{already_in_role}** in die Rolle **{role_name}** verschoben.\n"
-                        )
-                        if comment:
-                            dm_message += f"Kommentar: **{comment}**\n"
-                        dm_message += (
-                            f"Event: {event['title']}\n"
-                            f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                            f"Uhrzeit: {event['time']}\n"
-                            f"[Zum Event]({event_link})"
-                        )
-                        await user.send(dm_message)
-                    except Exception as e:
-                        logger.error(f"Failed to send DM to user {user.id}: {e}")
-                else:
-                    # Post a message in the thread
-                    thread_message = f"**{interaction.user.display_name}** hat **{player_name}** zur Rolle **{role_name}** hinzugefügt."
-                    if comment:
-                        thread_message += f"\nKommentar: **{comment}**"
-                    await interaction.response.send_message(thread_message)
-                    
-                    # Regular notification for new role assignment
-                    try:
-                        event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                        dm_message = (
-                            f"Du wurdest von **{interaction.user.display_name}** in die Rolle **{role_name}** eingetragen.\n"
-                        )
-                        dm_message += (
-                            f"Event: {event['title']}\n"
-                            f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                            f"Uhrzeit: {event['time']}\n"
-                        )
-                        if comment:
-                            dm_message += f"Kommentar: **{comment}**\n"
-                        dm_message += f"[Zum Event]({event_link})"
-                        await user.send(dm_message)
-                    except Exception as e:
-                        logger.error(f"Failed to send DM to user {user.id}: {e}")
-            else:
-                # For Fill/FillALL roles, post a message in the thread
-                thread_message = f"**{interaction.user.display_name}** hat **{player_name}** zur Rolle **{role_name}** hinzugefügt."
                 if comment:
-                    thread_message += f"\nKommentar: **{comment}**"
-                await interaction.response.send_message(thread_message)
-                
-                # Notify the user about the role assignment
-                try:
-                    event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
-                    dm_message = (
-                        f"Du wurdest von **{interaction.user.display_name}** für die Rolle **{role_name}** eingetragen.\n"
-                    )
-                    dm_message += (
-                        f"Event: {event['title']}\n"
-                        f"Datum: {event['date']} ({get_weekday_abbr(event['date'])})\n"
-                        f"Uhrzeit: {event['time']}\n"
-                    )
-                    if comment:
-                        dm_message += f"Kommentar: **{comment}**\n"
-                    dm_message += f"[Zum Event]({event_link})"
-                    await user.send(dm_message)
-                except Exception as e:
-                    logger.error(f"Failed to send DM to user {user.id}: {e}")
-            
-            # Add the participant to the role - always do this last to avoid issues if something fails above
-            entry = [player_name, player_id, current_time]
+                    dm_message += f"Kommentar: **{comment}**\n"
+                dm_message += (
+                    f"Event: {event.title}\n"
+                    f"Datum: {event.date} ({get_weekday_abbr(event.date)})\n"
+                    f"Uhrzeit: {event.time}\n"
+                    f"[Zum Event]({event_link})"
+                )
+                await user.send(dm_message)
+            except Exception as e:
+                logger.error(f"Failed to send DM to user {user.id}: {e}")
+        
+        else:
+            # Post a message in the thread
+            thread_message = f"**{interaction.user.display_name}** hat **{player_name}** zur Rolle **{role_name}** hinzugefügt."
             if comment:
-                # Limit comment to 30 characters
-                if len(comment) > 30:
-                    comment = comment[:30] + "..."
-                entry.append(comment)
-            event['participants'][role_key].append(tuple(entry))
-        
-        # Update the event and save to JSON
-        save_event_to_json(event)
+                thread_message += f"\nKommentar: **{comment}**"
+            await interaction.response.send_message(thread_message)
+            
+            # Regular notification for new role assignment
+            try:
+                dm_message = (
+                    f"Du wurdest von **{interaction.user.display_name}** in die Rolle **{role_name}** eingetragen.\n"
+                )
+                dm_message += (
+                    f"Event: {event.title}\n"
+                    f"Datum: {event.date} ({get_weekday_abbr(event.date)})\n"
+                    f"Uhrzeit: {event.time}\n"
+                )
+                if comment:
+                    dm_message += f"Kommentar: **{comment}**\n"
+                dm_message += f"[Zum Event]({event_link})"
+                await user.send(dm_message)
+            except Exception as e:
+                logger.error(f"Failed to send DM to user {user.id}: {e}")
+        
+        # Update the event message
         await bot.update_event_message(interaction.channel, event)
         
         # Also refresh the event overview
@@ -3434,25 +2998,20 @@ async def remove_participant(
             await interaction.response.send_message("Dieser Command kann nur in Event-Threads verwendet werden.", ephemeral=True)
             return
         
-        # Lade Event-Daten
-        events_data = load_upcoming_events(include_expired=True)
-        event = None
-        for e in events_data["events"]:
-            if e.get('thread_id') == interaction.channel.id:
-                event = e
-                break
+        # Event im Store finden
+        event = store.find_by_thread(interaction.channel.id)
         
         if not event:
             await interaction.response.send_message("Kein Event in diesem Thread gefunden.", ephemeral=True)
             return
         
         # Prüfe, ob das Event abgesagt wurde
-        if event.get('canceled'):
+        if event.status == "canceled":
             await interaction.response.send_message("Dieses Event wurde bereits abgesagt.", ephemeral=True)
             return
         
         # Prüfe, ob das Event bereits vor mehr als einer Stunde gestartet ist
-        event_datetime = datetime.strptime(f"{event['date']} {event['time']}", "%d.%m.%Y %H:%M")
+        event_datetime = datetime.strptime(f"{event.date} {event.time}", "%d.%m.%Y %H:%M")
         if datetime.now() > event_datetime + timedelta(hours=1):
             await interaction.response.send_message("Das Event ist bereits vor mehr als einer Stunde gestartet.", ephemeral=True)
             return
@@ -3460,39 +3019,30 @@ async def remove_participant(
         player_id = str(user.id)
         player_name = user.display_name
         
-        # Suche den Benutzer in allen Rollen
-        removed = False
-        removed_role_name = None
-        is_fillall = False
-        
-        for role_idx, role_name in enumerate(event['roles']):
-            role_key = f"{role_idx}:{role_name}"
-            if role_key in event.get('participants', {}):
-                # Prüfe, ob der Benutzer in dieser Rolle ist
-                initial_count = len(event['participants'][role_key])
-                event['participants'][role_key] = [p for p in event['participants'][role_key] if p[1] != player_id]
-                removed = initial_count - len(event['participants'][role_key]) > 0
-                
-                if removed:
-                    removed_role_name = role_name
-                    is_fillall = role_name.lower() in ["fill", "fillall"]
-                    break
+        def apply_remove(work):
+            """Removes the user from their role on a working copy; returns the role name or None."""
+            role_key = next(iter(work.roles_of(player_id)), None)
+            if role_key is None:
+                return None
+            work.remove_participant(role_key, player_id)
+            return work.role_name(role_key)
+        
+        # Suche den Benutzer in allen Rollen und speichere das aktualisierte Event
+        event, removed_role_name = await mutate_event(event, apply_remove)
         
-        if not removed:
+        if removed_role_name is None:
             await interaction.response.send_message(f"{player_name} ist in keinem Event eingetragen.", ephemeral=True)
             return
-        
-        # Speichere das aktualisierte Event
-        save_event_to_json(event)
+        is_fillall = removed_role_name == FILLALL_ROLE
         
         # Sende eine DM an den entfernten Benutzer
         try:
-            event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
+            event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.message_id}"
             dm_message = (
-                f"Du wurdest von **{interaction.user.display_name}** aus dem Event **{event['title']}** entfernt.\n"
+                f"Du wurdest von **{interaction.user.display_name}** aus dem Event **{event.title}** entfernt.\n"
                 f"Rolle: {removed_role_name}\n"
-                f"Datum: {event['date']}\n"
-                f"Uhrzeit: {event['time']}\n"
+                f"Datum: {event.date}\n"
+                f"Uhrzeit: {event.time}\n"
             )
             if comment:
                 dm_message += f"Kommentar: {comment}\n"
@@ -3536,49 +3086,48 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
             await interaction.response.send_message("Dieser Befehl kann nur in einem Event-Thread verwendet werden.", ephemeral=True)
             return
 
-        # Load the event (auch abgelaufene Events einschließen)
-        events_data = load_upcoming_events(include_expired=True)
+        # Find the event (auch abgelaufene Events einschließen)
         # First try to find the event by thread_id (most reliable)
         thread_id = interaction.channel.id
-        event = next((e for e in events_data["events"] if e.get('thread_id') == thread_id), None)
+        event = store.find_by_thread(thread_id)
         
         # Fallback: try to find by title (for backwards compatibility)
         if not event:
-            event = next((e for e in events_data["events"] if e.get('title') == interaction.channel.name), None)
+            event = store.find_by_title(interaction.channel.name)
 
         if not event:
             await interaction.response.send_message("Kein passendes Event für diesen Thread gefunden.", ephemeral=True)
             return
         
         # Prüfe, ob das Event abgesagt wurde
-        if event.get('status') == "canceled" or "[ABGESAGT]" in event.get('title', ''):
+        if event.status == "canceled" or "[ABGESAGT]" in event.title:
             await interaction.response.send_message("Dieses Event wurde bereits abgesagt. Neue Rollenvorschläge sind nicht mehr möglich.", ephemeral=True)
             return
         
         # Prüfe, ob mehr als 1 Stunde seit Eventbeginn vergangen ist
         try:
             # Event-Zeit direkt aus datetime_obj verwenden
-            event_dt = datetime.fromisoformat(event.get('datetime_obj'))
+            event_dt = event.datetime_obj
             now = datetime.now(timezone.utc)
             
             # Wenn mehr als 1 Stunde seit Eventbeginn vergangen ist, Slash-Befehl blockieren
             if now > event_dt + timedelta(hours=1):
                 # Benutzer informieren (ephemeral im Thread)
                 await interaction.response.send_message("Neue Rollen können nicht mehr vorgeschlagen werden, da das Event vor über einer Stunde begonnen hat.", ephemeral=True)
-                logger.info(f"Blocked /propose command from {interaction.user.name} - event {event.get('title')} started more than 1 hour ago")
+                logger.info(f"Blocked /propose command from {interaction.user.name} - event {event.title} started more than 1 hour ago")
                 return
         except Exception as e:
             logger.error(f"Error checking event time for /propose command: {e}")
             # Im Fehlerfall Command dennoch erlauben
         
         # Check if the event is in participant_only_mode
-        is_participant_only = event.get('participant_only_mode', False)
+        is_participant_only = event.participant_only_mode
         if is_participant_only:
             await interaction.response.send_message("Rollenvorschläge sind für Events im Nur-Teilnehmer-Modus nicht verfügbar.", ephemeral=True)
             return
         
         # Check if the role already exists
-        if role_name in event['roles']:
+        if role_name in event.roles:
             await interaction.response.send_message(f"Die Rolle '{role_name}' existiert bereits in diesem Event.", ephemeral=True)
             return
         
@@ -3595,102 +3144,43 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
             @discord.ui.button(label="Annehmen", style=discord.ButtonStyle.green)
             async def accept_button(self, button_interaction: discord.Interaction, button: discord.ui.Button):
                 # Check if the reacting user is the event caller
-                if str(button_interaction.user.id) != event.get('caller_id'):
+                if str(button_interaction.user.id) != event.caller_id:
                     await button_interaction.response.send_message("Nur der Event-Ersteller kann diesen Vorschlag annehmen.", ephemeral=True)
                     return
                 
-                # Load the most current version of the event to ensure we have the latest changes
-                current_events_data = load_upcoming_events(include_expired=True)
+                # Look up the current version of the event to ensure we have the latest changes
                 # First try to find the event by thread_id (most reliable)
-                thread_id = self.thread_id
-                current_event = next((e for e in current_events_data["events"] if e.get('thread_id') == thread_id), None)
+                current_event = store.find_by_thread(self.thread_id)
                 
                 # Fallback: try to find by title (for backwards compatibility)
                 if not current_event:
-                    current_event = next((e for e in current_events_data["events"] if e.get('title') == event.get('title')), None)
+                    current_event = store.find_by_title(event.title)
 
                 if not current_event:
                     await button_interaction.response.send_message("Das Event konnte nicht gefunden werden. Möglicherweise wurde es gelöscht.", ephemeral=True)
                     return
                 
-                # Find the FILLALL role in the current event state
-                fill_index = next((i for i, role in enumerate(current_event['roles']) if role.lower() in ["fill", "fillall"]), None)
-                
-                # Ensure that fill_index has a value
-                if fill_index is None:
-                    # If no FILLALL role is found, add the new role to the end
-                    current_event['roles'].append(self.proposed_role)
-                    new_role_index = len(current_event['roles']) - 1
-                else:
-                    # Store the current state of participants before changes
-                    old_participants = copy.deepcopy(current_event.get('participants', {}))
-                    
-                    # Add the new role before the FILLALL role
-                    current_event['roles'].insert(fill_index, self.proposed_role)
-                    new_role_index = fill_index
-                    
-                    # Update the FILLALL index, since we added a role before it
-                    fill_index += 1
-                    
-                    # Update all role indices that come after the inserted role
-                    if 'participants' in current_event:
-                        new_participants = {}
-                        for role_key, participants_list in old_participants.items():
-                            try:
-                                idx, role_name = role_key.split(':', 1)
-                                idx = int(idx)
-                                
-                                # If this role comes after the inserted role, increment its index
-                                if idx >= new_role_index and role_name.lower() not in ['fill', 'fillall']:
-                                    new_idx = idx + 1
-                                    new_key = f"{new_idx}:{role_name}"
-                                    new_participants[new_key] = participants_list
-                                # If this is the FILLALL/FILL role that was shifted
-                                elif role_name.lower() in ['fill', 'fillall'] and idx == new_role_index:
-                                    new_key = f"{fill_index}:{role_name}"
-                                    new_participants[new_key] = participants_list
-                                # Otherwise keep the key as is
-                                else:
-                                    new_participants[role_key] = participants_list
-                            except ValueError:
-                                # If role_key is not in expected format, keep it as is
-                                new_participants[role_key] = participants_list
-                        
-                        # Update the participants dictionary
-                        current_event['participants'] = new_participants
-                
-                # Create role_key for the new role
-                new_role_key = f"{new_role_index}:{self.proposed_role}"
-                
-                # Initialize participants dict for the new role if necessary
-                if 'participants' not in current_event:
-                    current_event['participants'] = {}
-                if new_role_key not in current_event['participants']:
-                    current_event['participants'][new_role_key] = []
-                
                 # Automatically add the proposer to the new role with comment
                 proposer_id = str(self.proposer_id)
                 proposer_name = self.proposer_name
                 current_time = datetime.now().timestamp()
                 
-                # Check if the user is already registered in another role (except FILLALL)
-                for r_idx, r_name in enumerate(current_event['roles']):
-                    if r_name.lower() == "fill" or r_name.lower() == "fillall":
-                        continue  # Ignore Fill roles
+                def apply_proposal(work):
+                    # Add the new role before the FILLALL role, or at the end if there is none.
+                    # Participants are keyed by role ID, so existing signups stay where they are.
+                    fill_index = work.roles.index(FILLALL_ROLE) if FILLALL_ROLE in work.roles else len(work.roles)
+                    new_role_key = work.insert_role(fill_index, self.proposed_role)
                     
-                    r_key = f"{r_idx}:{r_name}"
-                    if r_key in current_event.get('participants', {}):
-                        for entry_idx, entry in enumerate(current_event['participants'][r_key]):
-                            if entry[1] == proposer_id:
-                                # Remove the player from the old role
-                                current_event['participants'][r_key].pop(entry_idx)
-                                break
-                
-                # Add the player to the new role with comment "selbst vorgeschlagen"
-                current_event['participants'][new_role_key].append((proposer_name, proposer_id, current_time, "selbst vorgeschlagen"))
+                    # Check if the user is already registered in another role (except FILLALL)
+                    for r_key in work.roles_of(proposer_id) - {work.fillall_key}:
+                        # Remove the player from the old role
+                        work.remove_participant(r_key, proposer_id)
+                    
+                    # Add the player to the new role with comment "selbst vorgeschlagen"
+                    work.add_participant(new_role_key, Participant(proposer_name, proposer_id, current_time, "selbst vorgeschlagen"))
                 
                 # Update event and save
-                save_event_to_json(current_event)
+                current_event, _ = await mutate_event(current_event, apply_proposal)
                 
                 # Try to update the event message in the thread
                 try:
@@ -3720,13 +3210,13 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
                     if guild:
                         proposer = await guild.fetch_member(self.proposer_id)
                         if proposer:
-                            event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{current_event.get('message_id')}"
+                            event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{current_event.message_id}"
                             dm_message = (
                                 f"Dein Rollenvorschlag **{self.proposed_role}** wurde angenommen!\n"
                                 f"Du wurdest automatisch in diese Rolle eingetragen.\n"
-                                f"Event: {current_event['title']}\n"
-                                f"Datum: {current_event['date']}\n"
-                                f"Uhrzeit: {current_event['time']}\n"
+                                f"Event: {current_event.title}\n"
+                                f"Datum: {current_event.date}\n"
+                                f"Uhrzeit: {current_event.time}\n"
                                 f"[Zum Event]({event_link})"
                             )
                             await proposer.send(dm_message)
@@ -3751,7 +3241,7 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
             @discord.ui.button(label="Ablehnen", style=discord.ButtonStyle.red)
             async def reject_button(self, button_interaction: discord.Interaction, button: discord.ui.Button):
                 # Check if the reacting user is the event caller
-                if str(button_interaction.user.id) != event.get('caller_id'):
+                if str(button_interaction.user.id) != event.caller_id:
                     await button_interaction.response.send_message("Nur der Event-Ersteller kann diesen Vorschlag ablehnen.", ephemeral=True)
                     return
                 
@@ -3766,10 +3256,10 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
                     if guild:
                         proposer = await guild.fetch_member(self.proposer_id)
                         if proposer:
-                            event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
+                            event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{event.message_id}"
                             dm_message = (
-                                f"Dein Rollenvorschlag **{self.proposed_role}** für das Event **{event['title']}** wurde abgelehnt.\n"
-                                f"Sorry, ich war das nicht, wallah! Das war **{event['caller_name']}**\n"
+                                f"Dein Rollenvorschlag **{self.proposed_role}** für das Event **{event.title}** wurde abgelehnt.\n"
+                                f"Sorry, ich war das nicht, wallah! Das war **{event.caller_name}**\n"
                                 f"[Zum Event]({event_link})"
                             )
                             await proposer.send(dm_message)
@@ -3782,7 +3272,7 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
                 if dm_sent:
                     info_message += f" Der Vorschlagende wurde per DN informiert.\n"
                 
-                event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
+                event_link = f"https://discord.com/channels/{self.guild_id}/{CHANNEL_ID_EVENT}/{event.message_id}"
                 info_message += f"[Zum Event]({event_link})"
                 
                 await button_interaction.response.edit_message(
@@ -3811,7 +3301,7 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
         # Send DM to the event creator with buttons
         try:
             # Find the event creator
-            caller_id = event.get('caller_id')
+            caller_id = event.caller_id
             if not caller_id:
                 await interaction.channel.send("Der Event-Ersteller konnte nicht gefunden werden.")
                 return
@@ -3822,9 +3312,9 @@ async def propose_role(interaction: discord.Interaction, role_name: str):
                 return
             
             # Send DM with buttons
-            event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.get('message_id')}"
+            event_link = f"https://discord.com/channels/{interaction.guild.id}/{CHANNEL_ID_EVENT}/{event.message_id}"
             await caller.send(
-                f"**{interaction.user.display_name}** schlägt eine neue Rolle für dein Event **{event['title']}** vor: **{role_name}**\n"
+                f"**{interaction.user.display_name}** schlägt eine neue Rolle für dein Event **{event.title}** vor: **{role_name}**\n"
                 f"Möchtest du **{interaction.user.display_name}** mit dieser Rolle zum Event hinzufügen?\n"
                 f"[Zum Event]({event_link})",
                 view=view
@@ -3896,12 +3386,64 @@ async def process_individual_deletions(messages, counter):
             # Additional small pause after each deletion attempt
             await asyncio.sleep(0.3)
 
-def save_overview_id(message_id):
+async def record_bot_message(message, purpose, event_id=None):
+    """Adds a message the bot posted in the event channel to the ledger and schedules its deletion"""
+    try:
+        ledger.record(message.id, message.channel.id, purpose, message.created_at, event_id)
+        bot.arm_message(message.id)
+        await save_message_ledger()
+    except Exception as e:
+        logger.error(f"Error recording message {message.id} in the message ledger: {e}")
+
+async def save_message_ledger():
+    """Writes the message ledger on the I/O thread"""
+    try:
+        await store.run_io(ledger.write, ledger.snapshot())
+    except Exception as e:
+        logger.error(f"Error saving the message ledger: {e}")
+
+def request_ledger_save():
+    """Schedules a ledger write from synchronous code running in the event loop"""
+    asyncio.ensure_future(save_message_ledger())
+
+async def delete_channel_messages(channel, message_ids):
+    """
+    Deletes messages by ID with as few API calls as possible: bulk deletes of up to 100
+    messages younger than 14 days (Discord's limit), single deletes for older ones.
+
+    Returns the IDs that are gone (deleted or already missing).
+    """
+    bulk_cutoff = datetime.now(timezone.utc) - timedelta(days=14) + timedelta(minutes=5)
+    recent = [m for m in message_ids if discord.utils.snowflake_time(m) > bulk_cutoff]
+    single = [m for m in message_ids if m not in recent]
+    gone = set()
+    for i in range(0, len(recent), 100):
+        chunk = recent[i:i + 100]
+        try:
+            await channel.delete_messages([discord.Object(id=m) for m in chunk])
+            gone.update(chunk)
+        except discord.HTTPException as e:
+            # e.g. one of them was already deleted - fall back to single deletes
+            logger.warning(f"Bulk delete of {len(chunk)} messages failed, deleting them one by one: {e}")
+            single.extend(chunk)
+    for message_id in single:
+        try:
+            await channel.get_partial_message(message_id).delete()
+            gone.add(message_id)
+        except discord.NotFound:
+            gone.add(message_id)
+        except discord.HTTPException as e:
+            logger.error(f"Fehler beim Löschen der Nachricht {message_id}: {e}")
+    return gone
+
+async def save_overview_id(message_id):
     """Speichert die ID der aktuellen Event-Übersicht"""
+    return await store.run_io(_write_overview_id, message_id)
+
+def _write_overview_id(message_id):
     filepath = "overview.json"
     try:
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump({"message_id": message_id}, f)
+        atomic_write_json(filepath, {"message_id": message_id})
         
         logger.info(f"Event-Übersichts-ID gespeichert: {message_id}")
         return True
@@ -3909,8 +3451,11 @@ def save_overview_id(message_id):
         logger.error(f"Fehler beim Speichern der Übersichts-ID: {e}")
         return False
 
-def load_overview_id():
+async def load_overview_id():
     """Lädt die ID der aktuellen Event-Übersicht"""
+    return await store.run_io(_read_overview_id)
+
+def _read_overview_id():
     filepath = "overview.json"
     try:
         if os.path.exists(filepath):
@@ -0,0 +1,379 @@
+"""
+Offline maintenance tool for the Eventify event store.
+
+Works directly on the data files through the same storage code as the bot
+(event_store.py, models.py) and does not need discord or a bot connection:
+
+    python eventify_admin.py list --status expired --to 2025-01-31
+    python eventify_admin.py show <event_id>
+    python eventify_admin.py compact | migrate
+    python eventify_admin.py validate [--repair]
+    python eventify_admin.py archive --to 2024-12-31
+    python eventify_admin.py restore --list | --at 2025-03-01T12:00 [--dry-run]
+    python eventify_admin.py export --format csv --output events.csv
+
+It may run while the bot is online: writes hold the store's file lock and the
+bot reloads the changed files before its next write.
+"""
+import argparse
+import asyncio
+import csv
+import logging
+import os
+import re
+import sys
+from datetime import datetime, timedelta, timezone
+
+try:
+    from dotenv import load_dotenv
+except ImportError:
+    load_dotenv = None
+
+from event_store import (BackupRepository, EventStore, atomic_write_json, configure_serializer,
+                         create_backend, dumps, event_start, migrate_event)
+from models import EUROPE_BERLIN, Event, RoleSlot, make_role_ids
+
+logger = logging.getLogger('eventify.admin')
+
+STATUSES = ("active", "expired", "canceled", "cleaned")
+LEGACY_KEY = re.compile(r"^(\d+):(.*)$")  # "<index>:<role>" keys of schema 1
+
+
+def open_store(read_only=False):
+    """
+    Creates the event store with the same settings as the bot (see .env).
+
+    read_only=True reads the files as they are and never writes (see EventStore.load).
+    """
+    if load_dotenv is not None:
+        load_dotenv()
+    configure_serializer(
+        os.getenv("EVENTIFY_SERIALIZER", "auto"),
+        pretty=os.getenv("EVENTIFY_PRETTY_JSON", "0").lower() in ("1", "true", "yes", "on"),
+    )
+    journal = os.getenv("EVENTIFY_JOURNAL", "1").lower() not in ("0", "false", "no", "off")
+    store = EventStore(create_backend(os.getenv("EVENTIFY_STORAGE", "json"), journal=journal, read_only=read_only))
+    store.load(read_only=read_only)
+    return store
+
+
+def parse_date(value, end=False):
+    """
+    Parses a date (2025-01-31) or date and time (2025-01-31T20:00) in local time (Europe/Berlin).
+
+    With end=True a plain date means the end of that day.
+    """
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date: {value!r} (expected YYYY-MM-DD[THH:MM])")
+    if end and len(value) == 10:
+        parsed += timedelta(days=1)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=EUROPE_BERLIN)
+    return parsed.astimezone(timezone.utc)
+
+
+def archived_events(store):
+    for data in store.archive.iter_events():
+        migrate_event(data)
+        yield Event.from_dict(data)
+
+
+def select_events(store, args):
+    """Returns (event, status) pairs matching the --status/--from/--to/--archived filters, sorted by date."""
+    events = list(store.events(include_cleaned=True))
+    if getattr(args, "archived", False):
+        live = {event.event_id for event in events}
+        events.extend(event for event in archived_events(store) if event.event_id not in live)
+    statuses = set(args.status.split(",")) if args.status else None
+    now = datetime.now(timezone.utc)
+    selected = []
+    for event in events:
+        status = store.effective_status(event, now)
+        if statuses and status not in statuses:
+            continue
+        start = event_start(event)
+        if args.date_from and (start is None or start < args.date_from):
+            continue
+        if args.date_to and (start is None or start >= args.date_to):
+            continue
+        selected.append((event, status))
+    selected.sort(key=lambda item: event_start(item[0]) or datetime.min.replace(tzinfo=timezone.utc))
+    return selected
+
+
+def participant_count(event):
+    return sum(len(entries) for entries in event.participants.values())
+
+
+def cmd_list(store, args):
+    selected = select_events(store, args)
+    for event, status in selected:
+        print(f"{event.event_id:<24} {event.date or '-':<10} {event.time or '-':<5} {status:<8} "
+              f"{participant_count(event):>3}  {event.title}")
+    print(f"{len(selected)} events", file=sys.stderr)
+    return 0
+
+
+def cmd_show(store, args):
+    event = store.find_by_id(args.event_id)
+    location = "live store"
+    if event is None:
+        data = store.archive.find(args.event_id)
+        if data is None:
+            print(f"Event {args.event_id} not found", file=sys.stderr)
+            return 1
+        migrate_event(data)
+        event = Event.from_dict(data)
+        location = "archive"
+    print(f"{event.title}  ({event.event_id}, {location})")
+    print(f"Date: {event.date} {event.time}  Status: {store.effective_status(event)}  Version: {event.version}")
+    thread = f"{event.thread_id} (closed)" if event.thread_closed else event.thread_id
+    print(f"Created by: {event.caller_name} ({event.caller_id})  Thread: {thread}  Message: {event.message_id}")
+    reminders = "guild default" if event.reminders is None else ", ".join(f"{m} min" for m in event.reminders) or "off"
+    print(f"Reminders: {reminders}  Sent: {', '.join(f'{m} min' for m in event.reminders_sent) or '-'}")
+    for slot in event.role_slots():
+        if slot.is_header:
+            print(f"\n{slot.name}")
+            continue
+        entries = event.participants.get(slot.key, [])
+        print(f"  {slot.name} [{slot.key}]: " + (", ".join(format_participant(entry) for entry in entries) or "-"))
+    for role_key, entries in event.participants.items():
+        if role_key not in event.role_ids:
+            print(f"  ? unknown key {role_key!r}: " + ", ".join(format_participant(entry) for entry in entries))
+    return 0
+
+
+def format_participant(entry):
+    text = f"{entry.name} ({entry.user_id})"
+    return f"{text} \"{entry.comment}\"" if entry.comment else text
+
+
+def cmd_compact(store, args):
+    if not store.save():
+        return 1
+    if store.compact():
+        print("Journal folded into a new snapshot")
+    else:
+        print(f"Nothing to compact: the {store.backend.name} backend has no journal")
+    return 0
+
+
+def cmd_migrate(store, args):
+    # load() already migrated everything in memory; writing persists it
+    count = len(store.migrated_ids)
+    if count and not store.save():
+        return 1
+    print(f"Migrated {count} events to the current schema")
+    return 0
+
+
+def check_participants(event):
+    """
+    Returns (problems, (role_ids, participants)) for the participant keys of one event.
+
+    role_ids and participants are repaired copies with every fixable problem fixed:
+    missing or duplicate role IDs get new ones, schema 1 keys ("<index>:<role>")
+    and role names used as keys move to the matching role ID, duplicate signups
+    of a user in one role are dropped. Keys that match no role are reported and kept.
+    """
+    problems = []
+    role_ids = list(event.role_ids)
+    if len(role_ids) != len(event.roles) or len(set(role_ids)) != len(role_ids):
+        problems.append(f"role IDs {role_ids} do not match the {len(event.roles)} roles")
+        seen = set()
+        numbers = [int(role_id[1:]) for role_id in role_ids if role_id[1:].isdigit()]
+        next_id = iter(make_role_ids(len(event.roles), start=max(numbers, default=-1) + 1))
+        fixed = []
+        for role_id in role_ids[:len(event.roles)]:
+            fixed.append(next(next_id) if role_id in seen else role_id)
+            seen.add(fixed[-1])
+        role_ids = fixed + [next(next_id) for _ in range(len(event.roles) - len(fixed))]
+    slots = [RoleSlot(*slot) for slot in zip(range(len(event.roles)), event.roles, role_ids)]
+    by_name = {}
+    for slot in slots:
+        by_name.setdefault(slot.name, []).append(slot.key)
+
+    repaired = {}
+    for role_key, entries in event.participants.items():
+        target = role_key
+        if role_key not in role_ids:
+            legacy = LEGACY_KEY.match(role_key)
+            name = legacy.group(2) if legacy else role_key
+            index = int(legacy.group(1)) if legacy else -1
+            if 0 <= index < len(slots) and slots[index].name == name:
+                target = slots[index].key
+            elif len(by_name.get(name, [])) == 1:
+                target = by_name[name][0]
+            if target == role_key:
+                problems.append(f"participant key {role_key!r} matches no role (kept)")
+            else:
+                problems.append(f"participant key {role_key!r} belongs to role ID {target!r}")
+        merged = repaired.setdefault(target, [])
+        for entry in entries:
+            if any(existing.user_id == entry.user_id for existing in merged):
+                problems.append(f"duplicate signup of {entry.name} ({entry.user_id}) in {target!r}")
+                continue
+            merged.append(entry)
+    return problems, (role_ids, repaired)
+
+
+def cmd_validate(store, args):
+    broken = 0
+    for event in store.events(include_cleaned=True):
+        problems, (role_ids, participants) = check_participants(event)
+        if not problems:
+            continue
+        broken += 1
+        print(f"{event.event_id} {event.title}")
+        for problem in problems:
+            print(f"  - {problem}")
+        if args.repair:
+            event.role_ids = role_ids
+            event.set_participants(participants)
+            store.upsert(event)
+    if args.repair and broken:
+        if not store.save():
+            return 1
+        print(f"Repaired {broken} events")
+    else:
+        print(f"{broken} events with problems")
+    return 1 if broken and not args.repair else 0
+
+
+def cmd_archive(store, args):
+    ids = [event.event_id for event, status in select_events(store, args) if status != "active"]
+    if args.dry_run:
+        print(f"Would archive {len(ids)} events")
+        return 0
+    print(f"Archived {asyncio.run(store.aarchive(ids))} events")
+    return 0
+
+
+def cmd_restore(store, args):
+    backups = BackupRepository()
+    if args.list:
+        for path in backups.snapshots():
+            print(backups.snapshot_time(path).isoformat())
+        return 0
+    path, events = backups.restore(args.at)
+    if path is None:
+        print("No backup snapshot found" + (f" at or before {args.at}" if args.at else ""), file=sys.stderr)
+        return 1
+    restored_ids = {e.get("event_id") for e in events}
+    dropped = [event_id for event_id in (e.event_id for e in store.events(include_cleaned=True))
+               if event_id not in restored_ids]
+    print(f"Snapshot {os.path.basename(path)}: {len(events)} events, {len(dropped)} current events not in it")
+    if args.dry_run:
+        return 0
+    # Keep the current state restorable as well
+    backups.create(store.snapshot())
+    store.remove(dropped)
+    for data in events:
+        store.upsert(data)
+    if not store.save():
+        return 1
+    print("Restored")
+    return 0
+
+
+EXPORT_COLUMNS = ("event_id", "title", "date", "time", "status", "role", "role_id", "name", "user_id",
+                  "signed_up", "comment")
+
+
+def cmd_export(store, args):
+    selected = select_events(store, args)
+    if args.format == "json":
+        data = {"events": [event.to_dict() for event, _ in selected]}
+        if args.output:
+            atomic_write_json(args.output, data, pretty=True)
+        else:
+            sys.stdout.write(dumps(data, pretty=True).decode('utf-8') + "\n")
+    else:
+        out = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+        try:
+            writer = csv.writer(out)
+            writer.writerow(EXPORT_COLUMNS)
+            for event, status in selected:
+                for role_key, entries in event.participants.items():
+                    for entry in entries:
+                        signed_up = datetime.fromtimestamp(entry.timestamp, timezone.utc).isoformat() if entry.timestamp else ""
+                        writer.writerow((event.event_id, event.title, event.date, event.time, status,
+                                         event.role_name(role_key), role_key, entry.name, entry.user_id,
+                                         signed_up, entry.comment))
+        finally:
+            if out is not sys.stdout:
+                out.close()
+    print(f"Exported {len(selected)} events", file=sys.stderr)
+    return 0
+
+
+def add_filters(parser):
+    parser.add_argument("--status", help=f"comma separated statuses ({', '.join(STATUSES)})")
+    parser.add_argument("--from", dest="date_from", type=parse_date, help="events starting at or after this date")
+    parser.add_argument("--to", dest="date_to", type=lambda value: parse_date(value, end=True),
+                        help="events starting before the end of this date")
+    parser.add_argument("--archived", action="store_true", help="include events from the archive")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Offline maintenance of the Eventify event store")
+    parser.add_argument("-v", "--verbose", action="store_true", help="log store activity")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add_filters(commands.add_parser("list", help="list events"))
+    show = commands.add_parser("show", help="show one event with its participants")
+    show.add_argument("event_id")
+    commands.add_parser("compact", help="fold the mutation journal into the snapshot")
+    commands.add_parser("migrate", help="write events of older schemas in the current format")
+    validate = commands.add_parser("validate", help="check participant keys and role IDs")
+    validate.add_argument("--repair", action="store_true", help="fix what can be fixed and save")
+    archive = commands.add_parser("archive", help="move past events into the archive")
+    add_filters(archive)
+    archive.add_argument("--dry-run", action="store_true")
+    restore = commands.add_parser("restore", help="replace the events with a backup snapshot")
+    restore.add_argument("--at", help="newest snapshot at or before this UTC time (ISO 8601), default latest")
+    restore.add_argument("--list", action="store_true", help="list the available snapshots")
+    restore.add_argument("--dry-run", action="store_true")
+    export = commands.add_parser("export", help="export events as JSON or one CSV row per participant")
+    add_filters(export)
+    export.add_argument("--format", choices=("json", "csv"), default="json")
+    export.add_argument("--output", "-o", help="file to write instead of stdout")
+    return parser
+
+
+# Commands that only inspect the store; they must not create, recover or migrate any file
+READ_ONLY_COMMANDS = ("list", "show", "export")
+
+COMMANDS = {
+    "list": cmd_list,
+    "show": cmd_show,
+    "compact": cmd_compact,
+    "migrate": cmd_migrate,
+    "validate": cmd_validate,
+    "archive": cmd_archive,
+    "restore": cmd_restore,
+    "export": cmd_export,
+}
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    if args.command == "archive" and not (args.date_to or args.status):
+        # Never archive everything by accident
+        print("archive needs --to or --status", file=sys.stderr)
+        return 2
+    read_only = args.command in READ_ONLY_COMMANDS or (args.command == "validate" and not args.repair)
+    store = open_store(read_only=read_only)
+    try:
+        return COMMANDS[args.command](store, args)
+    finally:
+        store.executor.shutdown()
+        store.background_executor.shutdown()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""
+In-memory data model for Eventify: Event, Participant and RoleSlot.
+
+Events are held as slotted objects while the bot runs and are converted to
+plain dicts only when they are written to or read from storage.
+
+This module must not import discord so that it can be shared with offline tools.
+"""
+import logging
+import uuid
+from datetime import datetime, timezone
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger('eventify.models')
+
+# Version of the stored event layout, see event_store.migrate_event()
+SCHEMA_VERSION = 2
+# Canonical name of the catch-all role (older events used "Fill"/"FillALL" in any case)
+FILLALL_ROLE = "FILLALL"
+# Role names (lower case) that are read as the catch-all role when roles are entered or migrated
+FILLALL_ALIASES = ("fill", "fillall")
+
+# Definiere europäische Zeitzone (CET/CEST)
+EUROPE_BERLIN = ZoneInfo("Europe/Berlin")
+
+# UTC conversion helper functions
+def local_to_utc(local_dt, is_date_time_string=False, date_str=None, time_str=None):
+    """
+    Konvertiert CET/CEST zu UTC mit korrekter Behandlung von Sommer/Winterzeit
+    
+    Args:
+        local_dt: Lokales Datetime-Objekt oder None wenn Strings verwendet werden
+        is_date_time_string: True wenn separate Datums- und Zeitstrings verwendet werden
+        date_str: Datumsstring im Format "DD.MM.YYYY" oder "DDMMYYYY"
+        time_str: Zeitstring im Format "HH:MM" oder "HHMM"
+    """
+    # Bei Verwendung von Strings für Datum/Zeit (über Slash-Befehle oder Modal)
+    if is_date_time_string and date_str and time_str:
+        try:
+            # Parse date (format: DD.MM.YYYY or DDMMYYYY)
+            if "." in date_str:
+                day, month, year = map(int, date_str.split("."))
+            else:
+                day = int(date_str[:2])
+                month = int(date_str[2:4])
+                year = int(date_str[4:])
+            
+            # Parse time (format: HH:MM or HHMM)
+            if ":" in time_str:
+                hour, minute = map(int, time_str.split(":"))
+            else:
+                hour = int(time_str[:2])
+                minute = int(time_str[2:])
+            
+            # Erstelle Datetime mit Europe/Berlin Zeitzone
+            # Dies berücksichtigt automatisch, ob das Datum in Sommer- oder Winterzeit fällt
+            local_dt = datetime(year, month, day, hour, minute, tzinfo=EUROPE_BERLIN)
+            logger.info(f"Converted local time {local_dt} (Europe/Berlin) to UTC")
+            return local_dt.astimezone(timezone.utc)
+        except Exception as e:
+            logger.error(f"Error converting date/time strings to UTC: {e}")
+            return None
+    
+    # Bei Verwendung eines vorhandenen Datetime-Objekts
+    if local_dt:
+        if local_dt.tzinfo is None:
+            # Setze Zeitzone auf Europe/Berlin
+            local_dt = local_dt.replace(tzinfo=EUROPE_BERLIN)
+        return local_dt.astimezone(timezone.utc)
+    
+    return None
+
+def utc_to_local(utc_dt):
+    """Konvertiert UTC zu CET/CEST basierend auf dem Datum"""
+    if utc_dt is None:
+        return None
+        
+    if utc_dt.tzinfo is None:
+        utc_dt = utc_dt.replace(tzinfo=timezone.utc)
+    
+    # Konvertiere nach Europe/Berlin, berücksichtigt automatisch DST
+    return utc_dt.astimezone(EUROPE_BERLIN)
+
+def format_local_datetime(utc_dt):
+    """Formatiert UTC-Zeit zur lokalen Anzeige in CET/CEST"""
+    local_dt = utc_to_local(utc_dt)
+    if local_dt is None:
+        return {
+            "date": None,
+            "time": None,
+            "datetime": None
+        }
+    return {
+        "date": local_dt.strftime("%d.%m.%Y"),
+        "time": local_dt.strftime("%H:%M"),
+        "datetime": local_dt
+    }
+
+
+REMINDER_UNITS = {"m": 1, "min": 1, "h": 60, "std": 60, "d": 1440, "t": 1440}
+
+
+def parse_reminder_offsets(text):
+    """
+    Parses reminder offsets like "24h,30m" or "1d 2h" into minutes before the event start.
+
+    Returns the distinct offsets, largest first; "" and "aus"/"off" give [].
+    Raises ValueError for anything else.
+    """
+    text = (text or "").strip().lower()
+    if text in ("", "aus", "off", "none"):
+        return []
+    return sorted(set(_parse_duration_parts(text, "reminder offset")), reverse=True)
+
+
+def parse_duration(text):
+    """
+    Parses a duration like "90m" or "1h 30m" into minutes; all parts add up.
+
+    "" and "aus"/"off" give None (never). Raises ValueError for anything else.
+    """
+    text = (text or "").strip().lower()
+    if text in ("", "aus", "off", "none"):
+        return None
+    return sum(_parse_duration_parts(text, "duration"))
+
+
+def _parse_duration_parts(text, what):
+    # Minutes of each part of "24h,30m" / "1h 30m"; a number without unit means minutes
+    minutes = []
+    for part in text.replace(";", ",").replace(" ", ",").split(","):
+        if not part:
+            continue
+        number = part.rstrip("abcdefghijklmnopqrstuvwxyz")
+        unit = part[len(number):] or "m"
+        if not number.isdigit() or unit not in REMINDER_UNITS or int(number) == 0:
+            raise ValueError(f"Invalid {what}: {part!r}")
+        minutes.append(int(number) * REMINDER_UNITS[unit])
+    return minutes
+
+
+def format_reminder_offset(minutes):
+    """Formats a reminder offset in minutes for display, e.g. 1440 -> "24 Std.", 30 -> "30 Min."."""
+    if minutes % 60:
+        return f"{minutes} Min."
+    return f"{minutes // 60} Std."
+
+
+class Participant(NamedTuple):
+    """One signup for a role; stored as [name, user_id, timestamp, comment]."""
+    name: str
+    user_id: str
+    timestamp: float  # Signup time, used for sorting
+    comment: str = ""
+
+
+def make_role_ids(count, start=0):
+    """Returns count new role IDs "r<n>" starting at number start."""
+    return [f"r{n}" for n in range(start, start + count)]
+
+
+class RoleSlot(NamedTuple):
+    """A role of an event at its position in the role list."""
+    index: int
+    name: str
+    role_id: str
+
+    @property
+    def key(self):
+        """Key of this role in Event.participants (its stable role ID)."""
+        return self.role_id
+
+    @property
+    def is_header(self):
+        return self.name.startswith('(') and self.name.endswith(')')
+
+    @property
+    def is_fillall(self):
+        return self.name == FILLALL_ROLE
+
+
+def calculate_role_counts(roles, participants, role_ids):
+    """
+    Berechnet die Anzahl der besetzten und insgesamt verfügbaren Rollen für ein Event.
+
+    Expects the current schema: roles are stripped strings, the catch-all
+    role is named FILLALL_ROLE and participants are keyed by role ID.
+
+    Args:
+        roles: Liste der Rollen im Event
+        participants: Dictionary mit den Teilnehmern pro Rolle
+        role_ids: Rollen-IDs in derselben Reihenfolge wie roles
+
+    Returns:
+        Tuple (filled_slots, total_slots)
+    """
+    filled_slots = 0
+    total_slots = 0
+
+    for slot in map(RoleSlot._make, zip(range(len(roles)), roles, role_ids)):
+        if slot.is_fillall:
+            # Jeder FILLALL-Teilnehmer zählt als besetzter Slot
+            filled_slots += len(participants.get(slot.key, ()))
+            continue
+        # Überschriften überspringen
+        if slot.is_header:
+            continue
+
+        total_slots += 1
+        if participants.get(slot.key):
+            filled_slots += 1
+
+    return filled_slots, total_slots
+
+
+class Event:
+    """
+    Resident, typed event. Handlers only use attributes; the dict form exists
+    solely at the storage boundary (from_dict/to_dict).
+    """
+
+    __slots__ = (
+        "title", "date", "time", "description", "roles", "role_ids", "participants",
+        "caller_id", "caller_name", "message_id", "thread_id", "participant_only_mode",
+        "mention_role_id", "status", "image_url", "datetime_obj", "event_id", "version",
+        "reminders", "reminders_sent", "thread_closed", "created_at", "extra",
+        "_user_roles",
+    )
+
+    # Stored fields that are derived from others and recomputed by to_dict()
+    DERIVED_FIELDS = ("filled_slots", "total_slots", "schema_version")
+
+    def __init__(self, title, date, time, description, roles, datetime_obj=None, caller_id=None, caller_name=None, participant_only_mode=False, event_id=None):
+        self.title = title
+        self.date = date
+        self.time = time
+        self.description = description
+        self.roles = roles
+        self.role_ids = make_role_ids(len(roles))  # Stable IDs, parallel to roles
+        self.participants = {}  # role ID -> list of Participant
+        self._user_roles = {}  # user_id -> role keys, kept in sync by the participant methods below
+        self.caller_id = caller_id  # Discord ID of the creator
+        self.caller_name = caller_name  # Name of the creator
+        self.message_id = None  # Message ID of the event post
+        self.thread_id = None  # Thread ID of the event thread
+        self.participant_only_mode = participant_only_mode  # Flag for participant-only mode
+        self.mention_role_id = None  # Add mention_role_id field
+        self.status = "active"  # Neues Statusfeld: "active", "expired" oder "cleaned"
+        self.image_url = None  # Attribut für Bild-URL hinzufügen
+        self.version = 0  # Increased by the store on every commit (optimistic concurrency control)
+        self.reminders = None  # Automatic reminders in minutes before start; None uses the guild default
+        self.reminders_sent = []  # Reminder offsets (minutes) already sent or skipped
+        self.thread_closed = False  # Set once the thread was archived or deleted after the event
+        self.created_at = datetime.now(timezone.utc)  # When the event was created (None for older events)
+        self.extra = {}  # Stored fields without a dedicated attribute, kept as they are
+        
+        # Konvertiere datetime_obj zu einem tatsächlichen UTC datetime-Objekt
+        if datetime_obj is None:
+            try:
+                # Versuche, aus Datum und Uhrzeit ein datetime-Objekt zu erstellen und in UTC zu konvertieren
+                dt_str = f"{date} {time}"
+                local_dt = datetime.strptime(dt_str, "%d.%m.%Y %H:%M")
+                # Lokale Zeit zu UTC konvertieren
+                self.datetime_obj = local_to_utc(local_dt)
+            except:
+                # Fallback auf aktuelle Zeit in UTC
+                self.datetime_obj = datetime.now(timezone.utc)
+                logger.warning(f"Konnte kein datetime-Objekt aus Datum '{date}' und Zeit '{time}' erstellen. Verwende aktuelle UTC-Zeit.")
+        elif isinstance(datetime_obj, str):
+            try:
+                # Versuche, den String in ein datetime-Objekt zu konvertieren
+                local_dt = datetime.fromisoformat(datetime_obj)
+                # In UTC konvertieren
+                self.datetime_obj = local_to_utc(local_dt)
+            except:
+                # Fallback auf aktuelle Zeit in UTC
+                self.datetime_obj = datetime.now(timezone.utc)
+                logger.warning(f"Konnte kein datetime-Objekt aus String '{datetime_obj}' erstellen. Verwende aktuelle UTC-Zeit.")
+        else:
+            # Stelle sicher, dass es UTC ist
+            self.datetime_obj = local_to_utc(datetime_obj)
+        
+        # Use provided event_id or generate a new one
+        if event_id:
+            self.event_id = event_id
+            logger.info(f"Using provided event_id: {event_id} for event: {title}")
+        else:
+            # Generate a unique ID for the event that includes the UTC timestamp
+            timestamp = self.datetime_obj.strftime("%Y%m%d%H%M")
+            random_string = str(uuid.uuid4())[:8]  # Use first 8 characters of UUID
+            self.event_id = f"{timestamp}-{random_string}"
+            logger.info(f"Generated new event_id: {self.event_id} for event: {title}")
+    
+    @classmethod
+    def from_dict(cls, data):
+        """Builds an event from its stored form (current schema, see event_store.migrate_event)."""
+        event = cls.__new__(cls)
+        event.title = data.get("title", "")
+        event.date = data.get("date")
+        event.time = data.get("time")
+        event.description = data.get("description", "")
+        event.roles = list(data.get("roles", []))
+        event.role_ids = list(data.get("role_ids", []))
+        event.participants = {
+            role_key: [Participant(*entry) for entry in entries]
+            for role_key, entries in data.get("participants", {}).items()
+        }
+        event._rebuild_user_index()
+        event.caller_id = data.get("caller_id")
+        event.caller_name = data.get("caller_name")
+        event.message_id = data.get("message_id")
+        event.thread_id = data.get("thread_id")
+        event.participant_only_mode = data.get("participant_only_mode", False)
+        event.mention_role_id = data.get("mention_role_id")
+        event.status = data.get("status", "active")
+        event.image_url = data.get("image_url")
+        event.datetime_obj = datetime.fromisoformat(data["datetime_obj"]) if data.get("datetime_obj") else None
+        event.event_id = data.get("event_id")
+        event.version = data.get("version", 0)
+        event.reminders = data.get("reminders")
+        event.reminders_sent = list(data.get("reminders_sent", []))
+        event.thread_closed = data.get("thread_closed", False)
+        event.created_at = datetime.fromisoformat(data["created_at"]) if data.get("created_at") else None
+        known = set(cls.__slots__) | set(cls.DERIVED_FIELDS)
+        event.extra = {k: v for k, v in data.items() if k not in known}
+        return event
+
+    def role_slots(self):
+        """Returns the roles as RoleSlot entries in display order."""
+        return [RoleSlot(*slot) for slot in zip(range(len(self.roles)), self.roles, self.role_ids)]
+
+    @property
+    def fillall_key(self):
+        """Participants key of the FILLALL role, or None if the event has none."""
+        # FILLALL is appended last when an event is created, so check there first
+        if self.roles and self.roles[-1] == FILLALL_ROLE:
+            return self.role_ids[-1]
+        if FILLALL_ROLE in self.roles:
+            return self.role_ids[self.roles.index(FILLALL_ROLE)]
+        return None
+
+    def role_key(self, index):
+        """Participants key of the role at the given display position."""
+        return self.role_ids[index]
+
+    def role_name(self, role_key):
+        """Role name for a participants key."""
+        try:
+            return self.roles[self.role_ids.index(role_key)]
+        except ValueError:
+            return role_key
+
+    def insert_role(self, index, name):
+        """
+        Inserts a role at the given display position and returns its new role ID.
+
+        Participants are keyed by role ID, so no signup has to be moved.
+        """
+        numbers = [int(role_id[1:]) for role_id in self.role_ids if role_id[1:].isdigit()]
+        role_id = make_role_ids(1, start=max(numbers, default=-1) + 1)[0]
+        self.roles.insert(index, name)
+        self.role_ids.insert(index, role_id)
+        return role_id
+
+    def update_from(self, other):
+        """Takes over the complete state of other, e.g. a committed working copy."""
+        for slot in self.__slots__:
+            setattr(self, slot, getattr(other, slot))
+
+    # Participant mutations. Event.participants may be read directly, but all
+    # changes go through these methods so that the user index stays in sync.
+
+    def _rebuild_user_index(self):
+        self._user_roles = {}
+        for role_key, entries in self.participants.items():
+            for entry in entries:
+                self._user_roles.setdefault(entry.user_id, set()).add(role_key)
+
+    def roles_of(self, user_id):
+        """Returns the role keys the user is signed up for (empty if none)."""
+        return frozenset(self._user_roles.get(str(user_id), ()))
+
+    def find_participant(self, role_key, user_id):
+        """Returns the user's entry in the given role or None."""
+        user_id = str(user_id)
+        if role_key not in self._user_roles.get(user_id, ()):
+            return None
+        return next(entry for entry in self.participants[role_key] if entry.user_id == user_id)
+
+    def add_participant(self, role_key, participant):
+        """Appends a signup; an existing entry of the same user in this role is replaced in place."""
+        entries = self.participants.setdefault(role_key, [])
+        roles = self._user_roles.setdefault(participant.user_id, set())
+        if role_key in roles:
+            for i, entry in enumerate(entries):
+                if entry.user_id == participant.user_id:
+                    entries[i] = participant
+                    return
+        entries.append(participant)
+        roles.add(role_key)
+
+    def remove_participant(self, role_key, user_id):
+        """Removes the user from one role. Returns the removed entry or None."""
+        user_id = str(user_id)
+        roles = self._user_roles.get(user_id)
+        if not roles or role_key not in roles:
+            return None
+        entries = self.participants[role_key]
+        removed = next(entry for entry in entries if entry.user_id == user_id)
+        entries[:] = [entry for entry in entries if entry.user_id != user_id]
+        roles.discard(role_key)
+        if not roles:
+            del self._user_roles[user_id]
+        return removed
+
+    def remove_user(self, user_id):
+        """Removes the user from every role. Returns {role_key: removed entry}."""
+        return {role_key: self.remove_participant(role_key, user_id) for role_key in self.roles_of(user_id)}
+
+    def set_participants(self, participants):
+        """Replaces all signups at once (e.g. after the roles were renumbered)."""
+        self.participants = participants
+        self._rebuild_user_index()
+
+    @staticmethod
+    def get_datetime_from_event_id(event_id):
+        """Extrahiert den Zeitstempel aus der Event-ID und gibt ein datetime-Objekt zurück."""
+        try:
+            # Extrahiere den Zeitstempel-Teil (vor dem Bindestrich)
+            timestamp_str = event_id.split('-')[0]
+            # Konvertiere zu datetime mit UTC-Zeitzone
+            dt = datetime.strptime(timestamp_str, "%Y%m%d%H%M")
+            return dt.replace(tzinfo=timezone.utc)
+        except:
+            # Bei Fehlern None zurückgeben
+            return None
+    
+    def to_dict(self):
+        """Convert the event to a dictionary for JSON serialization"""
+        # Convert datetime_obj to ISO format string for JSON serialization
+        datetime_str = None
+        if self.datetime_obj:
+            try:
+                datetime_str = self.datetime_obj.isoformat()
+            except:
+                logger.warning(f"Could not convert datetime_obj to ISO format for event: {self.title}")
+        
+        # Get local date and time for display
+        local_format = None
+        if self.datetime_obj:
+            try:
+                local_format = format_local_datetime(self.datetime_obj)
+                self.date = local_format["date"]
+                self.time = local_format["time"]
+            except:
+                logger.warning(f"Could not format local datetime for event: {self.title}")
+        
+        # Berechne Rollenanzahl über die zentrale Hilfsfunktion
+        filled_slots, total_slots = calculate_role_counts(self.roles, self.participants, self.role_ids)
+        
+        data = dict(self.extra)
+        data.update({
+            "title": self.title,
+            "date": self.date,
+            "time": self.time,
+            "description": self.description,
+            "roles": list(self.roles),
+            "role_ids": list(self.role_ids),
+            "participants": {
+                role_key: [list(entry) for entry in entries]
+                for role_key, entries in self.participants.items()
+            },
+            "event_id": self.event_id,  # Store the unique ID
+            "caller_id": self.caller_id,  # Store the creator's ID
+            "caller_name": self.caller_name,  # Store the creator's name
+            "message_id": self.message_id,  # Store the event post's message ID
+            "thread_id": self.thread_id,  # Store the event thread's ID
+            "participant_only_mode": self.participant_only_mode,  # Store the flag for participant-only mode
+            "mention_role_id": self.mention_role_id,  # Store the mention role ID
+            "datetime_obj": datetime_str,  # Store the datetime as ISO format string
+            "status": self.status,  # "active", "expired", "cleaned" or "canceled"
+            "image_url": self.image_url,  # Store the image URL
+            "version": self.version,  # Commit counter for compare-and-swap
+            "reminders": self.reminders,  # Reminder offsets in minutes, None for the guild default
+            "reminders_sent": list(self.reminders_sent),
+            "thread_closed": self.thread_closed,  # Thread archived/deleted by the thread scheduler
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "total_slots": total_slots,  # Store total role slots
+            "filled_slots": filled_slots,  # Store filled role slots
+            "schema_version": SCHEMA_VERSION,
+        })
+        return data
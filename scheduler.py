@@ -0,0 +1,140 @@
+"""
+Deadline scheduling for Eventify.
+
+A single asyncio task per DeadlineScheduler sleeps until the earliest deadline
+instead of polling; this module must not import discord so that it can be
+shared with offline tools.
+"""
+import asyncio
+import heapq
+import itertools
+import logging
+from datetime import datetime, timedelta, timezone
+
+logger = logging.getLogger('eventify.scheduler')
+
+# Upper bound for one sleep, so wall clock changes (NTP, suspend) are noticed
+MAX_SLEEP_SECONDS = 3600
+# Delay before keys whose callback raised are due again
+RETRY_SECONDS = 60
+
+
+class DeadlineScheduler:
+    """
+    Runs a callback for keys whose deadline (aware UTC datetime) has come.
+
+    Pending deadlines live in a min-heap; schedule() and cancel() are O(log n)
+    and O(1). Rescheduling a key replaces its deadline: superseded heap entries
+    stay in the heap and are skipped when they come up. The task sleeps until
+    the earliest deadline and is woken early when an earlier one is scheduled,
+    so an idle scheduler costs nothing, however many keys are pending.
+
+    The callback is a coroutine function that receives the list of all keys due
+    at the same time. Deadlines that already passed (e.g. while the bot was
+    down) are due immediately when the scheduler starts. A key is dropped from
+    the schedule before its callback runs; the callback may schedule it again.
+    If the callback raises, its keys that it did not schedule again are retried
+    after RETRY_SECONDS.
+    """
+
+    def __init__(self, callback, name="scheduler"):
+        self.callback = callback
+        self.name = name
+        self._heap = []  # (deadline, sequence, key)
+        self._deadlines = {}  # key -> (deadline, sequence) of its current entry
+        self._sequence = itertools.count()
+        self._wakeup = None
+        self._task = None
+
+    def __len__(self):
+        return len(self._deadlines)
+
+    def __contains__(self, key):
+        return key in self._deadlines
+
+    def deadline(self, key):
+        """The pending deadline of key, or None."""
+        entry = self._deadlines.get(key)
+        return entry[0] if entry else None
+
+    def schedule(self, key, deadline):
+        """(Re)schedules key for deadline; a no-op if it is already scheduled for exactly that time."""
+        current = self._deadlines.get(key)
+        if current is not None and current[0] == deadline:
+            return
+        sequence = next(self._sequence)
+        self._deadlines[key] = (deadline, sequence)
+        heapq.heappush(self._heap, (deadline, sequence, key))
+        if self._heap[0][1] == sequence:
+            # New earliest deadline: the sleeping task has to recompute its timeout
+            self._wake()
+        self._compact()
+
+    def retry(self, keys):
+        """Schedules keys again in RETRY_SECONDS, except those that already have a new deadline."""
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=RETRY_SECONDS)
+        for key in keys:
+            if key not in self._deadlines:
+                self.schedule(key, retry_at)
+
+    def cancel(self, key):
+        """Removes key from the schedule. Returns True if it was scheduled."""
+        return self._deadlines.pop(key, None) is not None
+
+    def _compact(self):
+        # Rebuilds the heap once superseded entries dominate it
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._deadlines):
+            self._heap = [(deadline, sequence, key) for key, (deadline, sequence) in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, entry):
+        deadline, sequence, key = entry
+        return self._deadlines.get(key) == (deadline, sequence)
+
+    def _pop_due(self, now):
+        due = []
+        while self._heap and (not self._is_current(self._heap[0]) or self._heap[0][0] <= now):
+            entry = heapq.heappop(self._heap)
+            if self._is_current(entry):
+                del self._deadlines[entry[2]]
+                due.append(entry[2])
+        return due
+
+    def _wake(self):
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        """Starts the scheduler task inside the running event loop; a no-op if it is running."""
+        if self._task is not None and not self._task.done():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    def stop(self):
+        """Stops the scheduler task; pending deadlines are kept for a restart."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _run(self):
+        logger.info(f"{self.name} scheduler started with {len(self._deadlines)} pending deadlines")
+        while True:
+            self._wakeup.clear()
+            now = datetime.now(timezone.utc)
+            due = self._pop_due(now)
+            if due:
+                try:
+                    await self.callback(due)
+                except Exception as e:
+                    logger.exception(f"Error in {self.name} scheduler callback for {len(due)} due entries, "
+                                     f"retrying in {RETRY_SECONDS} seconds: {e}")
+                    self.retry(due)
+                continue
+            timeout = None
+            if self._heap:
+                timeout = min(max((self._heap[0][0] - now).total_seconds(), 0), MAX_SLEEP_SECONDS)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
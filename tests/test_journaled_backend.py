@@ -0,0 +1,30 @@
+import json
+import logging
+
+from event_store import JournaledBackend, JsonFileBackend
+from models import Event
+
+
+def test_hand_edit_logs_discarded_journal_records(tmp_path, caplog):
+    events_json = tmp_path / "events.json"
+    backend = JournaledBackend(JsonFileBackend(str(events_json), str(tmp_path / "backups")),
+                               str(tmp_path / "events.journal"), str(tmp_path / "archive"))
+    events = [Event(title, "01.01.2030", "20:00", "", ["Tank"]).to_dict() for title in ("Raid", "Dungeon")]
+    backend.compact(events)
+    backend.load()
+    for event in events:
+        event["description"] = "journaled"
+    backend.save(events, {e["event_id"] for e in events}, set())
+
+    snapshot = json.loads(events_json.read_text(encoding="utf-8"))
+    snapshot["events"][0]["title"] = "Raid (edited)"
+    events_json.write_text(json.dumps(snapshot), encoding="utf-8")
+    with caplog.at_level(logging.WARNING):
+        reloaded = {e["event_id"]: e for e in backend.reload()}
+
+    edited_id, kept_id = events[0]["event_id"], events[1]["event_id"]
+    assert reloaded[edited_id]["title"] == "Raid (edited)"
+    assert reloaded[kept_id]["description"] == "journaled"
+    warnings = [r.getMessage() for r in caplog.records if r.levelno == logging.WARNING]
+    assert len(warnings) == 1
+    assert edited_id in warnings[0] and "discarding its 1 journal records" in warnings[0]
@@ -0,0 +1,65 @@
+import json
+import os
+
+from event_store import EventArchive, EventStore, ShardedJsonBackend
+from models import Event
+
+
+def make_store(tmp_path):
+    backend = ShardedJsonBackend(str(tmp_path / "events"), import_from=None)
+    return EventStore(backend, archive=EventArchive(str(tmp_path / "archive")))
+
+
+def file_state(path):
+    stat = os.stat(path)
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def test_expiry_only_rewrites_the_manifest(tmp_path):
+    store = make_store(tmp_path)
+    store.load()
+    event = Event("Raid", "01.01.2020", "20:00", "", ["Tank", "FILLALL"])
+    store.upsert(event)
+    assert store.save()
+    event_file = os.path.join(store.backend.directory, f"{event.event_id}.json")
+    before = file_state(event_file)
+    version = store.find_by_id(event.event_id).version
+
+    # The commit bumps the version as well as the status
+    assert store.expire_events() == 1
+    assert store.save()
+
+    assert file_state(event_file) == before
+    reloaded = make_store(tmp_path)
+    reloaded.load()
+    assert reloaded.find_by_id(event.event_id).status == "expired"
+    assert reloaded.find_by_id(event.event_id).version == version + 1
+
+
+def test_status_change_rewrites_only_the_manifest(tmp_path):
+    backend = ShardedJsonBackend(str(tmp_path / "events"), import_from=None)
+    backend.load()
+    event = Event("Raid", "01.01.2020", "20:00", "", ["Tank", "FILLALL"]).to_dict()
+    event_id = event["event_id"]
+    backend.save([event], {event_id}, set())
+    files = {name: file_state(os.path.join(backend.directory, name)) for name in os.listdir(backend.directory)}
+
+    backend.save([dict(event, status="expired")], {event_id}, set())
+
+    rewritten = {name for name, state in files.items()
+                 if file_state(os.path.join(backend.directory, name)) != state}
+    assert rewritten == {"manifest.json"}
+    assert ShardedJsonBackend(backend.directory, import_from=None).load()[0]["status"] == "expired"
+
+
+def test_emptied_store_is_not_refilled_from_events_json(tmp_path):
+    events_json = tmp_path / "events.json"
+    event = Event("Raid", "01.01.2030", "20:00", "", ["Tank"]).to_dict()
+    events_json.write_text(json.dumps({"events": [event]}), encoding="utf-8")
+    backend = ShardedJsonBackend(str(tmp_path / "events"), import_from=str(events_json))
+    assert [e["title"] for e in backend.load()] == ["Raid"]
+
+    backend.save([], set(), {event["event_id"]})
+
+    assert backend.reload() == []
+    assert ShardedJsonBackend(backend.directory, import_from=str(events_json)).load() == []
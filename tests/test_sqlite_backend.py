@@ -0,0 +1,33 @@
+import json
+
+from event_store import SqliteBackend
+from models import Event
+
+
+def write_events_json(path, titles):
+    events = [Event(title, "01.01.2030", "20:00", "", ["Tank"]).to_dict() for title in titles]
+    path.write_text(json.dumps({"events": events}), encoding="utf-8")
+    return events
+
+
+def test_new_database_imports_events_json_once(tmp_path):
+    events_json = tmp_path / "events.json"
+    write_events_json(events_json, ["Raid", "Dungeon"])
+    backend = SqliteBackend(str(tmp_path / "events.db"), import_from=str(events_json))
+
+    assert sorted(e["title"] for e in backend.load()) == ["Dungeon", "Raid"]
+    reopened = SqliteBackend(str(tmp_path / "events.db"), import_from=str(events_json))
+    assert sorted(e["title"] for e in reopened.load()) == ["Dungeon", "Raid"]
+
+
+def test_emptied_database_is_not_refilled_from_events_json(tmp_path):
+    events_json = tmp_path / "events.json"
+    events = write_events_json(events_json, ["Raid"])
+    backend = SqliteBackend(str(tmp_path / "events.db"), import_from=str(events_json))
+    backend.load()
+
+    backend.save([], set(), {events[0]["event_id"]})
+
+    assert backend.reload() == []
+    assert backend.load() == []
+    assert SqliteBackend(str(tmp_path / "events.db"), import_from=str(events_json)).load() == []